@@ -0,0 +1,740 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from charts import RESULT_FIGSIZE, figure_pool
+from fuzzy_logic import RESOLUTION_PROFILES, FuzzyGradeSystem, make_universe
+from fuzzy_engine import CATEGORIES, CompiledFuzzyModel, GradeLookupTable
+from result_analytics import load_results_columns, student_summary, summarize
+from result_archive import ResultArchive
+from result_store import HistoryReader, ResultStore, iter_records, update_keys
+from rule_base import build_rule_base, validate_rule_base
+
+
+def grid_inputs(step=1):
+    """
+    Формирует сетку входов по всем трем параметрам
+
+    :param step: шаг сетки
+    :return: массив формы (N, 3)
+    """
+    values = np.arange(0, 10 + step / 2, step)
+    q, a, d = np.meshgrid(values, values, values, indexing='ij')
+    return np.column_stack([q.ravel(), a.ravel(), d.ravel()])
+
+
+def sample_inputs(size, seed=0):
+    """
+    Формирует сетку 11x11x11 и случайные входы для сверки результатов
+
+    :param size: количество случайных входов
+    :param seed: зерно генератора случайных чисел
+    :return: массив формы (1331 + size, 3)
+    """
+    rng = np.random.default_rng(seed)
+    return np.vstack([grid_inputs(), rng.uniform(0, 10, (size, 3))])
+
+
+def report_parity(inputs, numeric, codes, reference):
+    """
+    Сверяет результаты с эталонным движком skfuzzy и печатает расхождение
+
+    :param inputs: массив входов формы (N, 3)
+    :param numeric: проверяемые числовые оценки (NaN - ошибка вычисления)
+    :param codes: проверяемые коды категорий
+    :param reference: FuzzyGradeSystem с движком skfuzzy
+    :return: количество входов в секунду для эталонного движка
+    """
+    max_diff = 0.0
+    mismatches = 0
+    start = time.perf_counter()
+    for row, value, code in zip(inputs, numeric, codes):
+        ref_numeric, ref_text = reference.evaluate(*row)
+        if ref_numeric is None:
+            mismatches += code != -1
+        else:
+            max_diff = max(max_diff, abs(ref_numeric - value))
+            mismatches += code == -1 or CATEGORIES[code] != ref_text
+    rate = len(inputs) / (time.perf_counter() - start)
+
+    print(f"Сверка на {len(inputs)} входах: макс. расхождение {max_diff:.2e} "
+          f"(допуск {CompiledFuzzyModel.TOLERANCE:.0e}), несовпадений категорий: {mismatches}")
+    return rate
+
+
+def bench_batch(size):
+    """
+    Сравнивает поэлементный вывод skfuzzy и evaluate_batch по скорости и результату
+
+    :param size: количество случайных входов для замера evaluate_batch
+    """
+    fuzzy_system = FuzzyGradeSystem()
+    reference = FuzzyGradeSystem(engine='skfuzzy')
+
+    inputs = sample_inputs(1000)
+    numeric, codes = fuzzy_system.evaluate_batch(inputs)
+    scalar_rate = report_parity(inputs, numeric, codes, reference)
+
+    # Пропускная способность пакетного вывода
+    inputs = np.random.default_rng(1).uniform(0, 10, (size, 3))
+    start = time.perf_counter()
+    fuzzy_system.evaluate_batch(inputs)
+    batch_rate = size / (time.perf_counter() - start)
+
+    print(f"evaluate (skfuzzy): {scalar_rate:12.0f} оценок/с")
+    print(f"evaluate_batch:     {batch_rate:12.0f} оценок/с (x{batch_rate / scalar_rate:.0f})")
+
+
+def bench_engines(size):
+    """
+    Сравнивает движки evaluate на одиночных вызовах
+
+    :param size: количество случайных входов
+    """
+    fuzzy_system = FuzzyGradeSystem()
+    reference = FuzzyGradeSystem(engine='skfuzzy')
+
+    inputs = sample_inputs(size)
+    start = time.perf_counter()
+    results = [fuzzy_system.evaluate(*row) for row in inputs]
+    compiled_rate = len(inputs) / (time.perf_counter() - start)
+
+    numeric = np.array([np.nan if value is None else value for value, _ in results])
+    codes = np.array([CATEGORIES.index(text) if value is not None else -1 for value, text in results])
+    skfuzzy_rate = report_parity(inputs, numeric, codes, reference)
+
+    print(f"evaluate (skfuzzy):  {skfuzzy_rate:12.0f} оценок/с")
+    print(f"evaluate (compiled): {compiled_rate:12.0f} оценок/с (x{compiled_rate / skfuzzy_rate:.0f})")
+
+
+def bench_table(size):
+    """
+    Оценивает скорость и погрешность ответов из таблицы оценок
+
+    :param size: количество случайных дробных входов
+    """
+    exact_system = FuzzyGradeSystem()
+    table_system = FuzzyGradeSystem(use_lookup_table=True, interpolate=True)
+
+    start = time.perf_counter()
+    table_system.get_lookup_table()
+    print(f"Построение таблицы: {(time.perf_counter() - start) * 1000:.1f} мс")
+
+    for title, inputs in (("целые", grid_inputs()),
+                          ("дробные", np.random.default_rng(0).uniform(0, 10, (size, 3)))):
+        start = time.perf_counter()
+        table_results = [table_system.evaluate(*row) for row in inputs]
+        table_rate = len(inputs) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        exact_results = [exact_system.evaluate(*row) for row in inputs]
+        exact_rate = len(inputs) / (time.perf_counter() - start)
+
+        errors = [abs(t[0] - e[0]) for t, e in zip(table_results, exact_results)
+                  if t[0] is not None and e[0] is not None]
+        mismatches = sum(t[1] != e[1] for t, e in zip(table_results, exact_results))
+        print(f"Входы {title} ({len(inputs)}): таблица {table_rate:.0f} оценок/с, "
+              f"точный вывод {exact_rate:.0f} оценок/с, макс. погрешность {max(errors):.3f}, "
+              f"средняя {np.mean(errors):.3f}, несовпадений категорий {mismatches}")
+
+
+def bench_threads(threads, size):
+    """
+    Нагружает один экземпляр FuzzyGradeSystem из многих потоков
+
+    Совпадение результатов с последовательным вычислением проверяет
+    tests/test_concurrency.py; здесь только замер скорости.
+
+    :param threads: количество потоков
+    :param size: количество оценок на поток
+    """
+    inputs = np.random.default_rng(0).integers(0, 11, (threads, size, 3)).astype(np.float64)
+    inputs[:, ::2] += np.random.default_rng(1).uniform(0, 1, (threads, (size + 1) // 2, 3)).round(2)
+    inputs = np.clip(inputs, 0, 10)
+
+    # Таблица оценок не используется: каждый вызов доходит до движка вывода
+    for title, engine, cache_size in (("compiled + кэш", 'compiled', 256),
+                                      ("compiled", 'compiled', None),
+                                      ("skfuzzy", 'skfuzzy', None)):
+        count = size if engine == 'compiled' else max(size // 50, 1)
+        fuzzy_system = FuzzyGradeSystem(engine=engine, cache_size=cache_size)
+
+        def worker(index):
+            for row in inputs[index][:count]:
+                fuzzy_system.evaluate(*row)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(worker, range(threads)))
+        rate = threads * count / (time.perf_counter() - start)
+        print(f"{title:15s}: {threads} потоков x {count} оценок, {rate:10.0f} оценок/с")
+
+
+def defined_inputs(fuzzy_system, size, seed=0):
+    """
+    Выбирает случайные целочисленные входы, для которых оценка определена
+
+    :param fuzzy_system: FuzzyGradeSystem
+    :param size: количество входов
+    :param seed: зерно генератора случайных чисел
+    :return: список строк формы (3,)
+    """
+    inputs = [row for row in grid_inputs() if fuzzy_system.evaluate(*row)[0] is not None]
+    return [inputs[i] for i in np.random.default_rng(seed).integers(0, len(inputs), size)]
+
+
+def current_rss():
+    """
+    Возвращает текущий объем резидентной памяти процесса
+
+    :return: байты или None, если /proc недоступен
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def bench_charts(size):
+    """
+    Сравнивает полную отрисовку графика результата и отрисовку только изменяемого слоя
+
+    :param size: количество графиков для каждого способа
+    """
+    fuzzy_system = FuzzyGradeSystem()
+    inputs = defined_inputs(fuzzy_system, size)
+
+    def render_full(row):
+        return figure_pool.render_png(lambda fig: fuzzy_system.visualize_result(*row, fig=fig), RESULT_FIGSIZE)
+
+    fuzzy_system.get_result_renderer()
+    for title, render in (("полная (visualize_result)", render_full),
+                          ("фон + слой (render_result)", lambda row: fuzzy_system.render_result(*row))):
+        start = time.perf_counter()
+        for row in inputs:
+            render(row)
+        elapsed = (time.perf_counter() - start) / len(inputs)
+        print(f"{title:28s}: {elapsed * 1000:6.1f} мс на график")
+
+
+def bench_soak(count, report_every, max_growth):
+    """
+    Строит много графиков подряд и следит за потреблением памяти
+
+    Чередуются график результата с отрисовкой слоя, полная отрисовка
+    на фигуре из пула и (реже) график функций принадлежности. Рост памяти
+    считается от первого замера, когда кэши и пул фигур уже заполнены.
+
+    :param count: общее количество графиков
+    :param report_every: через сколько графиков печатать объем памяти
+    :param max_growth: допустимый рост памяти за прогон, байты
+    :return: True, если рост памяти превысил max_growth
+    """
+    fuzzy_system = FuzzyGradeSystem()
+    inputs = defined_inputs(fuzzy_system, 1000)
+
+    start = time.perf_counter()
+    baseline = None
+    growth = 0
+    for i in range(1, count + 1):
+        row = inputs[i % len(inputs)]
+        if i % 1000 == 0:
+            fuzzy_system.render_membership()
+        elif i % 2:
+            fuzzy_system.render_result(*row)
+        else:
+            figure_pool.render_png(lambda fig: fuzzy_system.visualize_result(*row, fig=fig), RESULT_FIGSIZE)
+
+        if i % report_every == 0 or i == count:
+            rss = current_rss()
+            baseline = baseline or rss
+            if rss:
+                growth = rss - baseline
+            memory = f"RSS {rss / 2 ** 20:7.1f} МБ (+{growth / 2 ** 20:.1f})" if rss else "RSS недоступен"
+            print(f"{i:8d} графиков, {i / (time.perf_counter() - start):6.1f} графиков/с, {memory}, "
+                  f"пул фигур: {figure_pool.stats()}")
+
+    if growth > max_growth:
+        print(f"Рост памяти {growth / 2 ** 20:.1f} МБ превышает допустимые {max_growth / 2 ** 20:.1f} МБ")
+        return True
+    return False
+
+
+def bench_defuzz(size):
+    """
+    Сравнивает дефаззификацию по точкам универсума и точный центр тяжести
+    при разном шаге выходного универсума
+
+    Эталон - точный центр тяжести: он не зависит от шага универсума.
+
+    :param size: количество случайных входов
+    """
+    inputs = sample_inputs(size)
+    scalar_inputs = inputs[:min(len(inputs), 2000)]
+    reference = None
+
+    for step in (1, 0.1, 0.01):
+        for mode in ('exact', 'sampled'):
+            model = FuzzyGradeSystem(defuzzification=mode, resolution=step).model
+            start = time.perf_counter()
+            numeric, _ = model.evaluate_batch(inputs)
+            batch_rate = len(inputs) / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for row in scalar_inputs:
+                model.evaluate(row)
+            scalar_rate = len(scalar_inputs) / (time.perf_counter() - start)
+
+            if reference is None:
+                reference = numeric
+            error = np.nanmax(np.abs(numeric - reference))
+            print(f"шаг {step:<4} {mode:7s}: evaluate_batch {batch_rate:9.0f} оценок/с, "
+                  f"evaluate {scalar_rate:7.0f} оценок/с, макс. погрешность {error:.2e}")
+
+
+def bench_resolution(size, reference_step):
+    """
+    Сравнивает профили точности по скорости и погрешности числовой оценки
+
+    Эталон - система с очень мелким шагом универсума.
+
+    :param size: количество случайных входов
+    :param reference_step: шаг универсума эталонной системы
+    """
+    inputs = sample_inputs(size)
+    scalar_inputs = inputs[:min(len(inputs), 2000)]
+    reference, reference_codes = FuzzyGradeSystem(resolution=reference_step).evaluate_batch(inputs)
+
+    for name, step in RESOLUTION_PROFILES.items():
+        fuzzy_system = FuzzyGradeSystem(resolution=name)
+
+        start = time.perf_counter()
+        numeric, codes = fuzzy_system.evaluate_batch(inputs)
+        batch_rate = len(inputs) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for row in scalar_inputs:
+            fuzzy_system.evaluate(*row)
+        scalar_rate = len(scalar_inputs) / (time.perf_counter() - start)
+
+        errors = np.abs(numeric - reference)
+        print(f"{name:9s} (шаг {step:<4}): evaluate {scalar_rate:7.0f} оценок/с, "
+              f"evaluate_batch {batch_rate:9.0f} оценок/с, погрешность макс. {np.nanmax(errors):.2e}, "
+              f"средняя {np.nanmean(errors):.2e}, несовпадений категорий {int(np.sum(codes != reference_codes))}")
+
+
+def synthetic_rule_base(n_inputs, n_rules, seed=0):
+    """
+    Формирует случайную базу правил: критерии с тремя термами, правила И
+    по 3-6 критериям и одно правило ИЛИ, как в основной базе
+
+    :param n_inputs: количество критериев
+    :param n_rules: количество правил
+    :param seed: зерно генератора случайных чисел
+    :return: описание базы правил в формате rule_base.json
+    """
+    rng = np.random.default_rng(seed)
+    terms = {'низкий': [0, 0, 5], 'средний': [3, 5, 8], 'высокий': [6, 10, 10]}
+    outputs = {'троечник': [0, 0, 5], 'хорошист': [3, 5, 8], 'отличник': [6, 10, 10]}
+    labels = [f'критерий{i + 1}' for i in range(n_inputs)]
+
+    rules = [{'op': 'or', 'if': {label: 'низкий' for label in labels[:3]}, 'then': 'троечник'}]
+    while len(rules) < n_rules:
+        size = rng.integers(3, min(6, n_inputs) + 1)
+        chosen = sorted(rng.choice(n_inputs, size, replace=False))
+        rules.append({
+            'if': {labels[v]: list(terms)[rng.integers(3)] for v in chosen},
+            'then': list(outputs)[rng.integers(3)],
+        })
+
+    definition = {'inputs': {label: terms for label in labels}, 'output': {'оценка': outputs}, 'rules': rules}
+    validate_rule_base(definition)
+    return definition
+
+
+def bench_rules(size, n_inputs):
+    """
+    Сравнивает перебор всех правил и разреженный вывод при росте базы правил
+
+    :param size: количество случайных входов
+    :param n_inputs: количество критериев
+    """
+    inputs = [tuple(row) for row in np.random.default_rng(1).uniform(0, 10, (size, n_inputs))]
+    universe = make_universe('chat')
+
+    for n_rules in (7, 50, 100, 250, 500, 1000):
+        antecedents, consequent, rules = build_rule_base(synthetic_rule_base(n_inputs, n_rules), universe)
+        results = {}
+        for sparse in (False, True):
+            model = CompiledFuzzyModel(antecedents, consequent, rules, sparse_rules=sparse)
+            start = time.perf_counter()
+            results[sparse] = np.array([model.evaluate(row) for row in inputs])
+            results[sparse, 'time'] = (time.perf_counter() - start) / len(inputs)
+
+        diff = np.nanmax(np.abs(results[True] - results[False]))
+        print(f"{n_rules:5d} правил: все правила {results[False, 'time'] * 1e6:7.1f} мкс, "
+              f"разреженно {results[True, 'time'] * 1e6:6.1f} мкс "
+              f"(x{results[False, 'time'] / results[True, 'time']:.1f}), расхождение {diff:.1e}")
+
+
+def report_agreement(title, numeric, codes, reference, reference_codes):
+    """
+    Печатает расхождение оценок с эталоном Мамдани
+
+    :param title: название проверяемого вывода
+    :param numeric: проверяемые числовые оценки (NaN - не определена)
+    :param codes: проверяемые коды категорий
+    :param reference: эталонные числовые оценки
+    :param reference_codes: эталонные коды категорий
+    """
+    both = ~np.isnan(numeric) & ~np.isnan(reference)
+    errors = np.abs(numeric[both] - reference[both])
+    print(f"{title:24s}: расхождение макс. {errors.max():.3f}, среднее {errors.mean():.3f}, "
+          f"совпадение категорий {np.mean(codes == reference_codes):.1%}, "
+          f"неопределенных {int(np.isnan(numeric).sum())} (у Мамдани {int(np.isnan(reference).sum())})")
+
+
+def bench_sugeno(size):
+    """
+    Сравнивает вывод Сугено с выводом Мамдани по скорости и результату
+    на сетке 11x11x11; подбирает линейные заключения методом наименьших
+    квадратов и печатает их для раздела sugeno базы правил
+
+    :param size: количество случайных входов для замера скорости
+    """
+    mamdani = FuzzyGradeSystem()
+    sugeno = FuzzyGradeSystem(inference='sugeno')
+    grid = grid_inputs()
+    reference, reference_codes = mamdani.evaluate_batch(grid)
+
+    numeric, codes = sugeno.evaluate_batch(grid)
+    report_agreement("Сугено (центры термов)", numeric, codes, reference, reference_codes)
+
+    # Выход Сугено линеен по коэффициентам заключений: веса термов
+    # умножаются на [1, x1, ..., xn], и коэффициенты находятся через lstsq
+    model = sugeno.model
+    weights = model.accumulate(model.fire_rules(model.fuzzify(grid)))
+    total = weights.sum(axis=1, keepdims=True)
+    fit = (total[:, 0] > 0) & ~np.isnan(reference)
+    features = np.column_stack([np.ones(len(grid)), grid])
+    design = ((weights / np.where(total > 0, total, 1))[:, :, None] * features[:, None, :]).reshape(len(grid), -1)
+    coefs, *_ = np.linalg.lstsq(design[fit], reference[fit], rcond=None)
+    coefs = coefs.reshape(len(model.output_terms), -1)
+
+    sugeno_params = {term: list(row) for term, row in zip(model.output_terms, coefs)}
+    fitted = CompiledFuzzyModel([sugeno.quality, sugeno.accuracy, sugeno.deadline], sugeno.grade, sugeno.rules,
+                                inference='sugeno', sugeno_params=sugeno_params)
+    numeric, codes = fitted.evaluate_batch(grid)
+    report_agreement("Сугено (линейные)", numeric, codes, reference, reference_codes)
+    section = {term: {'const': round(row[0], 4), **{label: round(c, 4) for label, c in zip(model.input_labels, row[1:])}}
+               for term, row in zip(model.output_terms, coefs)}
+    print(f'"sugeno": {json.dumps(section, ensure_ascii=False)}')
+
+    inputs = np.random.default_rng(1).uniform(0, 10, (size, 3))
+    rows = [tuple(row) for row in inputs[:min(size, 20000)]]
+    for title, system in (("Мамдани", mamdani), ("Сугено", sugeno)):
+        start = time.perf_counter()
+        for row in rows:
+            system.model.evaluate(row)
+        scalar_rate = len(rows) / (time.perf_counter() - start)
+        start = time.perf_counter()
+        system.evaluate_batch(inputs)
+        batch_rate = size / (time.perf_counter() - start)
+        print(f"{title:8s}: evaluate {scalar_rate:8.0f} оценок/с, evaluate_batch {batch_rate:9.0f} оценок/с")
+
+
+def synthetic_results(count, students=1000, seed=0):
+    """
+    Генерирует записи истории в формате консольного приложения
+
+    :param count: количество записей
+    :param students: количество разных студентов
+    :param seed: зерно генератора случайных чисел
+    :return: генератор словарей записей в порядке возрастания даты
+    """
+    # Оценки берутся из таблицы для всех записей сразу
+    table = GradeLookupTable.build(FuzzyGradeSystem().model)
+    rng = np.random.default_rng(seed)
+    inputs = rng.integers(0, 11, (count, 3))
+    names = rng.integers(students, size=count)
+    numeric = table.numeric[tuple(inputs.T)]
+    codes = table.codes[tuple(inputs.T)]
+
+    start = datetime(2020, 1, 1)
+    for i in range(count):
+        quality, accuracy, deadline = inputs[i].tolist()
+        defined = codes[i] >= 0
+        yield {
+            'дата': (start + timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S'),
+            'студент': f"Студент {names[i]}",
+            'параметры': {'качество': quality, 'точность': accuracy, 'сроки': deadline},
+            'оценка': {
+                'числовая': float(numeric[i]) if defined else None,
+                'текстовая': CATEGORIES[codes[i]] if defined else 'ошибка вычисления',
+            },
+        }
+
+
+def bench_store(count, fsync_every):
+    """
+    Сравнивает перезапись массива JSON на каждое сохранение с дописыванием в журнал
+
+    :param count: количество сохраняемых записей
+    :param fsync_every: период fsync журнала (0 - только при закрытии)
+    """
+    records = list(synthetic_results(count))
+    with tempfile.TemporaryDirectory() as directory:
+        # Прежний способ: прочитать весь файл, добавить запись, записать файл заново
+        legacy_path = os.path.join(directory, 'results.json')
+        start = time.perf_counter()
+        for record in records:
+            data = []
+            if os.path.exists(legacy_path):
+                with open(legacy_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            data.append(record)
+            with open(legacy_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=4)
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ResultStore(os.path.join(directory, 'results.jsonl'), fsync_every=fsync_every) as store:
+            for record in records:
+                store.append(record)
+        appended = time.perf_counter() - start
+
+    print(f"перезапись JSON       : {legacy / count * 1e6:9.1f} мкс на запись, всего {legacy:.2f} с")
+    print(f"журнал (fsync каждые {fsync_every}): {appended / count * 1e6:9.1f} мкс на запись, всего {appended:.2f} с")
+
+
+def write_results_csv(path, records):
+    """
+    Записывает записи истории в формате utils.save_result_csv
+
+    :param path: файл CSV
+    :param records: записи в формате synthetic_results
+    """
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Дата', 'Студент', 'Качество', 'Точность', 'Сроки', 'Числовая оценка', 'Текстовая оценка'])
+        for record in records:
+            numeric_grade = record['оценка']['числовая']
+            writer.writerow([record['дата'], record['студент'], *record['параметры'].values(),
+                             numeric_grade if numeric_grade is not None else 'N/A', record['оценка']['текстовая']])
+
+
+def bench_csv(count):
+    """
+    Сравнивает загрузку results.csv в словари и в столбцы NumPy со сводками
+
+    :param count: количество строк CSV
+    """
+    from utils import load_results_csv
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'results.csv')
+        write_results_csv(path, synthetic_results(count))
+
+        start = time.perf_counter()
+        rows = load_results_csv(path)
+        grades = [row['оценка']['числовая'] for row in rows if row['оценка']['числовая'] is not None]
+        by_student = {}
+        for row in rows:
+            by_student.setdefault(row['студент'], []).append(row['оценка']['числовая'])
+        reference_mean = sum(grades) / len(grades)
+        dicts = time.perf_counter() - start
+        del rows, by_student
+
+        start = time.perf_counter()
+        columns = load_results_columns(path)
+        loaded = time.perf_counter() - start
+
+        start = time.perf_counter()
+        summary = summarize(columns)
+        students = student_summary(columns)
+        summarized = time.perf_counter() - start
+
+    print(f"словари (load_results_csv + сводка): {dicts:6.2f} с")
+    print(f"столбцы (load_results_columns)     : {loaded:6.2f} с")
+    print(f"сводки summarize + student_summary : {summarized * 1000:6.1f} мс "
+          f"({len(columns.names)} студентов)")
+    print(f"средняя оценка: {summary['means']['оценка']:.6f} (словари: {reference_mean:.6f}), "
+          f"категории: {summary['categories']}, ошибок: {summary['errors']}, "
+          f"оценок у студентов всего: {students['count'].sum()}")
+
+
+def bench_archive(count):
+    """
+    Замеряет архив результатов: импорт из CSV, размер, произвольный доступ и сводки
+
+    :param count: количество записей
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'results.csv')
+        write_results_csv(csv_path, synthetic_results(count))
+
+        archive = ResultArchive(os.path.join(directory, 'results.bin'))
+        start = time.perf_counter()
+        archive.import_csv(csv_path)
+        imported = time.perf_counter() - start
+
+        rng = np.random.default_rng(0)
+        positions = rng.integers(0, len(archive), 10000)
+        start = time.perf_counter()
+        for position in positions.tolist():
+            archive[position]
+        random_access = (time.perf_counter() - start) / positions.size
+
+        start = time.perf_counter()
+        columns = archive.columns()
+        summary = summarize(columns)
+        student_summary(columns)
+        summarized = time.perf_counter() - start
+
+        csv_size = os.path.getsize(csv_path)
+        archive_size = os.path.getsize(archive.path) + os.path.getsize(archive.names_path)
+
+    print(f"импорт из CSV       : {imported:6.2f} с ({count} записей)")
+    print(f"размер              : архив {archive_size / 2 ** 20:.1f} МБ, CSV {csv_size / 2 ** 20:.1f} МБ")
+    print(f"произвольная запись : {random_access * 1e6:6.1f} мкс")
+    print(f"сводки по архиву    : {summarized * 1000:6.1f} мс, категории: {summary['categories']}")
+
+
+def bench_index(count):
+    """
+    Замеряет поиск в журнале истории по студенту и по периоду через вторичный индекс
+
+    :param count: количество записей журнала
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'results.jsonl')
+        with open(path, 'wb') as f:
+            for record in synthetic_results(count):
+                f.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+
+        start = time.perf_counter()
+        update_keys(path)
+        built = time.perf_counter() - start
+
+        with HistoryReader(path) as history:
+            # Полный проход по журналу - как без индекса
+            start = time.perf_counter()
+            scanned = sum(1 for record in iter_records(path) if record['студент'] == 'Студент 7')
+            scan = time.perf_counter() - start
+
+            start = time.perf_counter()
+            numbers = history.find_student('Студент 7')
+            found = time.perf_counter() - start
+            start = time.perf_counter()
+            records = history.records(numbers)
+            read = time.perf_counter() - start
+
+            last = history.record(len(history) - 1)['дата'][:10]
+            start = time.perf_counter()
+            numbers = history.find_period(last, last)
+            period = time.perf_counter() - start
+
+    print(f"построение индекса   : {built:6.2f} с ({count} записей)")
+    print(f"проход по журналу    : {scan * 1000:8.1f} мс ({scanned} записей студента)")
+    print(f"поиск студента       : {found * 1000:8.1f} мс, чтение {len(records)} записей {read * 1000:.1f} мс")
+    print(f"поиск периода (день) : {period * 1000:8.3f} мс ({len(numbers)} записей)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры производительности системы оценки")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch_parser = subparsers.add_parser("batch", help="пакетный вывод против поэлементного")
+    batch_parser.add_argument("--size", type=int, default=100000, help="размер пакета")
+
+    engines_parser = subparsers.add_parser("engines", help="движки skfuzzy и compiled на одиночных вызовах")
+    engines_parser.add_argument("--size", type=int, default=1000, help="количество случайных входов")
+
+    table_parser = subparsers.add_parser("table", help="таблица оценок против точного вывода")
+    table_parser.add_argument("--size", type=int, default=10000, help="количество дробных входов")
+
+    threads_parser = subparsers.add_parser("threads", help="одновременная оценка из многих потоков")
+    threads_parser.add_argument("--threads", type=int, default=16, help="количество потоков")
+    threads_parser.add_argument("--size", type=int, default=5000, help="оценок на поток")
+
+    charts_parser = subparsers.add_parser("charts", help="построение графика результата")
+    charts_parser.add_argument("--size", type=int, default=100, help="количество графиков")
+
+    soak_parser = subparsers.add_parser("soak", help="длительное построение графиков с контролем памяти")
+    soak_parser.add_argument("--count", type=int, default=100000, help="количество графиков")
+    soak_parser.add_argument("--report-every", type=int, default=10000, help="период вывода памяти")
+    soak_parser.add_argument("--max-growth", type=float, default=50, help="допустимый рост памяти, МБ")
+
+    defuzz_parser = subparsers.add_parser("defuzz", help="точный центр тяжести против дискретного")
+    defuzz_parser.add_argument("--size", type=int, default=20000, help="количество случайных входов")
+
+    resolution_parser = subparsers.add_parser("resolution", help="профили точности универсума")
+    resolution_parser.add_argument("--size", type=int, default=20000, help="количество случайных входов")
+    resolution_parser.add_argument("--reference-step", type=float, default=0.001,
+                                   help="шаг универсума эталона")
+
+    rules_parser = subparsers.add_parser("rules", help="разреженный вывод при росте базы правил")
+    rules_parser.add_argument("--size", type=int, default=5000, help="количество случайных входов")
+    rules_parser.add_argument("--inputs", type=int, default=8, help="количество критериев")
+
+    sugeno_parser = subparsers.add_parser("sugeno", help="вывод Сугено против Мамдани")
+    sugeno_parser.add_argument("--size", type=int, default=100000, help="количество случайных входов")
+
+    store_parser = subparsers.add_parser("store", help="журнал JSON Lines против перезаписи results.json")
+    store_parser.add_argument("--count", type=int, default=1000, help="количество записей")
+    store_parser.add_argument("--fsync-every", type=int, default=1, help="период fsync журнала")
+
+    csv_parser = subparsers.add_parser("csv", help="загрузка results.csv в столбцы NumPy и сводки")
+    csv_parser.add_argument("--count", type=int, default=1000000, help="количество строк")
+
+    archive_parser = subparsers.add_parser("archive", help="двоичный архив результатов")
+    archive_parser.add_argument("--count", type=int, default=1000000, help="количество записей")
+
+    index_parser = subparsers.add_parser("index", help="поиск в истории по студенту и по периоду")
+    index_parser.add_argument("--count", type=int, default=1000000, help="количество записей")
+
+    args = parser.parse_args()
+
+    if args.command == "batch":
+        bench_batch(args.size)
+    elif args.command == "engines":
+        bench_engines(args.size)
+    elif args.command == "table":
+        bench_table(args.size)
+    elif args.command == "threads":
+        bench_threads(args.threads, args.size)
+    elif args.command == "charts":
+        bench_charts(args.size)
+    elif args.command == "soak":
+        # Рост памяти сверх порога - утечка фигур или графиков
+        if bench_soak(args.count, args.report_every, args.max_growth * 2 ** 20):
+            sys.exit(1)
+    elif args.command == "defuzz":
+        bench_defuzz(args.size)
+    elif args.command == "resolution":
+        bench_resolution(args.size, args.reference_step)
+    elif args.command == "rules":
+        bench_rules(args.size, args.inputs)
+    elif args.command == "sugeno":
+        bench_sugeno(args.size)
+    elif args.command == "store":
+        bench_store(args.count, args.fsync_every)
+    elif args.command == "csv":
+        bench_csv(args.count)
+    elif args.command == "archive":
+        bench_archive(args.count)
+    elif args.command == "index":
+        bench_index(args.count)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,10 @@ import sys
 from aiogram import Bot, Dispatcher
 from aiogram.fsm.storage.memory import MemoryStorage
 
-from bot.config import BOT_TOKEN, LOG_LEVEL
+from bot.config import BOT_TOKEN, LOG_LEVEL, RULES_RELOAD_INTERVAL
 from bot.database.database import init_models
 from bot.utils.commands import setup_bot_commands
+from bot.fuzzy_logic_adapter import shutdown_pool, load_file_ids, watch_rule_base, drain_background_tasks
 
 # Для Windows установим правильную политику событийного цикла
 if sys.platform.startswith('win'):
@@ -19,6 +20,8 @@ from bot.commands.visualize import router as visualize_router
 from bot.commands.history import router as history_router
 from bot.commands.tests import router as tests_router
 from bot.commands.stat import router as stat_router
+from bot.commands.prerender import router as prerender_router
+from bot.commands.need import router as need_router
 from bot.callbacks import grade_input_router, history_router as history_cb_router, menu_router
 
 # Настройка логирования
@@ -38,6 +41,8 @@ dp.include_router(visualize_router)
 dp.include_router(history_router)
 dp.include_router(tests_router)
 dp.include_router(stat_router)
+dp.include_router(prerender_router)
+dp.include_router(need_router)
 dp.include_router(grade_input_router)
 dp.include_router(history_cb_router)
 dp.include_router(menu_router)
@@ -47,6 +52,14 @@ async def main():
     logger.info("Инициализация базы данных...")
     await init_models()
     
+    # file_id графиков, уже загруженных в Telegram
+    await load_file_ids()
+    
+    # Подмена модели при изменении файла базы правил
+    watcher = None
+    if RULES_RELOAD_INTERVAL > 0:
+        watcher = asyncio.create_task(watch_rule_base(RULES_RELOAD_INTERVAL))
+    
     logger.info("Запуск бота...")
     bot = Bot(token=BOT_TOKEN)
     
@@ -59,7 +72,12 @@ async def main():
         await dp.start_polling(bot)
     finally:
         logger.info("Бот остановлен")
+        if watcher is not None:
+            watcher.cancel()
+        # Результаты, еще не сохраненные в базу данных, не теряются
+        await drain_background_tasks()
         await bot.session.close()
+        shutdown_pool()
 
 if __name__ == "__main__":
     # Запуск бота
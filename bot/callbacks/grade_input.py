@@ -1,11 +1,18 @@
+import asyncio
+
 from aiogram import Router, F
-from aiogram.types import CallbackQuery, BufferedInputFile
+from aiogram.types import CallbackQuery, Message
 from aiogram.fsm.context import FSMContext
 from aiogram.filters import StateFilter
 
 from bot.handlers.states import GradeStudent
 from bot.keyboards.grade_input import get_rating_keyboard
-from bot.fuzzy_logic_adapter import evaluate_student, get_result_visualization
+from bot.fuzzy_logic_adapter import (
+    evaluate_student, send_result_visualization, explain_result, deadline_preview, start_speculation,
+    background_tasks,
+    BUSY_TEXT, TIMEOUT_TEXT
+)
+from bot.utils.executor import WorkerBusyError
 
 router = Router()
 
@@ -39,12 +46,21 @@ async def process_accuracy_rating(callback: CallbackQuery, state: FSMContext):
     data = await state.get_data()
     quality = data.get("quality")
     
+    # Итоговая оценка для каждого значения сроков берется из таблицы оценок
+    # без ожидания; графики для вероятных значений строятся в фоне
+    grades = deadline_preview(quality, accuracy)
+    start_speculation(quality, accuracy, grades)
+    previews = None
+    if grades is not None:
+        previews = [f"{numeric:.1f}" if numeric is not None else "—" for numeric in grades]
+    
     # Переходим к следующему шагу - ввод сроков
     await callback.message.edit_text(
         f"✅ Качество выполнения: {quality}/10\n"
         f"✅ Точность результата: {accuracy}/10\n\n"
-        f"Теперь оцените соблюдение сроков (от 0 до 10):",
-        reply_markup=get_rating_keyboard("deadline")
+        f"Теперь оцените соблюдение сроков (от 0 до 10)"
+        + (", рядом указана итоговая оценка:" if previews else ":"),
+        reply_markup=get_rating_keyboard("deadline", previews)
     )
     await state.set_state(GradeStudent.waiting_for_deadline)
 
@@ -66,52 +82,72 @@ async def process_deadline_rating(callback: CallbackQuery, state: FSMContext):
     # Получаем telegram_id пользователя
     telegram_id = callback.from_user.id
     
-    # Выполняем оценку
-    numeric_grade, text_grade = await evaluate_student(
-        quality, 
-        accuracy, 
-        deadline, 
-        student_name,
-        telegram_id
-    )
+    # Выполняем оценку; при перегрузке состояние сохраняется,
+    # чтобы пользователь мог повторно нажать кнопку
+    try:
+        # Трассировка вывода нужна для объяснения и графика: вывод выполняется один раз
+        numeric_grade, text_grade, trace = await evaluate_student(
+            quality, 
+            accuracy, 
+            deadline, 
+            student_name,
+            telegram_id,
+            with_trace=True
+        )
+    except WorkerBusyError:
+        await callback.message.answer(BUSY_TEXT)
+        return
+    except asyncio.TimeoutError:
+        await callback.message.answer(TIMEOUT_TEXT)
+        return
     
     # Форматируем результат
+    grade_text = f"{numeric_grade:.2f}/10" if numeric_grade is not None else "не определена"
     result_text = (
         f"🎓 <b>Результат оценки для студента '{student_name}'</b>\n\n"
         f"📊 <b>Входные параметры:</b>\n"
         f"• Качество выполнения: {quality}/10\n"
         f"• Точность результата: {accuracy}/10\n"
         f"• Соблюдение сроков: {deadline}/10\n\n"
-        f"📈 <b>Итоговая оценка:</b> {numeric_grade:.2f}/10\n"
+        f"📈 <b>Итоговая оценка:</b> {grade_text}\n"
         f"📝 <b>Категория:</b> {text_grade.upper()}"
     )
     
+    # Объяснение: сильнее всего сработавшие правила
+    fired_rules = explain_result(trace)
+    if fired_rules:
+        result_text += "\n\n🔎 <b>Сработавшие правила:</b>\n" + "\n".join(
+            f"• {rule} ({strength:.2f})" for strength, rule in fired_rules
+        )
+    
+    # График строится и отправляется в фоне одновременно с отправкой текста;
+    # для входов, где оценка не определена, графика нет
+    if numeric_grade is not None:
+        background_tasks.spawn(
+            send_result_chart(callback.message, quality, accuracy, deadline, trace),
+            "отправка графика результата"
+        )
+    
+    # Завершаем процесс оценки
+    await state.clear()
+    
     # Отправляем результат
     await callback.message.edit_text(
         result_text,
         parse_mode="HTML"
     )
-    
+
+async def send_result_chart(message: Message, quality: int, accuracy: int, deadline: int, trace):
+    """Отправляет график результата, сообщая пользователю об ошибках"""
     try:
-        # Получаем визуализацию результата
-        visualization_buffer = await get_result_visualization(quality, accuracy, deadline)
-        
-        # Преобразуем BytesIO в BufferedInputFile
-        visualization_file = BufferedInputFile(
-            visualization_buffer.getvalue(),
-            filename="result_visualization.png"
-        )
-        
-        # Отправляем изображение с визуализацией
-        await callback.message.answer_photo(
-            visualization_file,
-            caption="📊 Визуализация процесса оценки с использованием нечеткой логики"
-        )
+        # Отправляем изображение с визуализацией (повторно - по file_id, без загрузки)
+        await send_result_visualization(message, quality, accuracy, deadline, trace)
+    except WorkerBusyError:
+        await message.answer(BUSY_TEXT)
+    except asyncio.TimeoutError:
+        await message.answer(TIMEOUT_TEXT)
     except Exception as e:
-        await callback.message.answer(f"Произошла ошибка при создании визуализации: {str(e)}")
-    
-    # Завершаем процесс оценки
-    await state.clear()
+        await message.answer(f"Произошла ошибка при создании визуализации: {str(e)}")
 
 @router.callback_query(F.data == "cancel_input")
 async def cancel_input(callback: CallbackQuery, state: FSMContext):
@@ -1,5 +1,7 @@
+import asyncio
+
 from aiogram import Router, F
-from aiogram.types import CallbackQuery, BufferedInputFile
+from aiogram.types import CallbackQuery
 from aiogram.fsm.context import FSMContext
 
 from bot.handlers.states import GradeStudent
@@ -8,7 +10,8 @@ from bot.keyboards.main_menu import get_main_menu
 from bot.keyboards.history import get_history_keyboard
 from bot.database.database import get_student_grades, get_or_create_student
 from bot.handlers.states import ViewHistory
-from bot.fuzzy_logic_adapter import get_visualization, evaluate_student
+from bot.fuzzy_logic_adapter import send_visualization, evaluate_student, BUSY_TEXT, TIMEOUT_TEXT
+from bot.utils.executor import WorkerBusyError
 
 router = Router()
 
@@ -41,20 +44,12 @@ async def handle_menu_callback(callback: CallbackQuery, state: FSMContext):
         await callback.message.answer("Подготовка визуализации функций принадлежности...")
         
         try:
-            # Получаем визуализацию
-            visualization_buffer = await get_visualization()
-            
-            # Преобразуем BytesIO в BufferedInputFile
-            visualization_file = BufferedInputFile(
-                visualization_buffer.getvalue(),
-                filename="visualization.png"
-            )
-            
-            # Отправляем изображение
-            await callback.message.answer_photo(
-                visualization_file,
-                caption="📊 Визуализация функций принадлежности для оценки знаний студентов"
-            )
+            # Отправляем изображение (повторно - по file_id, без загрузки)
+            await send_visualization(callback.message)
+        except WorkerBusyError:
+            await callback.message.answer(BUSY_TEXT)
+        except asyncio.TimeoutError:
+            await callback.message.answer(TIMEOUT_TEXT)
         except Exception as e:
             await callback.message.answer(f"Произошла ошибка при создании визуализации: {str(e)}")
         
@@ -121,12 +116,19 @@ async def handle_menu_callback(callback: CallbackQuery, state: FSMContext):
         
         for test in test_data:
             # Оцениваем знания
-            numeric_grade, text_grade = await evaluate_student(
-                test["quality"], 
-                test["accuracy"], 
-                test["deadline"],
-                f"Test Student {test['name']}"
-            )
+            try:
+                numeric_grade, text_grade = await evaluate_student(
+                    test["quality"], 
+                    test["accuracy"], 
+                    test["deadline"],
+                    f"Test Student {test['name']}"
+                )
+            except WorkerBusyError:
+                await callback.message.answer(BUSY_TEXT)
+                return
+            except asyncio.TimeoutError:
+                await callback.message.answer(TIMEOUT_TEXT)
+                return
             
             # Определяем успешность теста
             test_result = "✅ ПРОЙДЕН" if text_grade.lower() == test["expected"].lower() else "❌ НЕ ПРОЙДЕН"
@@ -154,6 +156,7 @@ async def handle_menu_callback(callback: CallbackQuery, state: FSMContext):
             "/grade - Оценить знания студента\n"
             "/visualize - Визуализировать функции принадлежности\n"
             "/history - Показать историю оценок\n"
+            "/need - Минимальный балл для нужной категории\n"
             "/tests - Запустить тесты\n"
             "/help - Показать эту справку\n\n"
             "<b>Как оценить знания студента:</b>\n"
@@ -5,5 +5,7 @@ from bot.commands.visualize import router as visualize_router
 from bot.commands.history import router as history_router
 from bot.commands.tests import router as tests_router
 from bot.commands.stat import router as stat_router
+from bot.commands.prerender import router as prerender_router
+from bot.commands.need import router as need_router
 
-__all__ = ["start_router", "grade_router", "visualize_router", "history_router", "tests_router", "stat_router"] 
\ No newline at end of file
+__all__ = ["start_router", "grade_router", "visualize_router", "history_router", "tests_router", "stat_router", "prerender_router", "need_router"] 
\ No newline at end of file
@@ -0,0 +1,77 @@
+import asyncio
+import math
+
+from aiogram import Router, types
+from aiogram.filters import Command, CommandObject
+
+from fuzzy_engine import CATEGORIES
+from fuzzy_logic import INPUT_LABELS
+from bot.fuzzy_logic_adapter import find_required_input, BUSY_TEXT, TIMEOUT_TEXT
+from bot.utils.executor import WorkerBusyError
+
+router = Router()
+
+# Названия входов для ответа: в условии и в родительном падеже
+INPUT_CONDITIONS = {
+    "качество": "качестве",
+    "точность": "точности",
+    "сроки": "соблюдении сроков",
+}
+INPUT_NAMES = {
+    "качество": "качества выполнения",
+    "точность": "точности результата",
+    "сроки": "соблюдения сроков",
+}
+
+USAGE_TEXT = (
+    "Использование: /need &lt;категория&gt; &lt;значение&gt; &lt;значение&gt; [вход]\n\n"
+    f"• категория: {', '.join(CATEGORIES)}\n"
+    f"• вход, значение которого ищется: {', '.join(INPUT_LABELS)} (по умолчанию сроки)\n"
+    "• значения остальных входов (0-10) указываются в порядке: качество, точность, сроки\n\n"
+    "Например, /need отличник 7 8 - какие нужны сроки при качестве 7 и точности 8."
+)
+
+@router.message(Command("need"))
+async def cmd_need(message: types.Message, command: CommandObject):
+    """
+    Обработчик команды /need - минимальное значение входа,
+    при котором студент попадает в нужную категорию
+    """
+    args = (command.args or "").lower().split()
+    free = args.pop() if len(args) == 4 else "сроки"
+    if len(args) != 3 or args[0] not in CATEGORIES or free not in INPUT_LABELS:
+        await message.answer(USAGE_TEXT, parse_mode="HTML")
+        return
+
+    target_category = args[0]
+    labels = [label for label in INPUT_LABELS if label != free]
+    try:
+        values = [float(value.replace(",", ".")) for value in args[1:]]
+    except ValueError:
+        await message.answer(USAGE_TEXT, parse_mode="HTML")
+        return
+    if not all(0 <= value <= 10 for value in values):
+        await message.answer("Значения входов должны быть в диапазоне от 0 до 10.")
+        return
+    fixed = dict(zip(labels, values))
+
+    try:
+        required = await find_required_input(target_category, fixed, free)
+    except WorkerBusyError:
+        await message.answer(BUSY_TEXT)
+        return
+    except asyncio.TimeoutError:
+        await message.answer(TIMEOUT_TEXT)
+        return
+
+    conditions = " и ".join(f"{INPUT_CONDITIONS[label]} {value:g}" for label, value in fixed.items())
+    if required is None:
+        await message.answer(
+            f"🚫 При {conditions} категория «{target_category}» недостижима "
+            f"ни при каком значении {INPUT_NAMES[free]}."
+        )
+    else:
+        await message.answer(
+            f"🎯 При {conditions} для категории «{target_category}» нужно значение "
+            f"{INPUT_NAMES[free]} не ниже {required:.2f} (из целых - {math.ceil(required - 1e-9)})."
+        )
@@ -0,0 +1,30 @@
+from aiogram import Router, types
+from aiogram.filters import Command
+
+from bot.config import ADMIN_IDS
+from bot.fuzzy_logic_adapter import start_prerender, get_result_image_cache_stats
+
+router = Router()
+
+@router.message(Command("prerender"))
+async def cmd_prerender(message: types.Message):
+    """
+    Обработчик команды /prerender - запускает фоновое построение
+    графиков результата для всех целочисленных входов
+    Доступно только администраторам
+    """
+    # Проверяем, является ли пользователь администратором
+    if message.from_user.id not in ADMIN_IDS:
+        await message.answer("⛔ У вас нет доступа к этой команде.")
+        return
+    
+    if start_prerender():
+        await message.answer(
+            "🖼 Запущено фоновое построение графиков результата.\n"
+            "Ход построения можно посмотреть командой /stat."
+        )
+    else:
+        progress = get_result_image_cache_stats()['prerender']
+        await message.answer(
+            f"⏳ Построение уже идет: {progress['done']}/{progress['total']}."
+        )
@@ -50,6 +50,7 @@ async def cmd_help(message: types.Message):
         "/grade - Оценить знания студента\n"
         "/visualize - Визуализировать функции принадлежности\n"
         "/history - Показать историю оценок\n"
+        "/need - Минимальный балл для нужной категории\n"
         "/tests - Запустить тесты\n"
         "/help - Показать эту справку\n\n"
         "<b>Как оценить знания студента:</b>\n"
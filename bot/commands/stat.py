@@ -5,6 +5,10 @@ from sqlalchemy import select, func
 from bot.database.database import async_session
 from bot.database.models import Student, GradeResult
 from bot.config import ADMIN_IDS
+from bot.fuzzy_logic_adapter import (
+    get_grade_cache_stats, get_pool_stats, get_image_cache_stats, get_result_image_cache_stats,
+    get_speculation_stats, get_background_stats
+)
 
 router = Router()
 
@@ -78,4 +82,68 @@ async def cmd_stat(message: types.Message):
         f"• 🟢 Отличники: {excellent_count} ({percent_excellent:.1f}% от всех оценок)"
     )
     
+    # Статистика кэша результатов оценки
+    cache_stats = get_grade_cache_stats()
+    if cache_stats is None:
+        stat_text += "\n\n⚡ <b>Кэш оценок:</b> отключен или ведется в процессах-обработчиках"
+    else:
+        stat_text += (
+            f"\n\n⚡ <b>Кэш оценок:</b>\n"
+            f"• Записей: {cache_stats['size']}/{cache_stats['maxsize']}\n"
+            f"• Попадания: {cache_stats['hits']} ({100 * cache_stats['hit_rate']:.1f}%)\n"
+            f"• Промахи: {cache_stats['misses']}\n"
+            f"• Вытеснения: {cache_stats['evictions']}"
+        )
+    
+    # Статистика кэша графиков
+    image_stats = get_image_cache_stats()
+    stat_text += (
+        f"\n\n🖼 <b>Кэш графиков:</b>\n"
+        f"• Записей в памяти: {image_stats['size']}/{image_stats['maxsize']}\n"
+        f"• Попадания: {image_stats['hits']} (с диска: {image_stats['disk_hits']})\n"
+        f"• Промахи: {image_stats['misses']}\n"
+        f"• Сохранено file_id: {image_stats['file_ids']}\n"
+        f"• Отправлено по file_id: {image_stats['file_id_hits']}, загружено: {image_stats['uploads']}"
+    )
+    
+    # Статистика кэша графиков результата
+    result_stats = get_result_image_cache_stats()
+    progress = result_stats['prerender']
+    stat_text += (
+        f"\n\n🎯 <b>Графики результата:</b>\n"
+        f"• Записей в памяти: {result_stats['size']}/{result_stats['maxsize']}\n"
+        f"• Попадания: {result_stats['hits']} ({100 * result_stats['hit_rate']:.1f}%, "
+        f"с диска: {result_stats['disk_hits']})\n"
+        f"• Промахи: {result_stats['misses']}\n"
+        f"• Фоновое построение: {'идет' if progress['running'] else 'не идет'}, "
+        f"{progress['done']}/{progress['total']} (построено {progress['rendered']}, "
+        f"пропущено {progress['skipped']}, ошибок {progress['failed']})"
+    )
+    
+    # Подсказки и графики, подготовленные при выборе сроков
+    speculation_stats = get_speculation_stats()
+    stat_text += (
+        f"\n\n🔮 <b>Подготовка при выборе сроков:</b>\n"
+        f"• Клавиатур с подсказками: {speculation_stats['previews']}\n"
+        f"• Запусков построения графиков: {speculation_stats['started']}\n"
+        f"• Графиков построено заранее: {speculation_stats['charts']}"
+    )
+    
+    # Состояние пула обработчиков
+    pool_stats = get_pool_stats()
+    stat_text += (
+        f"\n\n⚙️ <b>Пул обработчиков ({pool_stats['kind']}):</b>\n"
+        f"• Задач в работе: {pool_stats['pending']}/{pool_stats['max_pending']}\n"
+        f"• Отклонено при перегрузке: {pool_stats['rejected']}\n"
+        f"• Превышен таймаут: {pool_stats['timed_out']}"
+    )
+    
+    # Фоновые задачи: сохранение результатов и отправка графиков
+    background_stats = get_background_stats()
+    stat_text += (
+        f"\n\n🧵 <b>Фоновые задачи:</b>\n"
+        f"• Выполняется: {background_stats['running']}\n"
+        f"• Запущено: {background_stats['started']}, с ошибкой: {background_stats['failed']}"
+    )
+    
     await message.answer(stat_text, parse_mode="HTML") 
\ No newline at end of file
@@ -1,8 +1,11 @@
+import asyncio
+
 from aiogram import Router, types, F
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 
-from bot.fuzzy_logic_adapter import evaluate_student
+from bot.fuzzy_logic_adapter import evaluate_student, BUSY_TEXT, TIMEOUT_TEXT
+from bot.utils.executor import WorkerBusyError
 
 router = Router()
 
@@ -31,12 +34,19 @@ async def cmd_tests(message: types.Message, state: FSMContext):
     
     for test in test_data:
         # Оцениваем знания
-        numeric_grade, text_grade = await evaluate_student(
-            test["quality"], 
-            test["accuracy"], 
-            test["deadline"],
-            f"Test Student {test['name']}"
-        )
+        try:
+            numeric_grade, text_grade = await evaluate_student(
+                test["quality"], 
+                test["accuracy"], 
+                test["deadline"],
+                f"Test Student {test['name']}"
+            )
+        except WorkerBusyError:
+            await message.answer(BUSY_TEXT)
+            return
+        except asyncio.TimeoutError:
+            await message.answer(TIMEOUT_TEXT)
+            return
         
         # Определяем успешность теста
         test_result = "✅ ПРОЙДЕН" if text_grade == test["expected"] else "❌ НЕ ПРОЙДЕН"
@@ -1,9 +1,11 @@
+import asyncio
+
 from aiogram import Router, types, F
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
-from aiogram.types import BufferedInputFile
 
-from bot.fuzzy_logic_adapter import get_visualization
+from bot.fuzzy_logic_adapter import send_visualization, BUSY_TEXT, TIMEOUT_TEXT
+from bot.utils.executor import WorkerBusyError
 
 router = Router()
 
@@ -20,19 +22,11 @@ async def cmd_visualize(message: types.Message, state: FSMContext):
     await message.answer("Подготовка визуализации функций принадлежности...")
     
     try:
-        # Получаем визуализацию
-        visualization_buffer = await get_visualization()
-        
-        # Преобразуем BytesIO в BufferedInputFile
-        visualization_file = BufferedInputFile(
-            visualization_buffer.getvalue(),
-            filename="visualization.png"
-        )
-        
-        # Отправляем изображение
-        await message.answer_photo(
-            visualization_file,
-            caption="📊 Визуализация функций принадлежности для оценки знаний студентов"
-        )
+        # Отправляем изображение (повторно - по file_id, без загрузки)
+        await send_visualization(message)
+    except WorkerBusyError:
+        await message.answer(BUSY_TEXT)
+    except asyncio.TimeoutError:
+        await message.answer(TIMEOUT_TEXT)
     except Exception as e:
         await message.answer(f"Произошла ошибка при создании визуализации: {str(e)}") 
\ No newline at end of file
@@ -21,6 +21,44 @@ ASYNC_DATABASE_URL = f"postgresql+psycopg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PO
 # Настройки логирования
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
+# Файл таблицы заранее вычисленных оценок (пустое значение - не сохранять на диск)
+LOOKUP_TABLE_PATH = os.getenv("LOOKUP_TABLE_PATH", "grade_table.npz")
+
+# Размер кэша результатов оценки (0 - кэш отключен) и точность округления входов
+GRADE_CACHE_SIZE = int(os.getenv("GRADE_CACHE_SIZE", "1024"))
+GRADE_CACHE_PRECISION = int(os.getenv("GRADE_CACHE_PRECISION", "2"))
+
+# Дефаззификация: sampled - по точкам универсума, как в skfuzzy;
+# exact - точный центр тяжести по параметрам функций принадлежности
+GRADE_DEFUZZIFICATION = os.getenv("GRADE_DEFUZZIFICATION", "sampled")
+
+# Файл базы правил (пусто - rule_base.json из репозитория) и период
+# проверки его изменений в секундах (0 - не отслеживать)
+RULES_PATH = os.getenv("RULES_PATH", "")
+RULES_RELOAD_INTERVAL = float(os.getenv("RULES_RELOAD_INTERVAL", "5"))
+
+# Профиль точности универсумов: chat (шаг 1), standard (0.1) или audit (0.01)
+GRADE_RESOLUTION = os.getenv("GRADE_RESOLUTION", "chat")
+
+# Пул обработчиков для оценки и построения графиков:
+# тип (thread - потоки, process - процессы), количество обработчиков,
+# предельное число задач в очереди и таймаут задачи в секундах
+GRADING_EXECUTOR = os.getenv("GRADING_EXECUTOR", "thread")
+GRADING_WORKERS = int(os.getenv("GRADING_WORKERS", "4"))
+GRADING_QUEUE_SIZE = int(os.getenv("GRADING_QUEUE_SIZE", "32"))
+GRADING_TIMEOUT = float(os.getenv("GRADING_TIMEOUT", "10"))
+
+# Каталог для хранения готовых графиков на диске (пустое значение - только в памяти)
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", "")
+
+# Количество графиков результата в памяти: при целочисленных входах
+# их не больше 11 * 11 * 11 = 1331 на версию модели
+RESULT_IMAGE_CACHE_SIZE = int(os.getenv("RESULT_IMAGE_CACHE_SIZE", "1331"))
+
+# Количество графиков результата, которые строятся заранее, пока пользователь
+# выбирает сроки (для самых вероятных значений; 0 - не строить)
+SPECULATIVE_CHARTS = int(os.getenv("SPECULATIVE_CHARTS", "3"))
+
 # ID администраторов (список Telegram ID)
 ADMIN_IDS = [int(admin_id) for admin_id in os.getenv("ADMIN_IDS", "").split(",") if admin_id]
 
@@ -3,7 +3,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.sql import select, insert, update, delete
 
 from bot.config import ASYNC_DATABASE_URL
-from bot.database.models import Base, Student, GradeResult
+from bot.database.models import Base, Student, GradeResult, TelegramFile
 
 # Создаем движок базы данных
 engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
@@ -56,6 +56,33 @@ async def save_grade_result(student_id, quality, accuracy, deadline, numeric_gra
         await session.refresh(grade_result)
         return grade_result
 
+async def save_student_grade(telegram_id, username, quality, accuracy, deadline, numeric_grade, text_grade):
+    """
+    Сохранение результата оценки с созданием студента при необходимости
+
+    В отличие от get_or_create_student и save_grade_result, выполняется
+    в одной сессии и одной транзакции.
+    """
+    async with async_session() as session:
+        query = select(Student.id).where(Student.telegram_id == telegram_id)
+        student_id = (await session.execute(query)).scalar_one_or_none()
+        
+        if student_id is None:
+            student = Student(telegram_id=telegram_id, username=username)
+            session.add(student)
+            await session.flush()
+            student_id = student.id
+        
+        session.add(GradeResult(
+            student_id=student_id,
+            quality=quality,
+            accuracy=accuracy,
+            deadline=deadline,
+            numeric_grade=numeric_grade,
+            text_grade=text_grade
+        ))
+        await session.commit()
+
 async def get_student_grades(student_id, limit=10):
     """Получение истории оценок студента"""
     async with async_session() as session:
@@ -66,4 +93,39 @@ async def get_student_grades(student_id, limit=10):
             .limit(limit)
         )
         result = await session.execute(query)
-        return result.scalars().all() 
\ No newline at end of file
+        return result.scalars().all() 
+
+async def get_telegram_file_ids():
+    """Получение всех сохраненных file_id изображений"""
+    async with async_session() as session:
+        result = await session.execute(select(TelegramFile.cache_key, TelegramFile.file_id))
+        return {cache_key: file_id for cache_key, file_id in result}
+
+async def save_telegram_file_id(cache_key, file_id, fingerprint):
+    """Сохранение file_id загруженного изображения"""
+    async with async_session() as session:
+        query = select(TelegramFile).where(TelegramFile.cache_key == cache_key)
+        result = await session.execute(query)
+        telegram_file = result.scalar_one_or_none()
+        
+        if telegram_file:
+            telegram_file.file_id = file_id
+            telegram_file.fingerprint = fingerprint
+        else:
+            session.add(TelegramFile(cache_key=cache_key, file_id=file_id, fingerprint=fingerprint))
+        await session.commit()
+
+async def delete_telegram_file_id(cache_key):
+    """Удаление file_id изображения"""
+    async with async_session() as session:
+        await session.execute(delete(TelegramFile).where(TelegramFile.cache_key == cache_key))
+        await session.commit()
+
+async def delete_stale_telegram_file_ids(fingerprints):
+    """Удаление file_id изображений, построенных по другим версиям модели"""
+    async with async_session() as session:
+        result = await session.execute(
+            delete(TelegramFile).where(TelegramFile.fingerprint.not_in(list(fingerprints)))
+        )
+        await session.commit()
+        return result.rowcount
@@ -0,0 +1,34 @@
+"""Add telegram_files
+
+Revision ID: 3f1c2a7d9e4b
+Revises: b0689c234646
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a7d9e4b'
+down_revision = 'b0689c234646'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('telegram_files',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cache_key', sa.String(), nullable=False),
+    sa.Column('file_id', sa.String(), nullable=False),
+    sa.Column('fingerprint', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('cache_key')
+    )
+    op.create_index(op.f('ix_telegram_files_fingerprint'), 'telegram_files', ['fingerprint'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_telegram_files_fingerprint'), table_name='telegram_files')
+    op.drop_table('telegram_files')
@@ -35,4 +35,17 @@ class GradeResult(Base):
     
     def __repr__(self):
         return f"<GradeResult id={self.id}, student_id={self.student_id}, " \
-               f"numeric_grade={self.numeric_grade}, text_grade={self.text_grade}>" 
\ No newline at end of file
+               f"numeric_grade={self.numeric_grade}, text_grade={self.text_grade}>" 
+
+class TelegramFile(Base):
+    """Модель загруженного в Telegram изображения"""
+    __tablename__ = "telegram_files"
+    
+    id = Column(Integer, primary_key=True)
+    cache_key = Column(String, unique=True, nullable=False)
+    file_id = Column(String, nullable=False)
+    fingerprint = Column(String, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.now)
+    
+    def __repr__(self):
+        return f"<TelegramFile id={self.id}, cache_key={self.cache_key}>"
@@ -1,88 +1,458 @@
+import asyncio
 import io
-from typing import Tuple
+import itertools
+import math
+from typing import List, Optional, Tuple
 
-import matplotlib.pyplot as plt
+from aiogram.types import Message
 
-from fuzzy_logic import FuzzyGradeSystem
-from bot.database.database import save_grade_result, get_or_create_student
+from charts import CHART_VERSION
+from bot import grading_worker
+from bot.config import (
+    LOOKUP_TABLE_PATH, GRADE_CACHE_SIZE, GRADE_CACHE_PRECISION, GRADE_DEFUZZIFICATION, GRADE_RESOLUTION,
+    GRADING_EXECUTOR, GRADING_WORKERS, GRADING_QUEUE_SIZE, GRADING_TIMEOUT, IMAGE_CACHE_DIR,
+    RESULT_IMAGE_CACHE_SIZE, RULES_PATH, SPECULATIVE_CHARTS
+)
+from bot.database.database import save_student_grade
+from bot.utils.background import BackgroundTasks
+from bot.utils.executor import WorkerPool, WorkerBusyError
+from bot.utils.image_cache import ImageCache
+from bot.utils.file_ids import FileIdCache, send_cached_photo
 
-# Создаем экземпляр системы нечеткой логики
-fuzzy_system = FuzzyGradeSystem()
+# Сообщения для пользователя при перегрузке пула обработчиков
+BUSY_TEXT = "⏳ Сервер занят, попробуйте еще раз через несколько секунд."
+TIMEOUT_TEXT = "⌛ Превышено время ожидания ответа, попробуйте еще раз."
 
-async def evaluate_student(quality: float, accuracy: float, deadline: float, student_name: str, telegram_id: int = None) -> Tuple[float, str]:
+# Параметры системы нечеткой логики: входы бота целочисленные,
+# поэтому оценки отдаются из заранее вычисленной таблицы
+FUZZY_SYSTEM_OPTIONS = {
+    "use_lookup_table": True,
+    "lookup_table_path": LOOKUP_TABLE_PATH or None,
+    "cache_size": GRADE_CACHE_SIZE or None,
+    "cache_precision": GRADE_CACHE_PRECISION,
+    "defuzzification": GRADE_DEFUZZIFICATION,
+    "resolution": GRADE_RESOLUTION,
+    "rules_path": RULES_PATH or None,
+}
+
+# Система нечеткой логики основного процесса: выполняет оценку в пуле потоков
+# и дает отпечаток модели для ключей кэша графиков
+grading_worker.init_worker(FUZZY_SYSTEM_OPTIONS)
+fuzzy_system = grading_worker.fuzzy_system
+
+# Пул обработчиков: оценка и построение графиков не блокируют событийный цикл
+grading_pool = WorkerPool(
+    kind=GRADING_EXECUTOR,
+    max_workers=GRADING_WORKERS,
+    max_pending=GRADING_QUEUE_SIZE,
+    timeout=GRADING_TIMEOUT,
+    initializer=grading_worker.init_worker,
+    initargs=(FUZZY_SYSTEM_OPTIONS,)
+)
+
+# Готовые графики: зависят только от модели и входов, поэтому строятся один раз
+image_cache = ImageCache(directory=IMAGE_CACHE_DIR or None)
+
+# Графики результата: по одному на тройку входов и версию модели
+result_image_cache = ImageCache(maxsize=RESULT_IMAGE_CACHE_SIZE, directory=IMAGE_CACHE_DIR or None)
+
+# Фоновое построение всех графиков результата
+_prerender_task: Optional[asyncio.Task] = None
+_prerender_progress = {"done": 0, "rendered": 0, "skipped": 0, "failed": 0, "total": 0}
+
+# Подсказки на клавиатуре сроков и графики, построенные заранее,
+# пока пользователь выбирает сроки
+_speculation_stats = {"previews": 0, "started": 0, "charts": 0}
+
+# Фоновые задачи: сохранение результатов, отправка и заблаговременное
+# построение графиков
+background_tasks = BackgroundTasks()
+
+# file_id уже загруженных в Telegram графиков
+file_id_cache = FileIdCache()
+
+# Подписи к графикам
+VISUALIZATION_CAPTION = "📊 Визуализация функций принадлежности для оценки знаний студентов"
+RESULT_VISUALIZATION_CAPTION = "📊 Визуализация процесса оценки с использованием нечеткой логики"
+
+async def evaluate_student(quality: float, accuracy: float, deadline: float, student_name: str,
+                           telegram_id: int = None, with_trace: bool = False) -> tuple:
     """
     Оценивает знания студента и сохраняет результат в базу данных
     
+    Сохранение выполняется в фоне: результат возвращается сразу после вывода,
+    ошибки сохранения выводятся в журнал.
+    
     :param quality: качество выполнения работы (0-10)
     :param accuracy: точность полученного результата (0-10)
     :param deadline: соблюдение сроков (0-10)
     :param student_name: имя студента
     :param telegram_id: идентификатор пользователя в Telegram
-    :return: (числовая_оценка, текстовая_оценка)
+    :param with_trace: вернуть также трассировку вывода для графика и объяснения
+    :return: (числовая_оценка, текстовая_оценка),
+             при with_trace - (числовая_оценка, текстовая_оценка, трассировка)
+    :raises WorkerBusyError: пул обработчиков перегружен
+    :raises asyncio.TimeoutError: оценка не завершилась вовремя
     """
     # Выполняем оценку
-    numeric_grade, text_grade = fuzzy_system.evaluate(quality, accuracy, deadline)
+    trace = None
+    if with_trace:
+        numeric_grade, text_grade, trace = await grading_pool.run(
+            grading_worker.evaluate_with_trace, quality, accuracy, deadline
+        )
+    else:
+        numeric_grade, text_grade = await grading_pool.run(grading_worker.evaluate, quality, accuracy, deadline)
     
     # Если telegram_id указан, сохраняем результат
     if telegram_id:
-        try:
-            # Получаем или создаем студента
-            student = await get_or_create_student(
+        background_tasks.spawn(
+            save_student_grade(
                 telegram_id=telegram_id,
-                username=student_name
-            )
-            
-            # Сохраняем результат
-            await save_grade_result(
-                student_id=student.id,
+                username=student_name,
                 quality=quality,
                 accuracy=accuracy,
                 deadline=deadline,
                 numeric_grade=numeric_grade,
                 text_grade=text_grade
-            )
-        except Exception as e:
-            print(f"Ошибка при сохранении результата в базу данных: {e}")
+            ),
+            "сохранение результата в базу данных"
+        )
     
+    if with_trace:
+        return numeric_grade, text_grade, trace
     return numeric_grade, text_grade
 
-async def get_visualization() -> io.BytesIO:
+def deadline_preview(quality: float, accuracy: float) -> Optional[List[Optional[float]]]:
     """
-    Получает визуализацию функций принадлежности
+    Возвращает итоговые оценки для всех значений сроков из таблицы оценок
     
-    :return: BytesIO с изображением
+    Строка таблицы читается без вывода и без обращения к пулу обработчиков,
+    поэтому подсказки не задерживают ответ.
+    
+    :param quality: качество выполнения работы (0-10)
+    :param accuracy: точность полученного результата (0-10)
+    :return: список оценок для сроков 0..10 (None - оценка не определена)
+             или None, если входы не целые или таблица для текущей модели
+             еще не построена
+    """
+    table = fuzzy_system.lookup_table
+    if table is None or table.fingerprint != fuzzy_system.model.fingerprint \
+            or quality not in range(11) or accuracy not in range(11):
+        return None
+    _speculation_stats["previews"] += 1
+    return [None if math.isnan(numeric) else float(numeric)
+            for numeric in table.numeric[int(quality), int(accuracy)]]
+
+def start_speculation(quality: float, accuracy: float, previews: Optional[list] = None):
+    """
+    Запускает в фоне построение графиков результата для SPECULATIVE_CHARTS
+    самых вероятных значений сроков
+    
+    :param quality: качество выполнения работы (0-10)
+    :param accuracy: точность полученного результата (0-10)
+    :param previews: оценки из deadline_preview: графики для сроков
+                     с неопределенной оценкой не строятся
+    """
+    if SPECULATIVE_CHARTS <= 0:
+        return
+    _speculation_stats["started"] += 1
+    background_tasks.spawn(_warm_likely_charts(quality, accuracy, previews),
+                           "построение графиков для вероятных сроков")
+
+async def _warm_likely_charts(quality: float, accuracy: float, previews: Optional[list]):
+    """
+    Строит графики результата для самых вероятных значений сроков
+    
+    Вероятными считаются значения, ближайшие к среднему качества и точности:
+    оценки одного студента по разным критериям обычно близки. Трассировка
+    вывода строится обработчиком вместе с графиком. Построение прекращается,
+    если пул обработчиков занят, - оно не должно задерживать обычные запросы.
+    """
+    center = (quality + accuracy) / 2
+    for deadline in sorted(range(11), key=lambda value: abs(value - center))[:SPECULATIVE_CHARTS]:
+        key = result_visualization_key(quality, accuracy, deadline)
+        if (previews is not None and previews[deadline] is None) or result_image_cache.warm(key):
+            continue
+        try:
+            png = await grading_pool.run(grading_worker.render_result_visualization, quality, accuracy, deadline)
+        except (WorkerBusyError, asyncio.TimeoutError):
+            return
+        except ValueError:
+            # Оценка для этих входов не определена
+            continue
+        result_image_cache.put(key, png)
+        _speculation_stats["charts"] += 1
+
+def get_speculation_stats() -> dict:
+    """
+    Возвращает счетчики подсказок и заблаговременного построения графиков
+    
+    :return: словарь: previews - клавиатур сроков с подсказками, started -
+             запусков построения графиков, charts - построено графиков заранее
+    """
+    return dict(_speculation_stats)
+
+async def find_required_input(target_category: str, fixed: dict, free: str = "сроки") -> Optional[float]:
+    """
+    Находит минимальное значение входа, при котором студент попадает
+    в категорию target_category или выше
+    
+    :param target_category: категория (троечник, хорошист, отличник)
+    :param fixed: значения остальных входов {переменная: значение}
+    :param free: вход, значение которого ищется
+    :return: значение входа (0-10) или None, если категория недостижима
+    :raises ValueError: неизвестная категория или переменная
+    :raises WorkerBusyError: пул обработчиков перегружен
+    :raises asyncio.TimeoutError: поиск не завершился вовремя
+    """
+    return await grading_pool.run(grading_worker.required_input, target_category, fixed, free)
+
+def explain_result(trace, limit: int = 3) -> List[Tuple[float, str]]:
+    """
+    Перечисляет сильнее всего сработавшие правила по трассировке вывода
+    
+    :param trace: трассировка из evaluate_student(..., with_trace=True)
+    :param limit: максимальное количество правил
+    :return: список кортежей (степень срабатывания, текст правила); пустой,
+             если модель изменилась после вывода
+    """
+    model = fuzzy_system.model
+    if trace is None or trace.fingerprint != model.fingerprint:
+        return []
+    return model.explain(trace, limit)
+
+def get_grade_cache_stats() -> Optional[dict]:
+    """
+    Возвращает статистику кэша результатов оценки
+    
+    :return: словарь со счетчиками кэша или None, если кэш отключен
+             или ведется в процессах-обработчиках
+    """
+    if grading_pool.kind != "thread" or fuzzy_system.cache is None:
+        return None
+    return fuzzy_system.cache.stats()
+
+def get_image_cache_stats() -> dict:
+    """
+    Возвращает статистику кэша готовых графиков
+    
+    :return: словарь со счетчиками кэша
+    """
+    stats = image_cache.stats()
+    file_id_stats = file_id_cache.stats()
+    stats['file_ids'] = file_id_stats['size']
+    stats['file_id_hits'] = file_id_stats['hits']
+    stats['uploads'] = file_id_stats['uploads']
+    return stats
+
+def get_result_image_cache_stats() -> dict:
+    """
+    Возвращает статистику кэша графиков результата и ход их фонового построения
+    
+    :return: словарь со счетчиками кэша и ключом prerender
     """
-    # Визуализируем функции принадлежности
-    fig = fuzzy_system.visualize()
+    stats = result_image_cache.stats()
+    stats['prerender'] = {**_prerender_progress, "running": is_prerender_running()}
+    return stats
+
+def get_pool_stats() -> dict:
+    """
+    Возвращает состояние пула обработчиков
     
-    # Сохраняем в буфер
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png')
-    buf.seek(0)
+    :return: словарь с типом пула и счетчиками задач
+    """
+    return grading_pool.stats()
+
+def get_background_stats() -> dict:
+    """
+    Возвращает счетчики фоновых задач
     
-    # Закрываем фигуру
-    plt.close(fig)
+    :return: словарь: running, started, failed
+    """
+    return background_tasks.stats()
+
+async def drain_background_tasks(timeout: float = 10.0):
+    """
+    Дожидается фоновых задач (например, сохранения результатов) перед остановкой
     
-    return buf
+    :param timeout: время ожидания в секундах
+    """
+    await background_tasks.drain(timeout)
+
+def shutdown_pool():
+    """Останавливает пул обработчиков"""
+    grading_pool.shutdown()
+
+def visualization_key() -> str:
+    """Ключ графика функций принадлежности: зависит только от них и от оформления"""
+    return f"membership:v{CHART_VERSION}:{fuzzy_system.model.membership_fingerprint}"
+
+def result_visualization_key(quality: float, accuracy: float, deadline: float) -> str:
+    """Ключ графика результата: зависит от модели, входов и оформления"""
+    return f"result:v{CHART_VERSION}:{fuzzy_system.model.fingerprint}:{float(quality):g}:{float(accuracy):g}:{float(deadline):g}"
+
+def model_fingerprints() -> set:
+    """Отпечатки текущей модели, входящие в ключи графиков"""
+    model = fuzzy_system.model
+    return {model.membership_fingerprint, model.fingerprint}
+
+def key_fingerprint(key: str) -> str:
+    """Отпечаток модели из ключа графика (см. visualization_key)"""
+    return key.split(":")[2]
 
-async def get_result_visualization(quality: float, accuracy: float, deadline: float) -> io.BytesIO:
+async def load_file_ids():
+    """Загружает file_id графиков, построенных по текущей модели"""
+    await file_id_cache.load(model_fingerprints())
+
+async def invalidate_stale_images() -> int:
+    """
+    Удаляет графики и file_id, построенные по другим версиям модели
+
+    График функций принадлежности сохраняется, если изменились только правила.
+
+    :return: количество удаленных из памяти графиков
+    """
+    fingerprints = model_fingerprints()
+    stale = lambda key: key_fingerprint(key) not in fingerprints
+    removed = image_cache.purge(stale) + result_image_cache.purge(stale)
+    await file_id_cache.load(fingerprints)
+    return removed
+
+async def watch_rule_base(interval: float):
+    """
+    Следит за файлом базы правил и при изменении подменяет модель
+
+    Модель перечитывается в отдельном потоке; процессы пула обработчиков
+    перечитывают ее сами перед очередной задачей. Кэши графиков
+    очищаются, когда меняется отпечаток модели, - в том числе если
+    модель уже обновил обработчик в этом процессе.
+
+    :param interval: период проверки, с
+    """
+    fingerprints = model_fingerprints()
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(grading_worker.sync_rule_base)
+        if model_fingerprints() != fingerprints:
+            # Таблица оценок основного процесса нужна для подсказок на клавиатуре
+            await asyncio.to_thread(fuzzy_system.get_lookup_table)
+            removed = await invalidate_stale_images()
+            fingerprints = model_fingerprints()
+            print(f"База правил перезагружена: модель {fuzzy_system.model.fingerprint[:12]}, "
+                  f"удалено графиков: {removed}")
+
+async def send_visualization(message: Message) -> Message:
+    """
+    Отправляет график функций принадлежности, по возможности без повторной загрузки
+    
+    :param message: сообщение, в ответ на которое отправляется график
+    :return: отправленное сообщение
+    """
+    return await send_cached_photo(
+        message, file_id_cache, visualization_key(), fuzzy_system.model.membership_fingerprint,
+        get_visualization, "visualization.png", VISUALIZATION_CAPTION
+    )
+
+async def send_result_visualization(message: Message, quality: float, accuracy: float, deadline: float,
+                                   trace=None) -> Message:
+    """
+    Отправляет график результата оценки, по возможности без повторной загрузки
+    
+    :param message: сообщение, в ответ на которое отправляется график
+    :param quality: качество выполнения работы (0-10)
+    :param accuracy: точность полученного результата (0-10)
+    :param deadline: соблюдение сроков (0-10)
+    :param trace: трассировка из evaluate_student (None - выполнить вывод заново)
+    :return: отправленное сообщение
+    """
+    return await send_cached_photo(
+        message, file_id_cache, result_visualization_key(quality, accuracy, deadline),
+        fuzzy_system.model.fingerprint,
+        lambda: get_result_visualization(quality, accuracy, deadline, trace),
+        "result_visualization.png", RESULT_VISUALIZATION_CAPTION
+    )
+
+async def get_visualization() -> io.BytesIO:
+    """
+    Получает визуализацию функций принадлежности
+    
+    :return: BytesIO с изображением
+    :raises WorkerBusyError: пул обработчиков перегружен
+    :raises asyncio.TimeoutError: построение не завершилось вовремя
+    """
+    png = image_cache.get(visualization_key())
+    if png is None:
+        png = await grading_pool.run(grading_worker.render_visualization)
+        image_cache.put(visualization_key(), png)
+    return io.BytesIO(png)
+
+async def get_result_visualization(quality: float, accuracy: float, deadline: float, trace=None) -> io.BytesIO:
     """
     Получает визуализацию результата оценки
     
     :param quality: качество выполнения работы (0-10)
     :param accuracy: точность полученного результата (0-10)
     :param deadline: соблюдение сроков (0-10)
+    :param trace: трассировка из evaluate_student (None - выполнить вывод заново)
     :return: BytesIO с изображением
+    :raises WorkerBusyError: пул обработчиков перегружен
+    :raises asyncio.TimeoutError: построение не завершилось вовремя
     """
-    # Визуализируем результат
-    fig = fuzzy_system.visualize_result(quality, accuracy, deadline)
+    key = result_visualization_key(quality, accuracy, deadline)
+    png = result_image_cache.get(key)
+    if png is None:
+        png = await grading_pool.run(grading_worker.render_result_visualization, quality, accuracy, deadline, trace)
+        result_image_cache.put(key, png)
+    return io.BytesIO(png)
+
+async def prerender_result_visualizations(retry_delay: float = 0.5):
+    """
+    Строит графики результата для всех целочисленных входов, которых еще нет в кэше
     
-    # Сохраняем в буфер
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png')
-    buf.seek(0)
+    Графики строятся по одному, поэтому занимают не больше одного места в пуле
+    обработчиков; при перегрузке пула построение ждет и повторяет попытку.
+    Оценка входов тоже выполняется в пуле: событийный цикл не занят выводом.
     
-    # Закрываем фигуру
-    plt.close(fig)
+    :param retry_delay: пауза перед повтором при перегрузке пула, с
+    """
+    values = range(11)
+    _prerender_progress.update(done=0, rendered=0, skipped=0, failed=0, total=len(values) ** 3)
+
+    for quality, accuracy, deadline in itertools.product(values, values, values):
+        key = result_visualization_key(quality, accuracy, deadline)
+
+        while not result_image_cache.warm(key):
+            try:
+                png = await grading_pool.run(grading_worker.prerender_result_visualization,
+                                             quality, accuracy, deadline)
+            except WorkerBusyError:
+                await asyncio.sleep(retry_delay)
+                continue
+            except Exception as e:
+                print(f"Ошибка при построении графика ({quality}, {accuracy}, {deadline}): {e}")
+                _prerender_progress["failed"] += 1
+                break
+
+            # Для входов, где оценка не определена, график не строится
+            if png is None:
+                _prerender_progress["skipped"] += 1
+                break
+            result_image_cache.put(key, png)
+            _prerender_progress["rendered"] += 1
+        _prerender_progress["done"] += 1
+
+def is_prerender_running() -> bool:
+    """Проверяет, идет ли фоновое построение графиков результата"""
+    return _prerender_task is not None and not _prerender_task.done()
+
+def start_prerender() -> bool:
+    """
+    Запускает фоновое построение графиков результата
     
-    return buf 
\ No newline at end of file
+    :return: False, если построение уже идет
+    """
+    global _prerender_task
+    if is_prerender_running():
+        return False
+    _prerender_task = asyncio.create_task(prerender_result_visualizations())
+    return True
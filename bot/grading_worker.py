@@ -0,0 +1,114 @@
+# Функции оценки и построения графиков, выполняемые в пуле обработчиков.
+# Модуль не зависит от aiogram и базы данных, чтобы его можно было
+# импортировать в дочерних процессах пула.
+from fuzzy_logic import FuzzyGradeSystem
+
+# Экземпляр системы нечеткой логики текущего процесса
+fuzzy_system = None
+
+
+def init_worker(options: dict):
+    """
+    Создает систему нечеткой логики в процессе-обработчике
+
+    Повторный вызов в том же процессе (в том числе в процессе, полученном
+    через fork от уже подготовленного) ничего не делает.
+
+    :param options: аргументы конструктора FuzzyGradeSystem
+    """
+    global fuzzy_system
+    if fuzzy_system is not None:
+        return
+    fuzzy_system = FuzzyGradeSystem(**options)
+
+    # Таблица оценок строится заранее, а не при первом запросе
+    if fuzzy_system.use_lookup_table:
+        fuzzy_system.get_lookup_table()
+
+
+def sync_rule_base():
+    """
+    Перечитывает базу правил, если ее файл изменился
+
+    Вызывается перед каждой задачей: каждый процесс пула держит свою модель,
+    и проверка (один вызов stat) обновляет ее без перезапуска пула. При
+    ошибке в файле продолжает работать прежняя модель.
+    """
+    try:
+        fuzzy_system.reload_if_changed()
+    except (OSError, ValueError) as e:
+        print(f"Ошибка при загрузке базы правил: {e}")
+
+
+def evaluate(quality: float, accuracy: float, deadline: float):
+    """
+    Оценивает знания студента
+
+    :return: (числовая_оценка, текстовая_оценка)
+    """
+    sync_rule_base()
+    numeric_grade, text_grade = fuzzy_system.evaluate(quality, accuracy, deadline)
+    return (float(numeric_grade) if numeric_grade is not None else None), text_grade
+
+
+def evaluate_with_trace(quality: float, accuracy: float, deadline: float):
+    """
+    Оценивает знания студента и возвращает трассировку вывода
+    для построения графика и объяснения без повторного вывода
+
+    Оценка совпадает с трассировкой: для целых входов она берется
+    из таблицы или кэша, для дробных - из трассировки.
+
+    :return: (числовая_оценка, текстовая_оценка, трассировка)
+    """
+    sync_rule_base()
+    numeric_grade, text_grade, trace = fuzzy_system.evaluate(quality, accuracy, deadline, with_trace=True)
+    return (float(numeric_grade) if numeric_grade is not None else None), text_grade, trace
+
+
+def required_input(target_category: str, fixed: dict, free: str):
+    """
+    Находит минимальное значение входа free для категории target_category
+
+    :return: значение входа или None, если категория недостижима
+             (см. FuzzyGradeSystem.required_input)
+    """
+    sync_rule_base()
+    return fuzzy_system.required_input(target_category, fixed, free)
+
+
+def render_visualization() -> bytes:
+    """
+    Строит график функций принадлежности
+
+    :return: содержимое PNG-файла
+    """
+    sync_rule_base()
+    return fuzzy_system.render_membership()
+
+
+def render_result_visualization(quality: float, accuracy: float, deadline: float, trace=None) -> bytes:
+    """
+    Строит график результата нечеткого вывода
+
+    :param trace: трассировка из evaluate_with_trace (None - выполнить вывод)
+    :return: содержимое PNG-файла
+    """
+    sync_rule_base()
+    return fuzzy_system.render_result(quality, accuracy, deadline, trace=trace)
+
+
+def prerender_result_visualization(quality: float, accuracy: float, deadline: float):
+    """
+    Строит график результата, если оценка для входов определена
+
+    Оценка выполняется здесь же, в обработчике, и ее трассировка
+    используется для графика без повторного вывода.
+
+    :return: содержимое PNG-файла или None, если оценка не определена
+    """
+    sync_rule_base()
+    numeric_grade, _, trace = fuzzy_system.evaluate(quality, accuracy, deadline, with_trace=True)
+    if numeric_grade is None:
+        return None
+    return fuzzy_system.render_result(quality, accuracy, deadline, trace=trace)
@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from aiogram.types import InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
@@ -11,23 +13,29 @@ def get_cancel_keyboard() -> InlineKeyboardMarkup:
     builder.button(text="❌ Отмена", callback_data="cancel_input")
     return builder.as_markup()
 
-def get_rating_keyboard(param_name: str) -> InlineKeyboardMarkup:
+def get_rating_keyboard(param_name: str, previews: Optional[List[str]] = None) -> InlineKeyboardMarkup:
     """
     Создает клавиатуру для выбора оценки параметра
     
     :param param_name: Имя параметра (quality, accuracy, deadline)
+    :param previews: подписи к кнопкам от 0 до 10 (например, итоговая оценка
+                     при выборе этого значения); None - без подписей
     :return: InlineKeyboardMarkup с кнопками от 0 до 10
     """
     builder = InlineKeyboardBuilder()
     
     # Добавляем кнопки с оценками от 0 до 10
     for i in range(11):
-        builder.button(text=str(i), callback_data=f"{param_name}:{i}")
+        text = f"{i} → {previews[i]}" if previews else str(i)
+        builder.button(text=text, callback_data=f"{param_name}:{i}")
     
     # Добавляем кнопку отмены
     builder.button(text="❌ Отмена", callback_data="cancel_input")
     
-    # Настраиваем сетку: 6, 5 и 1 кнопка в строке
-    builder.adjust(6, 5, 1)
+    # Настраиваем сетку: 6, 5 и 1 кнопка в строке, с подписями - 4, 4, 3 и 1
+    if previews:
+        builder.adjust(4, 4, 3, 1)
+    else:
+        builder.adjust(6, 5, 1)
     
     return builder.as_markup() 
\ No newline at end of file
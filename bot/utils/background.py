@@ -0,0 +1,59 @@
+import asyncio
+from typing import Awaitable, Set
+
+
+class BackgroundTasks:
+    """
+    Фоновые задачи, результат которых не нужен обработчику сообщения
+
+    Хранит ссылки на задачи до их завершения (иначе сборщик мусора может
+    удалить незавершенную задачу), сообщает об ошибках и позволяет дождаться
+    оставшихся задач при остановке бота.
+    """
+
+    def __init__(self):
+        self._tasks: Set[asyncio.Task] = set()
+        self.started = 0
+        self.failed = 0
+
+    def spawn(self, coro: Awaitable, description: str) -> asyncio.Task:
+        """
+        Запускает корутину в фоне
+
+        :param coro: корутина
+        :param description: что делает задача - для сообщения об ошибке
+        :return: задача
+        """
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        self.started += 1
+        task.add_done_callback(lambda done: self._finished(done, description))
+        return task
+
+    def _finished(self, task: asyncio.Task, description: str):
+        self._tasks.discard(task)
+        if task.cancelled() or task.exception() is None:
+            return
+        self.failed += 1
+        print(f"Ошибка при выполнении фоновой задачи ({description}): {task.exception()}")
+
+    async def drain(self, timeout: float = 10.0):
+        """
+        Дожидается завершения запущенных задач, оставшиеся после таймаута отменяет
+
+        :param timeout: время ожидания в секундах
+        """
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+
+    def stats(self) -> dict:
+        """
+        Возвращает счетчики фоновых задач
+
+        :return: словарь: running - выполняется сейчас, started - запущено всего,
+                 failed - завершилось с ошибкой
+        """
+        return {"running": len(self._tasks), "started": self.started, "failed": self.failed}
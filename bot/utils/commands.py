@@ -9,6 +9,7 @@ USER_COMMANDS = [
     BotCommand(command="grade", description="Оценить знания студента"),
     BotCommand(command="visualize", description="Визуализировать функции принадлежности"),
     BotCommand(command="history", description="Показать историю оценок"),
+    BotCommand(command="need", description="Минимальный балл для нужной категории"),
     BotCommand(command="help", description="Показать справку")
 ]
 
@@ -18,9 +19,11 @@ ADMIN_COMMANDS = [
     BotCommand(command="grade", description="Оценить знания студента"),
     BotCommand(command="visualize", description="Визуализировать функции принадлежности"),
     BotCommand(command="history", description="Показать историю оценок"),
+    BotCommand(command="need", description="Минимальный балл для нужной категории"),
     BotCommand(command="tests", description="Запустить тесты"),
     BotCommand(command="help", description="Показать справку"),
-    BotCommand(command="stat", description="Статистика использования бота")
+    BotCommand(command="stat", description="Статистика использования бота"),
+    BotCommand(command="prerender", description="Построить все графики результата заранее")
 ]
 
 async def setup_bot_commands(bot: Bot):
@@ -0,0 +1,94 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable, Optional
+
+
+class WorkerBusyError(Exception):
+    """Очередь пула обработчиков заполнена"""
+
+
+class WorkerPool:
+    """
+    Пул потоков или процессов для тяжелых вычислений вне событийного цикла
+
+    Количество задач в работе и в очереди ограничено: при переполнении
+    новая задача сразу отклоняется с WorkerBusyError, а не ждет.
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 4, max_pending: int = 32,
+                 timeout: Optional[float] = 10.0, initializer: Optional[Callable] = None,
+                 initargs: tuple = ()):
+        """
+        :param kind: 'thread' - пул потоков, 'process' - пул процессов
+        :param max_workers: количество потоков или процессов
+        :param max_pending: максимальное число задач в работе и в очереди
+        :param timeout: время ожидания результата задачи в секундах (None - без ограничения)
+        :param initializer: функция подготовки обработчика (для пула процессов -
+                            в каждом процессе, для пула потоков - один раз)
+        :param initargs: аргументы initializer
+        """
+        if kind == "thread":
+            if initializer is not None:
+                initializer(*initargs)
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="grading")
+        elif kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=max_workers, initializer=initializer,
+                                                 initargs=initargs)
+        else:
+            raise ValueError(f"Неизвестный тип пула '{kind}', доступны: thread, process")
+
+        self.kind = kind
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pending = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _release(self, _future):
+        self.pending -= 1
+
+    async def run(self, func: Callable, *args):
+        """
+        Выполняет функцию в пуле и возвращает ее результат
+
+        :param func: функция (для пула процессов - определенная на уровне модуля)
+        :param args: аргументы функции
+        :return: результат функции
+        :raises WorkerBusyError: очередь пула заполнена
+        :raises asyncio.TimeoutError: задача не завершилась за timeout секунд
+        """
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise WorkerBusyError("Очередь обработчиков заполнена")
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, func, *args)
+
+        # Место в очереди освобождается, когда задача действительно завершится,
+        # даже если ожидание ее результата прервано по таймауту
+        self.pending += 1
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise
+
+    def stats(self) -> dict:
+        """
+        Возвращает состояние пула
+
+        :return: словарь с типом пула и счетчиками задач
+        """
+        return {
+            "kind": self.kind,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+    def shutdown(self):
+        """Останавливает пул, не дожидаясь завершения задач"""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,87 @@
+from typing import Awaitable, Callable, Dict, Iterable
+import io
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile, Message
+
+from bot.database.database import (
+    get_telegram_file_ids, save_telegram_file_id,
+    delete_telegram_file_id, delete_stale_telegram_file_ids
+)
+
+
+class FileIdCache:
+    """
+    Соответствие ключей изображений и file_id, полученных от Telegram
+
+    Хранится в памяти и в базе данных, поэтому переживает перезапуск бота.
+    Ключ должен включать отпечаток модели, по которой построено изображение.
+    """
+
+    def __init__(self):
+        self._file_ids: Dict[str, str] = {}
+        self.hits = 0
+        self.uploads = 0
+
+    async def load(self, fingerprints: Iterable[str]):
+        """
+        Удаляет записи для других версий модели и загружает остальные в память
+
+        :param fingerprints: отпечатки текущей модели
+        """
+        try:
+            await delete_stale_telegram_file_ids(fingerprints)
+            self._file_ids = await get_telegram_file_ids()
+        except Exception as e:
+            print(f"Ошибка при загрузке file_id изображений: {e}")
+
+    def get(self, key: str):
+        return self._file_ids.get(key)
+
+    async def remember(self, key: str, file_id: str, fingerprint: str):
+        self._file_ids[key] = file_id
+        try:
+            await save_telegram_file_id(key, file_id, fingerprint)
+        except Exception as e:
+            print(f"Ошибка при сохранении file_id изображения: {e}")
+
+    async def forget(self, key: str):
+        self._file_ids.pop(key, None)
+        try:
+            await delete_telegram_file_id(key)
+        except Exception as e:
+            print(f"Ошибка при удалении file_id изображения: {e}")
+
+    def stats(self) -> dict:
+        return {"size": len(self._file_ids), "hits": self.hits, "uploads": self.uploads}
+
+
+async def send_cached_photo(message: Message, file_ids: FileIdCache, key: str, fingerprint: str,
+                            render: Callable[[], Awaitable[io.BytesIO]], filename: str, caption: str) -> Message:
+    """
+    Отправляет изображение по сохраненному file_id, а если его нет - загружает
+
+    :param message: сообщение, в ответ на которое отправляется изображение
+    :param file_ids: кэш file_id
+    :param key: ключ изображения
+    :param fingerprint: отпечаток модели, по которой построено изображение
+    :param render: корутина-функция, возвращающая BytesIO с PNG
+    :param filename: имя файла при загрузке
+    :param caption: подпись к изображению
+    :return: отправленное сообщение
+    """
+    file_id = file_ids.get(key)
+    if file_id:
+        try:
+            sent = await message.answer_photo(file_id, caption=caption)
+            file_ids.hits += 1
+            return sent
+        except TelegramBadRequest:
+            # Telegram больше не знает этот file_id - загружаем заново
+            await file_ids.forget(key)
+
+    buffer = await render()
+    sent = await message.answer_photo(BufferedInputFile(buffer.getvalue(), filename=filename), caption=caption)
+    file_ids.uploads += 1
+    await file_ids.remember(key, sent.photo[-1].file_id, fingerprint)
+    return sent
@@ -0,0 +1,116 @@
+import hashlib
+import os
+from typing import Callable, Optional
+
+from cache import LRUCache
+
+
+class ImageCache:
+    """
+    Кэш готовых изображений: LRU в памяти и, при указании каталога, файлы на диске
+
+    Ключи должны включать отпечаток модели, по которой построено изображение:
+    после изменения модели старые записи просто перестают запрашиваться.
+    """
+
+    def __init__(self, maxsize: int = 64, directory: Optional[str] = None):
+        """
+        :param maxsize: максимальное количество изображений в памяти
+        :param directory: каталог для хранения изображений на диске (None - только память)
+        """
+        self.memory = LRUCache(maxsize)
+        self.directory = directory
+        self.disk_hits = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{name}.png")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Возвращает изображение из памяти или с диска
+
+        :param key: ключ изображения
+        :return: содержимое PNG-файла или None
+        """
+        data = self.memory.get(key)
+        if data is not None or not self.directory:
+            return data
+
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        self.disk_hits += 1
+        self.memory.put(key, data)
+        return data
+
+    def warm(self, key: str) -> bool:
+        """
+        Поднимает изображение с диска в память, не затрагивая счетчики обращений
+
+        :param key: ключ изображения
+        :return: True, если изображение есть в памяти или на диске
+        """
+        if key in self.memory:
+            return True
+        if not self.directory:
+            return False
+
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return False
+
+        self.memory.put(key, data)
+        return True
+
+    def put(self, key: str, data: bytes):
+        """
+        Сохраняет изображение в памяти и на диске
+
+        :param key: ключ изображения
+        :param data: содержимое PNG-файла
+        """
+        self.memory.put(key, data)
+        if not self.directory:
+            return
+
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Ошибка при сохранении изображения в кэш: {e}")
+
+    def purge(self, predicate: Callable[[str], bool]) -> int:
+        """
+        Удаляет изображения, ключи которых удовлетворяют условию, из памяти
+        и с диска; файлы, не поднятые в память, остаются на диске
+
+        :param predicate: функция от ключа, True - удалить изображение
+        :return: количество удаленных из памяти изображений
+        """
+        keys = self.memory.purge(predicate)
+        if self.directory:
+            for key in keys:
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+        return len(keys)
+
+    def stats(self) -> dict:
+        """
+        Возвращает статистику кэша
+
+        :return: статистика LRU в памяти и число попаданий на диске
+        """
+        return {**self.memory.stats(), "disk_hits": self.disk_hits}
@@ -0,0 +1,99 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Потокобезопасный кэш ограниченного размера с вытеснением
+    давно не использованных записей и счетчиками обращений
+    """
+
+    def __init__(self, maxsize=1024):
+        """
+        :param maxsize: максимальное количество записей
+        """
+        if maxsize <= 0:
+            raise ValueError("Размер кэша должен быть положительным")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        # Проверка наличия не влияет на счетчики и порядок вытеснения
+        with self._lock:
+            return key in self._data
+
+    def get(self, key, default=None):
+        """
+        Возвращает значение по ключу и отмечает запись как недавно использованную
+
+        :param key: ключ
+        :param default: значение при промахе
+        :return: сохраненное значение или default
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Сохраняет значение, вытесняя самую старую запись при переполнении
+
+        :param key: ключ
+        :param value: значение
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def purge(self, predicate):
+        """
+        Удаляет записи, ключи которых удовлетворяют условию
+
+        :param predicate: функция от ключа, True - удалить запись
+        :return: список удаленных ключей
+        """
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return keys
+
+    def clear(self):
+        """
+        Удаляет все записи, сохраняя счетчики обращений
+        """
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """
+        Возвращает статистику использования кэша
+
+        :return: словарь с размером, счетчиками и долей попаданий
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
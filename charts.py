@@ -0,0 +1,322 @@
+import io
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.patches import Polygon
+from PIL import Image
+
+# Версия оформления графиков: входит в ключи кэшей готовых изображений,
+# чтобы после изменения оформления не отдавались старые картинки
+CHART_VERSION = 2
+
+# Размеры графиков в дюймах
+MEMBERSHIP_FIGSIZE = (12, 10)
+RESULT_FIGSIZE = (6.4, 4.8)
+
+# Уровень сжатия PNG (0-9): сжатие занимает большую часть времени построения,
+# при уровне 1 файл почти не больше, а Telegram все равно перекодирует его
+COMPRESS_LEVEL = 1
+
+
+def draw_variable(ax, universe, terms, mfs, title=None, legend_loc='best'):
+    """
+    Рисует функции принадлежности одной переменной, как FuzzyVariable.view()
+
+    :param ax: оси matplotlib
+    :param universe: универсум переменной
+    :param terms: названия термов
+    :param mfs: значения функций принадлежности термов на универсуме
+    :param title: заголовок графика
+    :param legend_loc: положение легенды
+    :return: список линий термов
+    """
+    ax.set_ylim([0, 1.01])
+    ax.set_xlim([universe.min(), universe.max()])
+    lines = [ax.plot(universe, mf, label=label, linewidth=1)[0] for label, mf in zip(terms, mfs)]
+    ax.legend(loc=legend_loc, framealpha=0.5)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.get_xaxis().tick_bottom()
+    ax.get_yaxis().tick_left()
+    ax.tick_params(direction='out')
+    ax.set_ylabel('Степень принадлежности')
+    ax.set_xlabel('Оценка (0-10)')
+    if title is not None:
+        ax.set_title(title)
+    return lines
+
+
+def draw_membership_functions(fig, model, titles=None):
+    """
+    Рисует функции принадлежности всех переменных модели на сетке 2x2
+
+    :param fig: фигура matplotlib
+    :param model: скомпилированная модель (fuzzy_engine.CompiledFuzzyModel)
+    :param titles: словарь {имя переменной: заголовок графика}
+    :return: fig
+    """
+    titles = titles or {}
+    variables = [
+        (label, universe, terms, mfs[:len(terms)])
+        for label, universe, terms, mfs in zip(model.input_labels, model.input_universes,
+                                               model.input_terms, model.input_mfs)
+    ]
+    variables.append((model.output_label, model.output_universe, model.output_terms, model.output_mfs))
+
+    columns = 2
+    rows = -(-len(variables) // columns)
+    for index, (label, universe, terms, mfs) in enumerate(variables, 1):
+        ax = fig.add_subplot(rows, columns, index)
+        draw_variable(ax, universe, terms, mfs, titles.get(label, label))
+    fig.tight_layout()
+    return fig
+
+
+def result_layer(model, trace):
+    """
+    Вычисляет изменяемую часть графика результата по трассировке вывода
+
+    :param model: скомпилированная модель (fuzzy_engine.CompiledFuzzyModel)
+    :param trace: fuzzy_engine.InferenceTrace этой модели
+    :return: кортеж (точки универсума, {индекс терма: отсеченная функция},
+             центр тяжести, высота линии центра тяжести)
+    :raises ValueError: оценка не определена (нулевая площадь),
+                        трассировка получена на другой модели
+                        или вывод не Мамдани
+    """
+    if trace.fingerprint != model.fingerprint:
+        raise ValueError("Трассировка получена на другой версии модели")
+    if model.inference != 'mamdani':
+        raise ValueError("График результата строится только для вывода Мамдани")
+    if not trace.defined:
+        raise ValueError("Нулевая площадь выходной функции принадлежности")
+    points = trace.points
+    crisp = trace.numeric
+
+    # Отсеченные функции принадлежности на дополненном универсуме;
+    # термы, не встречающиеся в правилах, не отсекаются и не заливаются
+    used_terms = sorted(set(model.rule_outputs.tolist()))
+    memberships = model.output_memberships(np.append(points, crisp))
+    cut_mfs = {o: np.minimum(trace.cuts[o], memberships[o, :-1]) for o in used_terms}
+
+    # Высота линии центра тяжести; маленькие значения плохо видны
+    height = max(memberships[o, -1] for o in used_terms)
+    if height < 0.1:
+        height = 1.
+    return points, cut_mfs, crisp, height
+
+
+def draw_result(fig, model, trace):
+    """
+    Рисует график результата нечеткого вывода, как Consequent.view(sim=...)
+
+    :param fig: фигура matplotlib
+    :param model: скомпилированная модель (fuzzy_engine.CompiledFuzzyModel)
+    :param trace: fuzzy_engine.InferenceTrace этой модели
+    :return: fig
+    :raises ValueError: оценка не определена (нулевая площадь)
+    """
+    points, cut_mfs, crisp, height = result_layer(model, trace)
+
+    ax = fig.add_subplot()
+    lines = draw_variable(ax, model.output_universe, model.output_terms, model.output_mfs,
+                          f'Результат: {crisp:.2f}', ResultChartRenderer.LEGEND_LOC)
+    for o, cut_mf in cut_mfs.items():
+        ax.fill_between(points, 0, cut_mf, facecolor=lines[o].get_color(), alpha=0.4)
+    ax.plot([crisp, crisp], [0, height], color='k', lw=3)
+    return fig
+
+
+def snapshot(canvas):
+    """
+    Копирует текущее содержимое холста Agg
+
+    :param canvas: FigureCanvasAgg после отрисовки
+    :return: изображение PIL в режиме RGB
+    """
+    # Фон непрозрачный, поэтому альфа-канал не нужен; convert копирует
+    # буфер, и дальше холст можно перерисовывать
+    return Image.frombuffer('RGBA', canvas.get_width_height(), canvas.buffer_rgba(),
+                            'raw', 'RGBA', 0, 1).convert('RGB')
+
+
+def encode_png(image, compress_level=COMPRESS_LEVEL):
+    """
+    :param image: изображение PIL
+    :param compress_level: уровень сжатия PNG (0-9)
+    :return: содержимое PNG-файла
+    """
+    buf = io.BytesIO()
+    image.save(buf, format='png', compress_level=compress_level)
+    return buf.getvalue()
+
+
+class FigurePool:
+    """
+    Ограниченный набор фигур Agg для повторного использования
+
+    Фигуры создаются через объектный API matplotlib и не регистрируются
+    в pyplot. Одновременно существует не больше max_live фигур: если все
+    заняты, запрос ждет освобождения, а по истечении timeout получает
+    TimeoutError. Освобожденные фигуры очищаются и переиспользуются.
+    """
+
+    def __init__(self, size=2, max_live=4, timeout=30.0):
+        """
+        :param size: сколько свободных фигур хранить для повторного использования
+        :param max_live: максимальное число одновременно существующих фигур
+        :param timeout: время ожидания свободной фигуры в секундах
+        """
+        if not 0 < size <= max_live:
+            raise ValueError("Размер пула фигур должен быть от 1 до max_live")
+        self.size = size
+        self.max_live = max_live
+        self.timeout = timeout
+        self.created = 0
+        self.reused = 0
+        self._free = []
+        self._slots = threading.BoundedSemaphore(max_live)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def figure(self, figsize, dpi=100):
+        """
+        Выдает чистую фигуру на время блока with
+
+        :param figsize: размер фигуры в дюймах
+        :param dpi: разрешение
+        :return: контекстный менеджер, выдающий matplotlib.figure.Figure
+        :raises TimeoutError: свободная фигура не появилась за timeout секунд
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"Все {self.max_live} фигур заняты")
+        try:
+            with self._lock:
+                fig = self._free.pop() if self._free else None
+                if fig is None:
+                    self.created += 1
+                else:
+                    self.reused += 1
+            if fig is None:
+                fig = Figure()
+                FigureCanvasAgg(fig)
+            fig.set_size_inches(figsize)
+            fig.set_dpi(dpi)
+
+            try:
+                yield fig
+            finally:
+                fig.clear()
+                with self._lock:
+                    if len(self._free) < self.size:
+                        self._free.append(fig)
+        finally:
+            self._slots.release()
+
+    def render_png(self, draw, figsize, dpi=100):
+        """
+        Рисует график на фигуре из пула и кодирует его в PNG
+
+        :param draw: функция, принимающая фигуру и рисующая на ней
+        :param figsize: размер фигуры в дюймах
+        :param dpi: разрешение
+        :return: содержимое PNG-файла
+        """
+        with self.figure(figsize, dpi) as fig:
+            draw(fig)
+            fig.canvas.draw()
+            image = snapshot(fig.canvas)
+        return encode_png(image)
+
+    def stats(self):
+        """
+        Возвращает статистику пула
+
+        :return: словарь с числом свободных, созданных и переиспользованных фигур
+        """
+        with self._lock:
+            return {
+                'free': len(self._free),
+                'max_live': self.max_live,
+                'created': self.created,
+                'reused': self.reused,
+            }
+
+
+# Общий пул фигур процесса
+figure_pool = FigurePool()
+
+
+class ResultChartRenderer:
+    """
+    График результата нечеткого вывода с отрисовкой только изменяемого слоя
+
+    Оси, функции принадлежности выходных термов, подписи и легенда рисуются
+    один раз и сохраняются как фон. На каждый запрос фон восстанавливается
+    на том же холсте Agg, а поверх рисуются заливки отсечений, линия
+    центра тяжести и заголовок. Вид совпадает с draw_result.
+    """
+
+    # Положение 'best' зависело бы от изменяемого слоя; skfuzzy
+    # почти всегда выбирает для этого графика верхний правый угол
+    LEGEND_LOC = 'upper right'
+
+    def __init__(self, model, figsize=RESULT_FIGSIZE, dpi=100):
+        """
+        :param model: скомпилированная модель (fuzzy_engine.CompiledFuzzyModel)
+        :param figsize: размер изображения в дюймах
+        :param dpi: разрешение изображения
+        """
+        self.model = model
+        self.fingerprint = model.fingerprint
+        self._lock = threading.Lock()
+
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        ax = self.figure.add_subplot()
+        self.ax = ax
+
+        # Статический слой
+        lines = draw_variable(ax, model.output_universe, model.output_terms, model.output_mfs,
+                              legend_loc=self.LEGEND_LOC)
+
+        # Изменяемый слой: не попадает в фон и рисуется отдельно
+        self._fills = [
+            ax.add_patch(Polygon(np.zeros((1, 2)), closed=True, facecolor=line.get_color(),
+                                 edgecolor='none', alpha=0.4, animated=True))
+            for line in lines
+        ]
+        self._crisp_line = ax.add_line(Line2D([], [], color='k', lw=3, animated=True))
+        self._title = ax.set_title(' ', animated=True)
+
+        self.canvas.draw()
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+
+    def render(self, trace):
+        """
+        Строит график результата вывода
+
+        :param trace: fuzzy_engine.InferenceTrace модели построителя
+        :return: содержимое PNG-файла
+        :raises ValueError: оценка не определена (нулевая площадь)
+        """
+        points, cut_mfs, crisp, height = result_layer(self.model, trace)
+        xs = np.concatenate([[points[0]], points, [points[-1]]])
+
+        with self._lock:
+            self.canvas.restore_region(self._background)
+            for o, cut_mf in cut_mfs.items():
+                fill = self._fills[o]
+                fill.set_xy(np.column_stack([xs, np.concatenate([[0.], cut_mf, [0.]])]))
+                self.ax.draw_artist(fill)
+            self._crisp_line.set_data([crisp, crisp], [0, height])
+            self.ax.draw_artist(self._crisp_line)
+            self._title.set_text(f'Результат: {crisp:.2f}')
+            self.ax.draw_artist(self._title)
+            image = snapshot(self.canvas)
+
+        return encode_png(image)
@@ -0,0 +1,922 @@
+import hashlib
+import os
+from bisect import bisect_right
+from collections import defaultdict
+
+import numpy as np
+from skfuzzy.control.term import Term, TermAggregate
+
+# Текстовые категории в порядке возрастания числовой оценки
+CATEGORIES = ('троечник', 'хорошист', 'отличник')
+
+# Верхние границы числовой оценки для категорий (кроме последней)
+CATEGORY_THRESHOLDS = (4, 7)
+
+# Код категории для входов, на которых вывод не определен
+ERROR_CODE = -1
+
+# Коды логических операций в правилах
+OP_AND = 0
+OP_OR = 1
+
+# Способы дефаззификации: по дискретному универсуму (как skfuzzy)
+# и точный - по параметрам треугольных функций принадлежности
+DEFUZZIFICATION_MODES = ('sampled', 'exact')
+
+# Способы вывода: Мамдани (центр тяжести агрегированной функции)
+# и Такаги-Сугено (взвешенное среднее заключений правил)
+INFERENCE_MODES = ('mamdani', 'sugeno')
+
+
+def categorize(numeric_grades):
+    """
+    Переводит числовые оценки в коды категорий
+
+    :param numeric_grades: массив числовых оценок (NaN - ошибка вычисления)
+    :return: массив кодов категорий (индексы в CATEGORIES, ERROR_CODE для NaN)
+    """
+    numeric_grades = np.asarray(numeric_grades, dtype=np.float64)
+    codes = np.searchsorted(CATEGORY_THRESHOLDS, numeric_grades, side='right').astype(np.int8)
+    codes[np.isnan(numeric_grades)] = ERROR_CODE
+    return codes
+
+
+def trimf_values(x, a, b, c):
+    """
+    Вычисляет треугольную функцию принадлежности, как fuzz.trimf, в произвольных точках
+
+    :param x: массив точек
+    :param a: левая граница (массив, согласованный с x по форме)
+    :param b: вершина
+    :param c: правая граница
+    :return: значения функции принадлежности
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rise = np.where(b > a, (x - a) / (b - a), np.where(x >= a, 1.0, 0.0))
+        fall = np.where(c > b, (c - x) / (c - b), np.where(x <= c, 1.0, 0.0))
+    return np.clip(np.minimum(rise, fall), 0.0, 1.0)
+
+
+def _trimf_scalar(x, a, b, c):
+    """
+    Треугольная функция принадлежности в одной точке
+
+    :return: значение функции принадлежности
+    """
+    rise = (x - a) / (b - a) if b > a else (1.0 if x >= a else 0.0)
+    fall = (c - x) / (c - b) if c > b else (1.0 if x <= c else 0.0)
+    return min(max(min(rise, fall), 0.0), 1.0)
+
+
+def _flatten_antecedent(antecedent):
+    """
+    Раскладывает условие правила skfuzzy в плоский список термов
+
+    :param antecedent: Term или TermAggregate из ctrl.Rule
+    :return: кортеж (код_операции, [терм, ...])
+    """
+    if isinstance(antecedent, Term):
+        return OP_AND, [antecedent]
+
+    if not isinstance(antecedent, TermAggregate) or antecedent.kind not in ('and', 'or'):
+        raise ValueError(f"Неподдерживаемое условие правила: {antecedent}")
+
+    op = OP_AND if antecedent.kind == 'and' else OP_OR
+    terms = []
+    for part in (antecedent.term1, antecedent.term2):
+        part_op, part_terms = _flatten_antecedent(part)
+        if len(part_terms) > 1 and part_op != op:
+            raise ValueError(f"Правила со смешанными операциями И/ИЛИ не поддерживаются: {antecedent}")
+        terms.extend(part_terms)
+    return op, terms
+
+
+class InferenceTrace:
+    """
+    Промежуточные результаты одного нечеткого вывода
+
+    Содержит все, что нужно для графика результата и объяснения оценки,
+    поэтому повторно выполнять вывод для них не требуется.
+    """
+
+    __slots__ = ('inputs', 'fingerprint', 'memberships', 'strengths', 'cuts',
+                 'points', 'aggregated', 'numeric')
+
+    def __init__(self, inputs, fingerprint, memberships, strengths, cuts, points, aggregated, numeric):
+        """
+        :param inputs: кортеж входных значений
+        :param fingerprint: отпечаток модели, выполнившей вывод
+        :param memberships: степени принадлежности входов термам формы (n_inputs, n_terms)
+        :param strengths: степени срабатывания правил формы (n_rules,)
+        :param cuts: уровни отсечения выходных термов формы (n_output_terms,)
+        :param points: точки агрегированной выходной функции принадлежности
+        :param aggregated: значения агрегированной функции в точках
+        :param numeric: центр тяжести (NaN при нулевой площади)
+        """
+        self.inputs = inputs
+        self.fingerprint = fingerprint
+        self.memberships = memberships
+        self.strengths = strengths
+        self.cuts = cuts
+        self.points = points
+        self.aggregated = aggregated
+        self.numeric = numeric
+
+    @property
+    def defined(self):
+        """Определена ли оценка (площадь выходной функции не нулевая)"""
+        return not np.isnan(self.numeric)
+
+
+class CompiledFuzzyModel:
+    """
+    Скомпилированная модель нечеткого вывода Мамдани
+
+    Хранит функции принадлежности и правила в виде плоских массивов NumPy,
+    что позволяет выполнять вывод сразу для целого массива входов.
+    Результат совпадает с ctrl.ControlSystemSimulation с точностью до
+    погрешности округления (см. TOLERANCE).
+    """
+
+    # Максимальное расхождение с skfuzzy по числовой оценке
+    TOLERANCE = 1e-9
+
+    # Предел числа точек выходного универсума в одном блоке evaluate_batch:
+    # при мелком шаге универсума блок уменьшается, чтобы не исчерпать память
+    CHUNK_POINTS = 1 << 16
+
+    # Предел числа пар (правило, терм) в одном блоке evaluate_batch:
+    # степени срабатывания вычисляются для всех правил сразу
+    CHUNK_RULE_SLOTS = 1 << 22
+
+    def __init__(self, antecedents, consequent, rules, output_params=None, defuzzification='sampled',
+                 sparse_rules=True, inference='mamdani', sugeno_params=None):
+        """
+        :param antecedents: список входных переменных (ctrl.Antecedent)
+        :param consequent: выходная переменная (ctrl.Consequent)
+        :param rules: список правил (ctrl.Rule)
+        :param output_params: параметры [a, b, c] треугольных функций
+                              принадлежности выходных термов {терм: (a, b, c)};
+                              нужны для точной дефаззификации
+        :param defuzzification: 'sampled' - центр тяжести ломаной по точкам
+                                универсума (как skfuzzy), 'exact' - точный центр
+                                тяжести по параметрам функций принадлежности;
+                                стоимость не зависит от шага универсума
+        :param sparse_rules: в evaluate проверять только правила, все термы
+                             которых (для ИЛИ - хотя бы один) ненулевые;
+                             результат совпадает с перебором всех правил
+        :param inference: 'mamdani' или 'sugeno' - взвешенное среднее заключений
+                          правил без агрегации по выходному универсуму
+        :param sugeno_params: заключения для вывода Сугено {выходной терм:
+                              [c0] или [c0, c1, ..., cn]}: значение c0 + c1*x1 + ... + cn*xn
+        """
+        if defuzzification not in DEFUZZIFICATION_MODES:
+            raise ValueError(f"Неизвестный способ дефаззификации '{defuzzification}', "
+                             f"доступны: {', '.join(DEFUZZIFICATION_MODES)}")
+        if defuzzification == 'exact' and output_params is None:
+            raise ValueError("Для точной дефаззификации нужны параметры функций принадлежности")
+        if inference not in INFERENCE_MODES:
+            raise ValueError(f"Неизвестный способ вывода '{inference}', доступны: {', '.join(INFERENCE_MODES)}")
+        if inference == 'sugeno' and defuzzification != 'sampled':
+            raise ValueError("Вывод Сугено не использует дефаззификацию по центру тяжести")
+        self.defuzzification = defuzzification
+        self.inference = inference
+        self.sparse_rules = sparse_rules
+        self.input_labels = [var.label for var in antecedents]
+        self.input_terms = [list(var.terms) for var in antecedents]
+        self.input_universes = [np.asarray(var.universe, dtype=np.float64) for var in antecedents]
+        self.input_mfs = [
+            np.array([term.mf for term in var.terms.values()], dtype=np.float64)
+            for var in antecedents
+        ]
+
+        self.output_label = consequent.label
+        self.output_terms = list(consequent.terms)
+        self.output_universe = np.asarray(consequent.universe, dtype=np.float64)
+        self.output_mfs = np.array([term.mf for term in consequent.terms.values()], dtype=np.float64)
+        self.output_params = None
+        if output_params is not None:
+            self.output_params = np.array([output_params[label] for label in self.output_terms], dtype=np.float64)
+
+        self.n_inputs = len(antecedents)
+        self.n_terms = max(len(terms) for terms in self.input_terms)
+
+        # Коэффициенты заключений Сугено: строка [c0, c1, ..., cn] на выходной терм
+        self.sugeno_coefs = None
+        if inference == 'sugeno':
+            if sugeno_params is None or set(sugeno_params) != set(self.output_terms):
+                raise ValueError("Для вывода Сугено нужны заключения для всех выходных термов")
+            self.sugeno_coefs = np.zeros((len(self.output_terms), self.n_inputs + 1))
+            for o, label in enumerate(self.output_terms):
+                coefs = np.asarray(sugeno_params[label], dtype=np.float64).ravel()
+                if coefs.size not in (1, self.n_inputs + 1):
+                    raise ValueError(f"Заключение терма '{label}': нужно 1 или {self.n_inputs + 1} коэффициентов")
+                self.sugeno_coefs[o, :coefs.size] = coefs
+
+        # Каждое правило: операция, до n_inputs пар (переменная, терм),
+        # выходной терм и вес. Пустые позиции помечены маской.
+        var_index = {label: i for i, label in enumerate(self.input_labels)}
+        rows = []
+        for rule in rules:
+            op, terms = _flatten_antecedent(rule.antecedent)
+            for weighted in rule.consequent:
+                rows.append((op, terms, weighted.term.label, weighted.weight))
+
+        n_rules = len(rows)
+        width = max(len(terms) for _, terms, _, _ in rows)
+        self.rule_ops = np.zeros(n_rules, dtype=np.int8)
+        self.rule_vars = np.zeros((n_rules, width), dtype=np.intp)
+        self.rule_terms = np.zeros((n_rules, width), dtype=np.intp)
+        self.rule_mask = np.zeros((n_rules, width), dtype=bool)
+        self.rule_outputs = np.zeros(n_rules, dtype=np.intp)
+        self.rule_weights = np.ones(n_rules, dtype=np.float64)
+
+        for r, (op, terms, output_label, weight) in enumerate(rows):
+            self.rule_ops[r] = op
+            for k, term in enumerate(terms):
+                v = var_index[term.parent.label]
+                self.rule_vars[r, k] = v
+                self.rule_terms[r, k] = self.input_terms[v].index(term.label)
+                self.rule_mask[r, k] = True
+            self.rule_outputs[r] = self.output_terms.index(output_label)
+            self.rule_weights[r] = weight
+
+        self.membership_fingerprint = self._compute_fingerprint(with_rules=False)
+        self.fingerprint = self._compute_fingerprint(with_rules=True)
+        self._prepare_scalar()
+
+    def _compute_fingerprint(self, with_rules):
+        """
+        Вычисляет отпечаток модели: меняется при любом изменении
+        универсумов и функций принадлежности, а если with_rules - и правил
+
+        :param with_rules: учитывать ли правила
+        :return: шестнадцатеричная строка SHA-1
+        """
+        digest = hashlib.sha1()
+        labels = [self.output_label, *self.output_terms]
+        for label, terms in zip(self.input_labels, self.input_terms):
+            labels.extend([label, *terms])
+        digest.update('\x00'.join(labels).encode('utf-8'))
+        arrays = [*self.input_universes, *self.input_mfs, self.output_universe, self.output_mfs]
+        if with_rules:
+            arrays += [self.rule_ops, self.rule_vars, self.rule_terms, self.rule_mask,
+                       self.rule_outputs, self.rule_weights]
+
+            # Точная дефаззификация меняет результат, поэтому входит в отпечаток
+            # вместе с параметрами; отпечатки прежних моделей не меняются
+            if self.defuzzification == 'exact':
+                digest.update(b'exact')
+                arrays.append(self.output_params)
+            if self.inference == 'sugeno':
+                digest.update(b'sugeno')
+                arrays.append(self.sugeno_coefs)
+        for array in arrays:
+            digest.update(str(array.shape).encode('ascii'))
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+    def _prepare_scalar(self):
+        """
+        Готовит представление модели для вывода по одному набору входов
+
+        Для одиночного вызова накладные расходы NumPy превышают стоимость
+        самих вычислений, поэтому массивы дублируются кортежами чисел,
+        а термы правил - плоскими индексами в списке степеней принадлежности.
+        """
+        self._scalar_inputs = tuple(
+            (tuple(universe.tolist()), tuple(tuple(mf.tolist()) for mf in mfs))
+            for universe, mfs in zip(self.input_universes, self.input_mfs)
+        )
+        self._scalar_rules = tuple(
+            (
+                int(self.rule_ops[r]),
+                tuple(int(v * self.n_terms + t) for v, t, used in
+                      zip(self.rule_vars[r], self.rule_terms[r], self.rule_mask[r]) if used),
+                int(self.rule_outputs[r]),
+                float(self.rule_weights[r]),
+            )
+            for r in range(len(self.rule_ops))
+        )
+        self._scalar_output = (
+            tuple(self.output_universe.tolist()),
+            tuple(tuple(mf.tolist()) for mf in self.output_mfs),
+        )
+        self._scalar_params = None
+        if self.output_params is not None:
+            self._scalar_params = tuple(tuple(params) for params in self.output_params.tolist())
+        self._scalar_sugeno = None
+        if self.sugeno_coefs is not None:
+            self._scalar_sugeno = tuple(tuple(coefs) for coefs in self.sugeno_coefs.tolist())
+        self._prepare_sparse()
+
+    def _prepare_sparse(self):
+        """
+        Строит индексы правил для разреженного вывода
+
+        Правила И хранятся в префиксном дереве по упорядоченным номерам
+        термов: правило срабатывает, только если ненулевые все его термы,
+        поэтому при выводе обход спускается лишь по ненулевым термам и
+        отбрасывает поддерево при первом нулевом. Правило ИЛИ срабатывает
+        при любом ненулевом терме и попадает в индекс терм -> правила.
+        """
+        def new_node():
+            return {}, []
+
+        def freeze(node):
+            children, outputs = node
+            return tuple((slot, freeze(child)) for slot, child in sorted(children.items())), tuple(outputs)
+
+        root = new_node()
+        or_rules = defaultdict(list)
+        for r, (op, slots, output, weight) in enumerate(self._scalar_rules):
+            if op == OP_AND or len(slots) == 1:
+                node = root
+                for slot in sorted(set(slots)):
+                    node = node[0].setdefault(slot, new_node())
+                node[1].append((output, weight))
+            else:
+                for slot in set(slots):
+                    or_rules[slot].append(r)
+        self._and_tree = freeze(root)[0]
+        self._or_rules = dict(or_rules)
+
+    def _fire_dense(self, degrees, cuts, total=False):
+        """
+        Вычисляет уровни отсечения перебором всех правил
+
+        :param degrees: степени принадлежности в плоской нумерации термов
+        :param cuts: уровни отсечения выходных термов (изменяются на месте)
+        :param total: суммировать срабатывания по термам (вывод Сугено) вместо максимума
+        """
+        for op, slots, output, weight in self._scalar_rules:
+            if op == OP_AND:
+                strength = min([degrees[k] for k in slots])
+            else:
+                strength = max([degrees[k] for k in slots])
+            strength *= weight
+            if total:
+                cuts[output] += strength
+            elif strength > cuts[output]:
+                cuts[output] = strength
+
+    def _fire_sparse(self, degrees, cuts, total=False):
+        """
+        Вычисляет уровни отсечения только по правилам, которые могут сработать
+
+        :param degrees: степени принадлежности в плоской нумерации термов
+        :param cuts: уровни отсечения выходных термов (изменяются на месте)
+        :param total: суммировать срабатывания по термам (вывод Сугено) вместо максимума
+        """
+        # Обход дерева правил И с минимумом степеней по пути
+        stack = [(self._and_tree, 1.0)]
+        while stack:
+            children, strength = stack.pop()
+            for slot, (grandchildren, outputs) in children:
+                degree = degrees[slot]
+                if degree <= 0:
+                    continue
+                if degree < strength:
+                    path_strength = degree
+                else:
+                    path_strength = strength
+                for output, weight in outputs:
+                    if total:
+                        cuts[output] += path_strength * weight
+                    elif path_strength * weight > cuts[output]:
+                        cuts[output] = path_strength * weight
+                if grandchildren:
+                    stack.append((grandchildren, path_strength))
+
+        if self._or_rules:
+            seen = set()
+            for slot, rules in self._or_rules.items():
+                if degrees[slot] <= 0:
+                    continue
+                for r in rules:
+                    if r in seen:
+                        continue
+                    seen.add(r)
+                    _, rule_slots, output, weight = self._scalar_rules[r]
+                    strength = max([degrees[k] for k in rule_slots]) * weight
+                    if total:
+                        cuts[output] += strength
+                    elif strength > cuts[output]:
+                        cuts[output] = strength
+
+    def fuzzify(self, inputs):
+        """
+        Вычисляет степени принадлежности входов всем термам
+
+        :param inputs: массив входов формы (N, n_inputs)
+        :return: массив формы (N, n_inputs, n_terms)
+        """
+        memberships = np.zeros((inputs.shape[0], self.n_inputs, self.n_terms))
+        for v, (universe, mfs) in enumerate(zip(self.input_universes, self.input_mfs)):
+            values = np.clip(inputs[:, v], universe[0], universe[-1])
+            for t, mf in enumerate(mfs):
+                memberships[:, v, t] = np.interp(values, universe, mf)
+        return memberships
+
+    def fire_rules(self, memberships):
+        """
+        Вычисляет степени срабатывания правил
+
+        :param memberships: степени принадлежности формы (N, n_inputs, n_terms)
+        :return: массив формы (N, n_rules)
+        """
+        values = memberships[:, self.rule_vars, self.rule_terms]
+        and_values = np.where(self.rule_mask, values, 1.0).min(axis=2)
+        or_values = np.where(self.rule_mask, values, 0.0).max(axis=2)
+        strengths = np.where(self.rule_ops == OP_AND, and_values, or_values)
+        return strengths * self.rule_weights
+
+    def accumulate(self, strengths):
+        """
+        Объединяет срабатывания правил по выходным термам: максимум для
+        вывода Мамдани, сумма для вывода Сугено
+
+        :param strengths: степени срабатывания правил формы (N, n_rules)
+        :return: уровни отсечения (для Сугено - суммарные веса) выходных термов
+                 формы (N, n_output_terms)
+        """
+        cuts = np.zeros((strengths.shape[0], len(self.output_terms)))
+        for o in range(len(self.output_terms)):
+            selected = self.rule_outputs == o
+            if not selected.any():
+                continue
+            if self.inference == 'sugeno':
+                cuts[:, o] = strengths[:, selected].sum(axis=1)
+            else:
+                cuts[:, o] = strengths[:, selected].max(axis=1)
+        return cuts
+
+    def sugeno_values(self, inputs):
+        """
+        Вычисляет заключения выходных термов для вывода Сугено
+
+        :param inputs: массив входов формы (N, n_inputs)
+        :return: массив формы (N, n_output_terms)
+        """
+        inputs = np.clip(inputs, [u[0] for u in self.input_universes], [u[-1] for u in self.input_universes])
+        return self.sugeno_coefs[:, 0] + inputs @ self.sugeno_coefs[:, 1:].T
+
+    @staticmethod
+    def weighted_average(weights, values):
+        """
+        Вычисляет выход Сугено - среднее заключений, взвешенное срабатываниями
+
+        :param weights: суммарные веса выходных термов формы (N, n_output_terms)
+        :param values: заключения выходных термов формы (N, n_output_terms)
+        :return: массив формы (N,), NaN если ни одно правило не сработало
+        """
+        total = weights.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(total > 0, (weights * values).sum(axis=1) / total, np.nan)
+
+    def aggregate(self, cuts):
+        """
+        Строит агрегированную выходную функцию принадлежности
+
+        Функция кусочно-линейна между возвращаемыми точками, поэтому
+        centroid по ним дает точный центр тяжести.
+
+        :param cuts: уровни отсечения выходных термов формы (N, n_output_terms)
+        :return: кортеж (точки формы (N, M), значения формы (N, M))
+        """
+        if self.defuzzification == 'exact':
+            return self._aggregate_exact(cuts)
+        return self._aggregate_sampled(cuts)
+
+    def output_memberships(self, points):
+        """
+        Вычисляет функции принадлежности выходных термов в точках
+
+        :param points: массив точек выходного универсума
+        :return: массив формы (n_output_terms, *points.shape)
+        """
+        if self.defuzzification == 'exact':
+            a, b, c = (p.reshape((-1,) + (1,) * points.ndim) for p in self.output_params.T)
+            return trimf_values(points, a, b, c)
+        return np.array([np.interp(points, self.output_universe, mf) for mf in self.output_mfs])
+
+    def _aggregate_exact(self, cuts):
+        """
+        Строит агрегированную функцию по параметрам треугольных функций принадлежности
+
+        Точки излома: вершины треугольников, пересечения их сторон с уровнями
+        отсечения и пересечения отсеченных термов между собой. Их число
+        зависит только от количества термов, а не от шага универсума.
+
+        :param cuts: уровни отсечения выходных термов формы (N, n_output_terms)
+        :return: кортеж (точки формы (N, M), значения формы (N, M))
+        """
+        low, high = self.output_universe[0], self.output_universe[-1]
+        a, b, c = self.output_params.T
+        n = cuts.shape[0]
+
+        fixed = np.broadcast_to(np.concatenate([[low, high], a, b, c]), (n, 2 + 3 * len(a)))
+        points = np.concatenate([fixed, a + cuts * (b - a), c - cuts * (c - b)], axis=1)
+        points = np.sort(np.clip(points, low, high), axis=1)
+
+        def clipped(x):
+            values = trimf_values(x[:, None, :], a[None, :, None], b[None, :, None], c[None, :, None])
+            return np.minimum(cuts[:, :, None], values)
+
+        # Между соседними точками каждый отсеченный терм линеен; максимум
+        # линейных функций ломается только в точках их попарного пересечения
+        values = clipped(points)
+        x0, x1 = points[:, :-1], points[:, 1:]
+        crossings = [points]
+        for o in range(len(a)):
+            for p in range(o + 1, len(a)):
+                diff = values[:, o] - values[:, p]
+                d0, d1 = diff[:, :-1], diff[:, 1:]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    xs = x0 + d0 / (d0 - d1) * (x1 - x0)
+                crossings.append(np.where(d0 * d1 < 0, xs, x0))
+        points = np.sort(np.concatenate(crossings, axis=1), axis=1)
+        return points, clipped(points).max(axis=1)
+
+    def _aggregate_sampled(self, cuts):
+        """
+        Строит агрегированную функцию по значениям на точках универсума
+
+        Как и skfuzzy, дополняет универсум точками пересечения функций
+        принадлежности выходных термов с уровнями отсечения.
+
+        :param cuts: уровни отсечения выходных термов формы (N, n_output_terms)
+        :return: кортеж (точки формы (N, M), значения формы (N, M))
+        """
+        universe = self.output_universe
+        mfs = self.output_mfs
+        n = cuts.shape[0]
+        x0, x1 = universe[:-1], universe[1:]
+
+        points = [np.broadcast_to(universe, (n, universe.size))]
+        for o, mf in enumerate(mfs):
+            cut = cuts[:, o:o + 1]
+            y0, y1 = mf[:-1], mf[1:]
+            above = mf >= cut
+            crossing = above[:, :-1] != above[:, 1:]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                xs = x0 + (cut - y0) * (x1 - x0) / (y1 - y0)
+            # Отсутствующие пересечения заменяются узлом универсума:
+            # повторяющиеся точки дают отрезки нулевой ширины
+            points.append(np.where(crossing, xs, x0))
+        points = np.sort(np.concatenate(points, axis=1), axis=1)
+
+        idx = np.clip(np.searchsorted(universe, points, side='right') - 1, 0, universe.size - 2)
+        frac = (points - universe[idx]) / (universe[idx + 1] - universe[idx])
+        aggregated = np.zeros_like(points)
+        for o, mf in enumerate(mfs):
+            term_values = mf[idx] + frac * (mf[idx + 1] - mf[idx])
+            np.maximum(aggregated, np.minimum(cuts[:, o:o + 1], term_values), out=aggregated)
+        return points, aggregated
+
+    @staticmethod
+    def centroid(points, values):
+        """
+        Дефаззификация методом центра тяжести кусочно-линейной функции
+
+        :param points: точки формы (N, M), отсортированные по строкам
+        :param values: значения функции в точках формы (N, M)
+        :return: массив формы (N,), NaN при нулевой площади
+        """
+        x1, x2 = points[:, :-1], points[:, 1:]
+        y1, y2 = values[:, :-1], values[:, 1:]
+        dx = x2 - x1
+        area = (dx * (y1 + y2)).sum(axis=1) / 2
+        moment = (dx * (x1 * (2 * y1 + y2) + x2 * (y1 + 2 * y2))).sum(axis=1) / 6
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(area > 0, moment / area, np.nan)
+
+    def evaluate(self, values):
+        """
+        Выполняет нечеткий вывод для одного набора входов
+
+        Повторяет шаги evaluate_batch на кортежах чисел, без обращения
+        к словарям и графу правил skfuzzy.
+
+        :param values: последовательность из n_inputs чисел
+        :return: числовая оценка (NaN при нулевой площади или,
+                 для вывода Сугено, если ни одно правило не сработало)
+        """
+        n_terms = self.n_terms
+        degrees = [0.0] * (self.n_inputs * n_terms)
+        xs = []
+        for v, (universe, mfs) in enumerate(self._scalar_inputs):
+            x = min(max(float(values[v]), universe[0]), universe[-1])
+            xs.append(x)
+            i = min(max(bisect_right(universe, x) - 1, 0), len(universe) - 2)
+            frac = (x - universe[i]) / (universe[i + 1] - universe[i])
+            for t, mf in enumerate(mfs):
+                degrees[v * n_terms + t] = mf[i] + frac * (mf[i + 1] - mf[i])
+
+        universe, mfs = self._scalar_output
+        cuts = [0.0] * len(mfs)
+        sugeno = self._scalar_sugeno is not None
+        if self.sparse_rules:
+            self._fire_sparse(degrees, cuts, sugeno)
+        else:
+            self._fire_dense(degrees, cuts, sugeno)
+
+        if sugeno:
+            return self._sugeno_scalar(xs, cuts)
+
+        if self.defuzzification == 'exact':
+            return self._centroid_exact_scalar(cuts)
+
+        # Универсум, дополненный точками пересечения с уровнями отсечения
+        points = list(universe)
+        last = len(universe) - 1
+        for cut, mf in zip(cuts, mfs):
+            if cut <= 0:
+                continue
+            for i in range(last):
+                y0, y1 = mf[i], mf[i + 1]
+                if (y0 >= cut) != (y1 >= cut):
+                    points.append(universe[i] + (cut - y0) * (universe[i + 1] - universe[i]) / (y1 - y0))
+        points.sort()
+
+        area = 0.0
+        moment = 0.0
+        i = 0
+        prev_x = prev_y = None
+        for x in points:
+            while i < last - 1 and x >= universe[i + 1]:
+                i += 1
+            frac = (x - universe[i]) / (universe[i + 1] - universe[i])
+            y = 0.0
+            for cut, mf in zip(cuts, mfs):
+                term_value = mf[i] + frac * (mf[i + 1] - mf[i])
+                y = max(y, min(cut, term_value))
+            if prev_x is not None:
+                dx = x - prev_x
+                area += dx * (prev_y + y)
+                moment += dx * (prev_x * (2 * prev_y + y) + x * (prev_y + 2 * y))
+            prev_x, prev_y = x, y
+
+        if area <= 0:
+            return float('nan')
+        return (moment / 6) / (area / 2)
+
+    def _sugeno_scalar(self, xs, weights):
+        """
+        Выход Сугено для одного набора входов
+
+        :param xs: входы, приведенные к универсумам
+        :param weights: суммарные веса выходных термов
+        :return: взвешенное среднее заключений (NaN, если правила не сработали)
+        """
+        total = 0.0
+        moment = 0.0
+        for weight, coefs in zip(weights, self._scalar_sugeno):
+            if weight <= 0:
+                continue
+            value = coefs[0]
+            for coef, x in zip(coefs[1:], xs):
+                value += coef * x
+            total += weight
+            moment += weight * value
+        if total <= 0:
+            return float('nan')
+        return moment / total
+
+    def _centroid_exact_scalar(self, cuts):
+        """
+        Точный центр тяжести по параметрам функций принадлежности для одного
+        набора уровней отсечения (повторяет _aggregate_exact на списках чисел)
+
+        :param cuts: уровни отсечения выходных термов
+        :return: числовая оценка (NaN при нулевой площади)
+        """
+        low, high = self._scalar_output[0][0], self._scalar_output[0][-1]
+        params = self._scalar_params
+        points = [low, high]
+        for cut, (a, b, c) in zip(cuts, params):
+            points += [a, b, c, a + cut * (b - a), c - cut * (c - b)]
+        points = sorted(min(max(x, low), high) for x in points)
+
+        def clipped(x):
+            return [min(cut, _trimf_scalar(x, a, b, c)) for cut, (a, b, c) in zip(cuts, params)]
+
+        # Попарные пересечения отсеченных термов между соседними точками
+        values = [clipped(x) for x in points]
+        crossings = []
+        n_terms = len(params)
+        for k in range(len(points) - 1):
+            x0, x1 = points[k], points[k + 1]
+            for o in range(n_terms):
+                for p in range(o + 1, n_terms):
+                    d0 = values[k][o] - values[k][p]
+                    d1 = values[k + 1][o] - values[k + 1][p]
+                    if d0 * d1 < 0:
+                        crossings.append(x0 + d0 / (d0 - d1) * (x1 - x0))
+        if crossings:
+            points = sorted(points + crossings)
+
+        area = 0.0
+        moment = 0.0
+        prev_x = prev_y = None
+        for x in points:
+            y = max(clipped(x))
+            if prev_x is not None:
+                dx = x - prev_x
+                area += dx * (prev_y + y)
+                moment += dx * (prev_x * (2 * prev_y + y) + x * (prev_y + 2 * y))
+            prev_x, prev_y = x, y
+
+        if area <= 0:
+            return float('nan')
+        return (moment / 6) / (area / 2)
+
+    def trace(self, values):
+        """
+        Выполняет нечеткий вывод для одного набора входов с сохранением
+        промежуточных результатов
+
+        Для вывода Сугено points - заключения выходных термов,
+        aggregated - их нормированные веса.
+
+        :param values: последовательность из n_inputs чисел
+        :return: InferenceTrace
+        """
+        inputs = np.asarray([values], dtype=np.float64)
+        memberships = self.fuzzify(inputs)
+        strengths = self.fire_rules(memberships)
+        cuts = self.accumulate(strengths)
+        if self.inference == 'sugeno':
+            points = self.sugeno_values(inputs)
+            numeric = self.weighted_average(cuts, points)
+            total = cuts.sum(axis=1, keepdims=True)
+            aggregated = cuts / total if total[0, 0] > 0 else np.zeros_like(cuts)
+        else:
+            points, aggregated = self.aggregate(cuts)
+            numeric = self.centroid(points, aggregated)
+        return InferenceTrace(tuple(float(v) for v in values), self.fingerprint, memberships[0],
+                              strengths[0], cuts[0], points[0], aggregated[0], float(numeric[0]))
+
+    def describe_rule(self, index):
+        """
+        Формирует текст правила
+
+        :param index: номер правила
+        :return: строка вида 'качество высокое и точность высокая → отличник'
+        """
+        joiner = ' и ' if self.rule_ops[index] == OP_AND else ' или '
+        conditions = [
+            f"{self.input_labels[v]} {self.input_terms[v][t]}"
+            for v, t, used in zip(self.rule_vars[index], self.rule_terms[index], self.rule_mask[index])
+            if used
+        ]
+        return f"{joiner.join(conditions)} → {self.output_terms[self.rule_outputs[index]]}"
+
+    def explain(self, trace, limit=3):
+        """
+        Перечисляет сильнее всего сработавшие правила
+
+        :param trace: InferenceTrace этой модели
+        :param limit: максимальное количество правил
+        :return: список кортежей (степень срабатывания, текст правила)
+        """
+        if trace.fingerprint != self.fingerprint:
+            raise ValueError("Трассировка получена на другой версии модели")
+        order = np.argsort(-trace.strengths, kind='stable')[:limit]
+        return [(float(trace.strengths[r]), self.describe_rule(r)) for r in order if trace.strengths[r] > 0]
+
+    def evaluate_batch(self, inputs, chunk_size=4096):
+        """
+        Выполняет нечеткий вывод для массива входов
+
+        :param inputs: массив формы (N, n_inputs)
+        :param chunk_size: размер блока, ограничивающий расход памяти; при
+                           дискретной дефаззификации дополнительно ограничен
+                           CHUNK_POINTS точками выходного универсума;
+                           при большой базе правил - CHUNK_RULE_SLOTS
+        :return: кортеж (числовые оценки формы (N,), коды категорий формы (N,))
+        """
+        inputs = np.atleast_2d(np.asarray(inputs, dtype=np.float64))
+        if inputs.ndim != 2 or inputs.shape[1] != self.n_inputs:
+            raise ValueError(f"Ожидается массив формы (N, {self.n_inputs}), получен {inputs.shape}")
+        if self.inference == 'mamdani' and self.defuzzification == 'sampled':
+            chunk_size = min(chunk_size, self.CHUNK_POINTS // self.output_universe.size)
+        chunk_size = max(1, min(chunk_size, self.CHUNK_RULE_SLOTS // self.rule_mask.size))
+
+        numeric = np.empty(inputs.shape[0])
+        for start in range(0, inputs.shape[0], chunk_size):
+            chunk = inputs[start:start + chunk_size]
+            cuts = self.accumulate(self.fire_rules(self.fuzzify(chunk)))
+            if self.inference == 'sugeno':
+                numeric[start:start + chunk_size] = self.weighted_average(cuts, self.sugeno_values(chunk))
+            else:
+                numeric[start:start + chunk_size] = self.centroid(*self.aggregate(cuts))
+        return numeric, categorize(numeric)
+
+
+class GradeLookupTable:
+    """
+    Таблица заранее вычисленных оценок на целочисленной сетке входов
+
+    Для целочисленных входов возвращает точный результат вывода, для дробных -
+    мультилинейную (для трех входов - трилинейную) интерполяцию по соседним
+    узлам, если она запрошена. Если среди соседних узлов есть ошибка
+    вычисления, результат - NaN. Интерполяция приближенная: для базы правил
+    по умолчанию она отличается от точного вывода до ~1.1 балла и вблизи
+    границ категорий может дать другую категорию.
+    """
+
+    def __init__(self, numeric, fingerprint, low=0):
+        """
+        :param numeric: массив оценок формы (size,) * n_inputs, NaN - ошибка вычисления
+        :param fingerprint: отпечаток модели, по которой построена таблица
+        :param low: значение входа, соответствующее нулевому индексу
+        """
+        self.numeric = np.asarray(numeric, dtype=np.float64)
+        self.codes = categorize(self.numeric)
+        self.fingerprint = fingerprint
+        self.low = low
+        self.high = low + self.numeric.shape[0] - 1
+
+    @classmethod
+    def build(cls, model, low=0, high=10):
+        """
+        Строит таблицу пакетным выводом по всем узлам сетки
+
+        :param model: CompiledFuzzyModel
+        :param low: минимальное целое значение входа
+        :param high: максимальное целое значение входа
+        :return: GradeLookupTable
+        """
+        values = np.arange(low, high + 1, dtype=np.float64)
+        grids = np.meshgrid(*[values] * model.n_inputs, indexing='ij')
+        inputs = np.column_stack([grid.ravel() for grid in grids])
+        numeric, _ = model.evaluate_batch(inputs)
+        return cls(numeric.reshape(grids[0].shape), model.fingerprint, low)
+
+    def save(self, path):
+        """
+        Сохраняет таблицу в файл .npz
+
+        :param path: путь к файлу
+        """
+        # Временный файл свой для каждого процесса: таблицу могут
+        # одновременно сохранять несколько процессов-обработчиков
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, numeric=self.numeric, fingerprint=self.fingerprint, low=self.low)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Загружает таблицу из файла .npz
+
+        :param path: путь к файлу
+        :return: GradeLookupTable или None, если файла нет или он поврежден
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                return cls(data['numeric'], str(data['fingerprint']), int(data['low']))
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def lookup(self, values, interpolate=False):
+        """
+        Возвращает оценку для набора входов
+
+        :param values: последовательность из n_inputs чисел
+        :param interpolate: интерполировать дробные входы (приближенно, см.
+                            описание класса); при False для них возвращается None
+        :return: числовая оценка (NaN - ошибка вычисления) или None
+        """
+        index = []
+        fracs = []
+        for x in values:
+            x = min(max(float(x), self.low), self.high) - self.low
+            i = int(x)
+            index.append(i)
+            fracs.append(x - i)
+
+        if not any(fracs):
+            return float(self.numeric[tuple(index)])
+        if not interpolate:
+            return None
+
+        # Сумма значений в вершинах ячейки с весами (1 - f) или f по каждой оси
+        result = 0.0
+        for corner in range(1 << len(index)):
+            weight = 1.0
+            cell = []
+            for axis, (i, frac) in enumerate(zip(index, fracs)):
+                if corner >> axis & 1:
+                    weight *= frac
+                    cell.append(i + 1)
+                else:
+                    weight *= 1.0 - frac
+                    cell.append(i)
+            if weight:
+                result += weight * self.numeric[tuple(cell)]
+        return float(result)
@@ -1,168 +1,589 @@
+import math
+import threading
+
 import numpy as np
-import skfuzzy as fuzz
 from skfuzzy import control as ctrl
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+from cache import LRUCache
+from charts import (
+    ResultChartRenderer, draw_membership_functions, draw_result, figure_pool,
+    MEMBERSHIP_FIGSIZE, RESULT_FIGSIZE
+)
+from fuzzy_engine import (
+    CATEGORIES, CATEGORY_THRESHOLDS, DEFUZZIFICATION_MODES, INFERENCE_MODES, CompiledFuzzyModel, GradeLookupTable
+)
+from rule_base import DEFAULT_RULE_BASE_PATH, build_rule_base, file_signature, load_rule_base, sugeno_consequents
+
+# Доступные движки нечеткого вывода
+ENGINES = ('skfuzzy', 'compiled')
+
+# Профили точности: шаг универсумов всех переменных. Мелкий шаг уточняет
+# числовую оценку, но замедляет вывод пропорционально числу точек
+RESOLUTION_PROFILES = {
+    'chat': 1.0,
+    'standard': 0.1,
+    'audit': 0.01,
+}
+
+# Границы универсумов переменных
+UNIVERSE_RANGE = (0, 10)
+
+# Переменные, которые должна описывать база правил: evaluate принимает
+# входы в этом порядке
+INPUT_LABELS = ('качество', 'точность', 'сроки')
+OUTPUT_LABEL = 'оценка'
+
+# Заголовки графиков функций принадлежности
+VARIABLE_TITLES = {
+    'качество': 'Качество выполнения',
+    'точность': 'Точность результата',
+    'сроки': 'Соблюдение сроков',
+    'оценка': 'Итоговая оценка',
+}
+
+
+def make_universe(resolution):
+    """
+    Строит универсум переменной для профиля точности
+
+    :param resolution: название профиля из RESOLUTION_PROFILES или шаг универсума
+    :return: массив точек от UNIVERSE_RANGE[0] до UNIVERSE_RANGE[1] включительно
+    :raises ValueError: неизвестный профиль или шаг, не делящий диапазон нацело
+    """
+    if isinstance(resolution, str):
+        if resolution not in RESOLUTION_PROFILES:
+            raise ValueError(f"Неизвестный профиль точности '{resolution}', "
+                             f"доступны: {', '.join(RESOLUTION_PROFILES)}")
+        resolution = RESOLUTION_PROFILES[resolution]
+
+    low, high = UNIVERSE_RANGE
+    count = (high - low) / resolution if resolution > 0 else 0
+    if count < 1 or abs(count - round(count)) > 1e-9:
+        raise ValueError(f"Шаг универсума {resolution} должен делить диапазон {low}-{high} нацело")
+    # linspace вместо arange: при дробном шаге точки не накапливают погрешность
+    return np.linspace(low, high, round(count) + 1)
+
 
 class FuzzyGradeSystem:
-    def __init__(self):
-        # Определение входных переменных
-        self.quality = ctrl.Antecedent(np.arange(0, 11, 1), 'качество')
-        self.accuracy = ctrl.Antecedent(np.arange(0, 11, 1), 'точность')
-        self.deadline = ctrl.Antecedent(np.arange(0, 11, 1), 'сроки')
-        
-        # Определение выходной переменной
-        self.grade = ctrl.Consequent(np.arange(0, 11, 1), 'оценка')
-        
-        # Определение функций принадлежности для входных переменных
-        self.quality['низкое'] = fuzz.trimf(self.quality.universe, [0, 0, 5])
-        self.quality['среднее'] = fuzz.trimf(self.quality.universe, [3, 5, 8])
-        self.quality['высокое'] = fuzz.trimf(self.quality.universe, [6, 10, 10])
-        
-        self.accuracy['низкая'] = fuzz.trimf(self.accuracy.universe, [0, 0, 5])
-        self.accuracy['средняя'] = fuzz.trimf(self.accuracy.universe, [3, 5, 8])
-        self.accuracy['высокая'] = fuzz.trimf(self.accuracy.universe, [6, 10, 10])
-        
-        self.deadline['поздно'] = fuzz.trimf(self.deadline.universe, [0, 0, 5])
-        self.deadline['вовремя'] = fuzz.trimf(self.deadline.universe, [3, 5, 8])
-        self.deadline['досрочно'] = fuzz.trimf(self.deadline.universe, [6, 10, 10])
-        
-        # Определение функций принадлежности для выходной переменной
-        self.grade['троечник'] = fuzz.trimf(self.grade.universe, [0, 0, 5])
-        self.grade['хорошист'] = fuzz.trimf(self.grade.universe, [3, 5, 8])
-        self.grade['отличник'] = fuzz.trimf(self.grade.universe, [6, 10, 10])
-        
-        # Определение правил нечеткого вывода
-        rule1 = ctrl.Rule(
-            self.quality['высокое'] & self.accuracy['высокая'] & self.deadline['досрочно'],
-            self.grade['отличник']
-        )
+    def __init__(self, engine='compiled', use_lookup_table=False, lookup_table_path=None, interpolate=False,
+                 cache_size=None, cache_precision=2, defuzzification='sampled', resolution='chat',
+                 rules_path=None, inference='mamdani'):
+        """
+        :param engine: движок вывода для evaluate: 'compiled' (по умолчанию) -
+                       скомпилированная модель, 'skfuzzy' - ControlSystemSimulation
+        :param use_lookup_table: отвечать из таблицы оценок на сетке 11x11x11
+        :param lookup_table_path: файл .npz для сохранения и загрузки таблицы
+        :param interpolate: для дробных входов интерполировать по таблице (True)
+                            или выполнять точный вывод (False, по умолчанию).
+                            Интерполяция отличается от точного вывода до
+                            ~1.1 балла и меняет категорию примерно у 2%
+                            случайных дробных входов
+        :param cache_size: размер LRU-кэша результатов evaluate (None - без кэша)
+        :param cache_precision: число знаков после запятой, до которого
+                                округляются входы при включенном кэше
+        :param defuzzification: 'sampled' - центр тяжести по точкам универсума,
+                                как в skfuzzy; 'exact' - точный центр тяжести
+                                по параметрам треугольных функций принадлежности
+        :param resolution: профиль точности из RESOLUTION_PROFILES ('chat' - шаг 1,
+                           'standard' - 0.1, 'audit' - 0.01) или шаг универсума
+        :param rules_path: файл JSON с переменными, термами и правилами
+                           (None - rule_base.json рядом с модулем)
+        :param inference: 'mamdani' (по умолчанию) или 'sugeno' - взвешенное
+                          среднее заключений правил из раздела sugeno базы
+                          правил; дешевле, но график результата не строится
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Неизвестный движок '{engine}', доступны: {', '.join(ENGINES)}")
+        if defuzzification not in DEFUZZIFICATION_MODES:
+            raise ValueError(f"Неизвестный способ дефаззификации '{defuzzification}', "
+                             f"доступны: {', '.join(DEFUZZIFICATION_MODES)}")
+        if engine == 'skfuzzy' and defuzzification != 'sampled':
+            raise ValueError("Движок skfuzzy поддерживает только дефаззификацию 'sampled'")
+        if inference not in INFERENCE_MODES:
+            raise ValueError(f"Неизвестный способ вывода '{inference}', доступны: {', '.join(INFERENCE_MODES)}")
+        if inference != 'mamdani' and (engine == 'skfuzzy' or defuzzification != 'sampled'):
+            raise ValueError("Вывод Сугено выполняется только движком compiled без выбора дефаззификации")
+        self.engine = engine
+        self.defuzzification = defuzzification
+        self.inference = inference
+        self.resolution = resolution
+        universe = make_universe(resolution)
+        self.use_lookup_table = use_lookup_table
+        self.lookup_table_path = lookup_table_path
+        self.interpolate = interpolate
+        self.lookup_table = None
+        self.result_renderer = None
+        self.cache_precision = cache_precision
+        self.cache = LRUCache(cache_size) if cache_size else None
         
-        rule2 = ctrl.Rule(
-            self.quality['высокое'] & self.accuracy['высокая'] & self.deadline['вовремя'],
-            self.grade['отличник']
-        )
+        # Объекты skfuzzy хранят промежуточные результаты в термах,
+        # поэтому обращения к ним сериализуются. Скомпилированная модель
+        # неизменяема, графики строятся по ней и используются без блокировки.
+        self._lock = threading.RLock()
         
-        rule3 = ctrl.Rule(
-            self.quality['среднее'] & self.accuracy['средняя'] & self.deadline['вовремя'],
-            self.grade['хорошист']
-        )
+        # Перезагрузки базы правил выполняются по одной
+        self._reload_lock = threading.RLock()
         
-        rule4 = ctrl.Rule(
-            self.quality['среднее'] & self.accuracy['высокая'] & self.deadline['вовремя'],
-            self.grade['хорошист']
-        )
+        # Переменные, термы и правила описаны в файле базы правил
+        self._install(self._build(self._read_rule_base(rules_path or DEFAULT_RULE_BASE_PATH), universe))
         
-        rule5 = ctrl.Rule(
-            self.quality['низкое'] | self.accuracy['низкая'] | self.deadline['поздно'],
-            self.grade['троечник']
-        )
+    def _read_rule_base(self, rules_path):
+        """
+        Загружает базу правил и запоминает версию файла
         
-        rule6 = ctrl.Rule(
-            self.quality['высокое'] & self.accuracy['средняя'] & self.deadline['вовремя'],
-            self.grade['хорошист']
-        )
+        :param rules_path: путь к файлу базы правил
+        :return: проверенное описание базы правил
+        :raises ValueError: файл не является корректной базой правил для системы
+        """
+        # Версия запоминается до чтения: изменение во время чтения
+        # будет замечено при следующей проверке
+        self.rules_path = rules_path
+        self.rules_signature = file_signature(rules_path)
+        definition = load_rule_base(rules_path)
+        
+        labels = (*definition['inputs'], *definition['output'])
+        if labels != (*INPUT_LABELS, OUTPUT_LABEL):
+            raise ValueError(f"База правил должна описывать переменные "
+                             f"{', '.join(INPUT_LABELS)} -> {OUTPUT_LABEL}, получено {', '.join(labels)}")
+        return definition
+    
+    def _build(self, definition, universe):
+        """
+        Строит переменные, правила, систему управления и скомпилированную модель
         
-        rule7 = ctrl.Rule(
-            self.quality['среднее'] & self.accuracy['средняя'] & self.deadline['досрочно'],
-            self.grade['хорошист']
+        :param definition: проверенное описание базы правил
+        :param universe: универсум переменных
+        :return: словарь атрибутов для _install
+        """
+        antecedents, grade, rules = build_rule_base(definition, universe)
+        term_params = {label: {term: tuple(params) for term, params in terms.items()}
+                       for label, terms in {**definition['inputs'], **definition['output']}.items()}
+        sugeno_params = sugeno_consequents(definition)
+        quality, accuracy, deadline = antecedents
+        return {
+            'quality': quality,
+            'accuracy': accuracy,
+            'deadline': deadline,
+            'grade': grade,
+            'rules': rules,
+            'term_params': term_params,
+            'sugeno_params': sugeno_params,
+            'grade_ctrl': ctrl.ControlSystem(rules),
+            'model': self._compile_model(antecedents, grade, rules, term_params, sugeno_params),
+        }
+    
+    def _compile_model(self, antecedents, grade, rules, term_params, sugeno_params):
+        """
+        Компилирует модель с параметрами вывода этой системы
+        
+        :return: CompiledFuzzyModel
+        """
+        return CompiledFuzzyModel(
+            antecedents,
+            grade,
+            rules,
+            output_params=term_params[grade.label],
+            defuzzification=self.defuzzification,
+            inference=self.inference,
+            sugeno_params=sugeno_params,
         )
+    
+    def _install(self, parts):
+        """
+        Атомарно заменяет модель: вычисления, начатые со старой
+        моделью, завершаются на ней
+        
+        :param parts: результат _build
+        """
+        model = parts['model']
+        with self._lock:
+            for name, value in parts.items():
+                setattr(self, name, value)
+            
+            # Результаты других версий модели больше не запрашиваются
+            if self.cache is not None:
+                self.cache.purge(lambda key: key[0] != model.fingerprint)
+    
+    def compile(self):
+        """
+        Собирает систему управления и скомпилированную модель
         
-        # Создание системы управления
-        self.grade_ctrl = ctrl.ControlSystem([rule1, rule2, rule3, rule4, rule5, rule6, rule7])
-        self.grading = ctrl.ControlSystemSimulation(self.grade_ctrl)
+        Вызывается после изменения функций принадлежности или правил;
+        таблица оценок перестраивается при следующем обращении,
+        из кэша результатов удаляются результаты прежней модели.
+        """
+        with self._lock:
+            self._install({
+                'grade_ctrl': ctrl.ControlSystem(self.rules),
+                'model': self._compile_model([self.quality, self.accuracy, self.deadline], self.grade,
+                                             self.rules, self.term_params, self.sugeno_params),
+            })
+    
+    def reload_rules(self):
+        """
+        Перечитывает файл базы правил и атомарно заменяет модель
         
-    def evaluate(self, quality_val, accuracy_val, deadline_val):
+        Новая модель строится без блокировки; при ошибке в файле
+        продолжает работать прежняя модель.
+        
+        :return: True, если отпечаток модели изменился
+        :raises OSError: файл недоступен
+        :raises ValueError: файл не является корректной базой правил
+        """
+        with self._reload_lock:
+            old_fingerprint = self.model.fingerprint
+            parts = self._build(self._read_rule_base(self.rules_path), make_universe(self.resolution))
+            self._install(parts)
+            return parts['model'].fingerprint != old_fingerprint
+    
+    def reload_if_changed(self):
+        """
+        Перечитывает базу правил, если файл изменился с прошлой загрузки
+        
+        Проверка стоит одного вызова stat, поэтому ее можно выполнять
+        перед каждым вычислением.
+        
+        :return: True, если отпечаток модели изменился
+        :raises OSError: файл недоступен
+        :raises ValueError: файл не является корректной базой правил
+        """
+        if file_signature(self.rules_path) == self.rules_signature:
+            return False
+        with self._reload_lock:
+            if file_signature(self.rules_path) == self.rules_signature:
+                return False
+            return self.reload_rules()
+    
+    def get_lookup_table(self, model=None):
+        """
+        Возвращает таблицу оценок для модели
+        
+        Таблица загружается из lookup_table_path или строится заново,
+        если ее нет или она построена для другой модели.
+        
+        :param model: CompiledFuzzyModel (по умолчанию текущая модель)
+        :return: GradeLookupTable
+        """
+        model = model or self.model
+        table = self.lookup_table
+        if table is not None and table.fingerprint == model.fingerprint:
+            return table
+        
+        with self._lock:
+            table = self.lookup_table
+            if table is not None and table.fingerprint == model.fingerprint:
+                return table
+            
+            if self.lookup_table_path:
+                table = GradeLookupTable.load(self.lookup_table_path)
+            if table is None or table.fingerprint != model.fingerprint:
+                table = GradeLookupTable.build(model)
+                if self.lookup_table_path:
+                    table.save(self.lookup_table_path)
+            
+            self.lookup_table = table
+            return table
+    
+    def get_result_renderer(self, model=None):
+        """
+        Возвращает построитель графиков результата для модели
+        
+        Статический слой графика рисуется при первом обращении
+        и после каждого изменения модели.
+        
+        :param model: CompiledFuzzyModel (по умолчанию текущая модель)
+        :return: ResultChartRenderer
+        """
+        model = model or self.model
+        renderer = self.result_renderer
+        if renderer is not None and renderer.fingerprint == model.fingerprint:
+            return renderer
+        
+        with self._lock:
+            renderer = self.result_renderer
+            if renderer is None or renderer.fingerprint != model.fingerprint:
+                renderer = ResultChartRenderer(model)
+                self.result_renderer = renderer
+            return renderer
+    
+    def _infer(self, values, model):
+        """
+        Выполняет нечеткий вывод выбранным движком
+        
+        :param values: кортеж (качество, точность, сроки)
+        :param model: CompiledFuzzyModel для движка 'compiled'
+        :return: числовая оценка (NaN, если вывод не определен)
+        """
+        if self.engine == 'compiled':
+            return model.evaluate(values)
+        
+        with self._lock:
+            grading = self._simulate(*values)
+            
+            # Получение числового результата
+            return grading.output['оценка']
+    
+    def _simulate(self, quality_val, accuracy_val, deadline_val):
+        """
+        Выполняет вывод skfuzzy в отдельной симуляции
+        
+        Общая симуляция возвращала бы результат предыдущего вызова,
+        если для новых входов вывод не определен.
+        
+        :return: ctrl.ControlSystemSimulation с вычисленным результатом
+        """
+        grading = ctrl.ControlSystemSimulation(self.grade_ctrl)
+        
+        # Установка входных значений
+        grading.input['качество'] = quality_val
+        grading.input['точность'] = accuracy_val
+        grading.input['сроки'] = deadline_val
+        
+        grading.compute()
+        return grading
+    
+    def evaluate(self, quality_val, accuracy_val, deadline_val, with_trace=False):
         """
         Оценивает знания студента на основе входных параметров
         
+        Метод не изменяет состояние модели и может вызываться одновременно
+        из нескольких потоков.
+        
         :param quality_val: качество выполнения работы (0-10)
         :param accuracy_val: точность полученного результата (0-10)
         :param deadline_val: соблюдение сроков (0-10)
-        :return: кортеж (числовая_оценка, текстовая_оценка)
+        :param with_trace: вернуть также трассировку вывода (InferenceTrace)
+                           для объяснения и графика; оценка при этом совпадает
+                           с трассировкой: для целых входов она, как обычно,
+                           берется из кэша или таблицы (на сетке таблица точна),
+                           для дробных - из трассировки, а не интерполяцией.
+                           Трассировку строит скомпилированная модель; при
+                           движке skfuzzy оценку для дробных входов вычисляет
+                           он, и она совпадает с трассировкой с точностью до
+                           CompiledFuzzyModel.TOLERANCE
+        :return: кортеж (числовая_оценка, текстовая_оценка),
+                 при with_trace - (числовая_оценка, текстовая_оценка, трассировка)
         """
-        # Установка входных значений
-        self.grading.input['качество'] = quality_val
-        self.grading.input['точность'] = accuracy_val
-        self.grading.input['сроки'] = deadline_val
+        values = (quality_val, accuracy_val, deadline_val)
+        
+        # Все шаги выполняются на одной версии модели
+        model = self.model
+        
+        if with_trace:
+            trace = model.trace(values)
+            if not (self.use_lookup_table and all(float(value).is_integer() for value in values)):
+                if self.engine == 'compiled':
+                    return (*self._grade_result(trace.numeric), trace)
+                return (*self._evaluate(values, model, use_table=False), trace)
+        
+        # Кэш хранит результаты для входов, округленных до cache_precision;
+        # ключ включает отпечаток модели, поэтому результат, вычисленный
+        # старой моделью во время ее замены, не попадет к новой
+        if self.cache is not None:
+            key = (model.fingerprint, *(round(float(value), self.cache_precision) for value in values))
+            result = self.cache.get(key)
+            if result is None:
+                result = self._evaluate(key[1:], model)
+                self.cache.put(key, result)
+        else:
+            result = self._evaluate(values, model)
         
+        if with_trace:
+            return (*result, trace)
+        return result
+    
+    def _evaluate(self, values, model, use_table=True):
+        """
+        Оценивает знания студента без обращения к кэшу
+        
+        :param values: кортеж (качество, точность, сроки)
+        :param model: CompiledFuzzyModel, на которой выполняются все шаги
+        :param use_table: отвечать из таблицы оценок, если она используется
+        :return: кортеж (числовая_оценка, текстовая_оценка)
+        """
         # Вычисление
         try:
-            self.grading.compute()
-            
-            # Получение числового результата
-            numeric_grade = self.grading.output['оценка']
+            numeric_grade = None
+            if self.use_lookup_table and use_table:
+                numeric_grade = self.get_lookup_table(model).lookup(values, self.interpolate)
             
-            # Определение текстовой оценки на основе числового результата
-            if numeric_grade < 4:
-                text_grade = 'троечник'
-            elif numeric_grade < 7:
-                text_grade = 'хорошист'
-            else:
-                text_grade = 'отличник'
-                
-            return numeric_grade, text_grade
+            # Точный вывод, если таблица не дала ответа
+            if numeric_grade is None or math.isnan(numeric_grade):
+                numeric_grade = self._infer(values, model)
+            return self._grade_result(numeric_grade)
         except:
             return None, 'ошибка вычисления'
     
-    def visualize(self):
+    @staticmethod
+    def _grade_result(numeric_grade):
+        """
+        Определяет текстовую оценку на основе числового результата
+        
+        :param numeric_grade: числовая оценка (NaN - вывод не определен)
+        :return: кортеж (числовая_оценка, текстовая_оценка)
+        """
+        if math.isnan(numeric_grade):
+            return None, 'ошибка вычисления'
+        
+        if numeric_grade < 4:
+            text_grade = 'троечник'
+        elif numeric_grade < 7:
+            text_grade = 'хорошист'
+        else:
+            text_grade = 'отличник'
+        
+        return numeric_grade, text_grade
+    
+    def required_input(self, target_category, fixed, free='сроки', tolerance=0.01):
+        """
+        Находит минимальное значение входа free, при котором студент
+        попадает в категорию target_category или выше
+        
+        Сначала проверяются целые значения free: для целочисленных fixed -
+        по таблице оценок, если она используется, иначе одним пакетным
+        выводом. Между последним непрошедшим и первым прошедшим значением
+        граница уточняется делением отрезка пополам скомпилированной
+        моделью. Если оценка немонотонна по free, найденное значение -
+        наименьшее из проходящих целых, уточненное внутри одного шага.
+        
+        :param target_category: категория из fuzzy_engine.CATEGORIES
+        :param fixed: словарь значений остальных входов {переменная: значение}
+        :param free: вход, значение которого ищется (из INPUT_LABELS)
+        :param tolerance: точность результата
+        :return: минимальное значение free (0-10, проходящее с запасом не больше
+                 tolerance) или None, если категория недостижима
+        :raises ValueError: неизвестная категория или переменная, неполный fixed,
+                            значение fixed вне UNIVERSE_RANGE, tolerance <= 0
+        """
+        if target_category not in CATEGORIES:
+            raise ValueError(f"Неизвестная категория '{target_category}', доступны: {', '.join(CATEGORIES)}")
+        if free not in INPUT_LABELS:
+            raise ValueError(f"Неизвестный вход '{free}', доступны: {', '.join(INPUT_LABELS)}")
+        if set(fixed) != set(INPUT_LABELS) - {free}:
+            raise ValueError(f"Нужны значения входов {', '.join(label for label in INPUT_LABELS if label != free)}")
+        low, high = UNIVERSE_RANGE
+        for label, value in fixed.items():
+            # Значение вне диапазона дало бы чужую строку таблицы или IndexError
+            if not low <= float(value) <= high:
+                raise ValueError(f"Значение входа '{label}' должно быть в диапазоне {low}-{high}, получено {value}")
+        if not tolerance > 0:
+            raise ValueError(f"Точность должна быть положительной, получено {tolerance}")
+        
+        model = self.model
+        rank = CATEGORIES.index(target_category)
+        threshold = CATEGORY_THRESHOLDS[rank - 1] if rank else -math.inf
+        axis = INPUT_LABELS.index(free)
+        values = [float(fixed.get(label, 0.0)) for label in INPUT_LABELS]
+        
+        candidates = np.arange(low, high + 1, dtype=np.float64)
+        if self.use_lookup_table and all(value.is_integer() for value in values):
+            index = [int(value) - low for value in values]
+            index[axis] = slice(None)
+            numeric = self.get_lookup_table(model).numeric[tuple(index)]
+        else:
+            inputs = np.tile(values, (candidates.size, 1))
+            inputs[:, axis] = candidates
+            numeric, _ = model.evaluate_batch(inputs)
+        
+        # NaN (оценка не определена) не проходит ни одну границу
+        passing = np.flatnonzero(numeric >= threshold)
+        if not passing.size:
+            return None
+        if passing[0] == 0:
+            return float(low)
+        
+        lo, hi = candidates[passing[0] - 1], candidates[passing[0]]
+        while hi - lo > tolerance:
+            values[axis] = (lo + hi) / 2
+            if model.evaluate(values) >= threshold:
+                hi = values[axis]
+            else:
+                lo = values[axis]
+        return float(hi)
+    
+    def evaluate_batch(self, inputs):
+        """
+        Оценивает знания группы студентов за один векторизованный проход
+        
+        Результат совпадает с evaluate с точностью до CompiledFuzzyModel.TOLERANCE.
+        
+        :param inputs: массив формы (N, 3) со столбцами качество, точность, сроки (0-10)
+        :return: кортеж (числовые оценки формы (N,), коды категорий формы (N,));
+                 код - индекс в fuzzy_engine.CATEGORIES, -1 и NaN - ошибка вычисления
+        """
+        return self.model.evaluate_batch(inputs)
+    
+    def visualize(self, fig=None):
         """
         Визуализирует функции принадлежности для всех переменных
+        
+        :param fig: фигура matplotlib, на которой рисовать (None - новая
+                    фигура без pyplot; ее время жизни определяет вызывающий код)
+        :return: фигура matplotlib
         """
-        # Создание фигуры с несколькими подграфиками
-        plt.figure(figsize=(12, 10))
-        
-        # Качество
-        plt.subplot(2, 2, 1)
-        self.quality.view()
-        plt.title('Качество выполнения')
-        plt.ylabel('Степень принадлежности')
-        plt.xlabel('Оценка (0-10)')
-        
-        # Точность
-        plt.subplot(2, 2, 2)
-        self.accuracy.view()
-        plt.title('Точность результата')
-        plt.ylabel('Степень принадлежности')
-        plt.xlabel('Оценка (0-10)')
-        
-        # Сроки
-        plt.subplot(2, 2, 3)
-        self.deadline.view()
-        plt.title('Соблюдение сроков')
-        plt.ylabel('Степень принадлежности')
-        plt.xlabel('Оценка (0-10)')
-        
-        # Оценка
-        plt.subplot(2, 2, 4)
-        self.grade.view()
-        plt.title('Итоговая оценка')
-        plt.ylabel('Степень принадлежности')
-        plt.xlabel('Оценка (0-10)')
-        
-        plt.tight_layout()
-        return plt.gcf()
-    
-    def visualize_result(self, quality_val, accuracy_val, deadline_val):
+        if fig is None:
+            fig = Figure(figsize=MEMBERSHIP_FIGSIZE)
+        return draw_membership_functions(fig, self.model, VARIABLE_TITLES)
+    
+    def visualize_result(self, quality_val, accuracy_val, deadline_val, fig=None, trace=None):
         """
         Визуализирует результат нечеткого вывода для конкретных входных значений
         
         :param quality_val: качество выполнения работы (0-10)
         :param accuracy_val: точность полученного результата (0-10)
         :param deadline_val: соблюдение сроков (0-10)
+        :param fig: фигура matplotlib, на которой рисовать (None - новая
+                    фигура без pyplot; ее время жизни определяет вызывающий код)
+        :param trace: трассировка из evaluate(..., with_trace=True); без нее
+                      вывод выполняется заново
+        :return: фигура matplotlib
+        :raises ValueError: оценка не определена для этих входов
         """
-        # Установка входных значений
-        self.grading.input['качество'] = quality_val
-        self.grading.input['точность'] = accuracy_val
-        self.grading.input['сроки'] = deadline_val
+        model = self.model
+        trace = self._trace_for(model, (quality_val, accuracy_val, deadline_val), trace)
+        if fig is None:
+            fig = Figure(figsize=RESULT_FIGSIZE)
+        return draw_result(fig, model, trace)
+    
+    @staticmethod
+    def _trace_for(model, values, trace):
+        """
+        Возвращает трассировку вывода для модели, выполняя вывод только
+        если трассировки нет или она получена на другой версии модели
         
-        # Вычисление
-        self.grading.compute()
+        :param model: CompiledFuzzyModel
+        :param values: кортеж (качество, точность, сроки)
+        :param trace: готовая трассировка или None
+        :return: InferenceTrace
+        """
+        if trace is None or trace.fingerprint != model.fingerprint:
+            trace = model.trace(values)
+        return trace
+    
+    def render_membership(self):
+        """
+        Строит график функций принадлежности в PNG на фигуре из общего пула
         
-        # Визуализация
-        plt.figure(figsize=(8, 6))
-        self.grade.view(sim=self.grading)
-        plt.title(f'Результат: {self.grading.output["оценка"]:.2f}')
-        plt.ylabel('Степень принадлежности')
-        plt.xlabel('Оценка (0-10)')
+        :return: содержимое PNG-файла
+        """
+        return figure_pool.render_png(self.visualize, MEMBERSHIP_FIGSIZE)
+    
+    def render_result(self, quality_val, accuracy_val, deadline_val, trace=None):
+        """
+        Строит график результата нечеткого вывода в PNG без pyplot
+        
+        График совпадает с visualize_result, но на каждый вызов
+        перерисовывается только изменяемый слой.
         
-        return plt.gcf() 
\ No newline at end of file
+        :param quality_val: качество выполнения работы (0-10)
+        :param accuracy_val: точность полученного результата (0-10)
+        :param deadline_val: соблюдение сроков (0-10)
+        :param trace: трассировка из evaluate(..., with_trace=True); без нее
+                      вывод выполняется заново
+        :return: содержимое PNG-файла
+        :raises ValueError: оценка не определена для этих входов
+        """
+        model = self.model
+        trace = self._trace_for(model, (quality_val, accuracy_val, deadline_val), trace)
+        return self.get_result_renderer(model).render(trace)
@@ -1,8 +1,13 @@
 import os
 import sys
 import matplotlib.pyplot as plt
-from fuzzy_logic import FuzzyGradeSystem
-from utils import save_result_json, save_result_csv, load_results_json, load_results_csv
+from charts import MEMBERSHIP_FIGSIZE
+from fuzzy_engine import CATEGORIES
+from fuzzy_logic import FuzzyGradeSystem, INPUT_LABELS
+from utils import save_result_json, save_result_csv, open_history
+
+# Количество записей на странице истории
+HISTORY_PAGE_SIZE = 10
 
 def clear_screen():
     """Очищает экран терминала"""
@@ -42,9 +47,10 @@ def evaluate_student():
     accuracy = validate_input("Введите точность полученного результата (0-10): ")
     deadline = validate_input("Введите соблюдение сроков (0-10): ")
     
-    # Оценка знаний
-    fuzzy_system = FuzzyGradeSystem()
-    numeric_grade, text_grade = fuzzy_system.evaluate(quality, accuracy, deadline)
+    # Оценка знаний: целые значения берутся из таблицы оценок; оценка,
+    # объяснение и график соответствуют одной трассировке вывода
+    fuzzy_system = FuzzyGradeSystem(use_lookup_table=True)
+    numeric_grade, text_grade, trace = fuzzy_system.evaluate(quality, accuracy, deadline, with_trace=True)
     
     # Вывод результата
     print("\nРезультат оценки:")
@@ -52,13 +58,22 @@ def evaluate_student():
     print(f"Числовая оценка: {numeric_grade:.2f}")
     print(f"Текстовая оценка: {text_grade}")
     
+    # Объяснение результата
+    fired_rules = fuzzy_system.model.explain(trace)
+    if fired_rules:
+        print("Сработавшие правила:")
+        for strength, rule in fired_rules:
+            print(f"  {rule} ({strength:.2f})")
+    
     # Сохранение результата
     save_result_json(student_name, quality, accuracy, deadline, numeric_grade, text_grade)
     save_result_csv(student_name, quality, accuracy, deadline, numeric_grade, text_grade)
     
-    # Визуализация результата
-    fig = fuzzy_system.visualize_result(quality, accuracy, deadline)
-    plt.show()
+    # Визуализация результата: фигура закрывается сразу после показа
+    if numeric_grade is not None:
+        fig = fuzzy_system.visualize_result(quality, accuracy, deadline, fig=plt.figure(), trace=trace)
+        plt.show()
+        plt.close(fig)
     
     input("\nНажмите Enter для продолжения...")
 
@@ -70,8 +85,9 @@ def visualize_functions():
     print("=== Визуализация функций принадлежности ===")
     
     fuzzy_system = FuzzyGradeSystem()
-    fig = fuzzy_system.visualize()
+    fig = fuzzy_system.visualize(fig=plt.figure(figsize=MEMBERSHIP_FIGSIZE))
     plt.show()
+    plt.close(fig)
     
     input("\nНажмите Enter для продолжения...")
 
@@ -82,22 +98,112 @@ def show_history():
     clear_screen()
     print("=== История оценок ===")
     
-    # Загрузка данных
-    json_results = load_results_json()
+    # Страницы читаются по индексу журнала: открытие любой страницы
+    # не зависит от размера истории
+    with open_history() as history:
+        if not len(history):
+            print("История оценок пуста.")
+            input("\nНажмите Enter для продолжения...")
+            return
+        browse_records("История оценок", len(history), history.read, history.find_date)
+
+def show_student_history():
+    """
+    Отображает историю оценок одного студента
+    """
+    clear_screen()
+    print("=== История студента ===")
+    name = input("Введите имя студента: ").strip()
     
-    if not json_results:
-        print("История оценок пуста.")
-    else:
-        # Вывод результатов
-        for i, result in enumerate(json_results, 1):
-            print(f"\n{i}. Дата: {result['дата']}")
-            print(f"   Студент: {result['студент']}")
-            print(f"   Параметры: качество={result['параметры']['качество']}, "
-                  f"точность={result['параметры']['точность']}, "
-                  f"сроки={result['параметры']['сроки']}")
-            print(f"   Оценка: {result['оценка']['числовая']:.2f} ({result['оценка']['текстовая']})")
+    # Записи студента находятся по вторичному индексу журнала
+    with open_history() as history:
+        numbers = history.find_student(name)
+        browse_records(f"История студента {name}", len(numbers),
+                       lambda start, count: history.records(numbers[start:start + count]))
+
+def show_period_results():
+    """
+    Отображает результаты оценки за период
+    """
+    clear_screen()
+    print("=== Результаты за период ===")
+    start_date = input("Начало периода (ГГГГ-ММ-ДД): ").strip()
+    end_date = input("Конец периода включительно (ГГГГ-ММ-ДД): ").strip()
     
-    input("\nНажмите Enter для продолжения...")
+    with open_history() as history:
+        try:
+            numbers = history.find_period(start_date, end_date)
+        except ValueError as e:
+            print(f"Ошибка: {e}")
+            input("\nНажмите Enter для продолжения...")
+            return
+        browse_records(f"Результаты с {start_date} по {end_date}", len(numbers),
+                       lambda start, count: history.records(numbers[start:start + count]))
+
+def browse_records(title, total, read, find_date=None):
+    """
+    Постранично выводит записи истории
+    
+    :param title: заголовок
+    :param total: количество записей
+    :param read: функция (номер первой записи, количество) -> список записей
+    :param find_date: функция (дата) -> номер первой записи не раньше даты;
+                      None - переход к дате недоступен
+    """
+    if not total:
+        print("Записей не найдено.")
+        input("\nНажмите Enter для продолжения...")
+        return
+    
+    pages = (total + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE
+    prompt = "\n[Enter] следующая, [p] предыдущая, [номер] страница, "
+    if find_date is not None:
+        prompt += "[d ГГГГ-ММ-ДД] к дате, "
+    prompt += "[q] выход: "
+    
+    start = 0
+    while True:
+        clear_screen()
+        records = read(start, HISTORY_PAGE_SIZE)
+        print(f"=== {title}: страница {start // HISTORY_PAGE_SIZE + 1} из {pages}, "
+              f"записи {start + 1}-{start + len(records)} из {total} ===")
+        for number, result in enumerate(records, start + 1):
+            print_result(number, result)
+        
+        command = input(prompt).strip().lower()
+        if command == 'q':
+            break
+        elif command == 'p':
+            start = max(0, start - HISTORY_PAGE_SIZE)
+        elif command.startswith('d ') and find_date is not None:
+            try:
+                found = find_date(command[2:].strip())
+            except ValueError:
+                continue
+            start = min(found, total - 1) // HISTORY_PAGE_SIZE * HISTORY_PAGE_SIZE
+        elif command.isdigit():
+            start = (min(max(int(command), 1), pages) - 1) * HISTORY_PAGE_SIZE
+        elif start + HISTORY_PAGE_SIZE < total:
+            start += HISTORY_PAGE_SIZE
+
+def print_result(number, result):
+    """
+    Выводит одну запись истории
+    
+    :param number: номер записи
+    :param result: запись в формате save_result_json (None - запись повреждена)
+    """
+    if result is None:
+        print(f"\n{number}. Запись повреждена и пропущена")
+        return
+    numeric_grade = result['оценка']['числовая']
+    grade_text = f"{numeric_grade:.2f}" if numeric_grade is not None else "не определена"
+    print(f"\n{number}. Дата: {result['дата']}")
+    print(f"   Студент: {result['студент']}")
+    print(f"   Параметры: качество={result['параметры']['качество']}, "
+          f"точность={result['параметры']['точность']}, "
+          f"сроки={result['параметры']['сроки']}")
+    print(f"   Оценка: {grade_text} ({result['оценка']['текстовая']})")
 
 def run_tests():
     """
@@ -136,6 +242,43 @@ def run_tests():
     
     input("\nНажмите Enter для продолжения...")
 
+def choose_option(prompt, options):
+    """
+    Запрашивает выбор варианта из списка по номеру
+    
+    :param prompt: заголовок списка
+    :param options: варианты
+    :return: выбранный вариант
+    """
+    print(prompt)
+    for i, option in enumerate(options, 1):
+        print(f"  {i}. {option}")
+    return options[int(validate_input("Ваш выбор: ", 1, len(options))) - 1]
+
+def find_required_input():
+    """
+    Находит минимальное значение входа, при котором студент
+    попадает в выбранную категорию
+    """
+    clear_screen()
+    print("=== Минимальный балл для категории ===")
+    
+    target_category = choose_option("Категория:", CATEGORIES)
+    free = choose_option("Какой вход нужно найти:", INPUT_LABELS)
+    fixed = {label: validate_input(f"Введите значение '{label}' (0-10): ")
+             for label in INPUT_LABELS if label != free}
+    
+    fuzzy_system = FuzzyGradeSystem()
+    required = fuzzy_system.required_input(target_category, fixed, free)
+    
+    conditions = ", ".join(f"{label}={value:g}" for label, value in fixed.items())
+    if required is None:
+        print(f"\nПри {conditions} категория '{target_category}' недостижима.")
+    else:
+        print(f"\nПри {conditions} для категории '{target_category}' нужно {free} не ниже {required:.2f}.")
+    
+    input("\nНажмите Enter для продолжения...")
+
 def main_menu():
     """
     Отображает главное меню программы и обрабатывает выбор пользователя
@@ -147,6 +290,9 @@ def main_menu():
         print("2. Визуализировать функции принадлежности")
         print("3. Показать историю оценок")
         print("4. Запустить тесты")
+        print("5. Найти минимальный балл для категории")
+        print("6. Показать историю студента")
+        print("7. Показать результаты за период")
         print("0. Выход")
         
         choice = input("\nВыберите действие: ")
@@ -159,6 +305,12 @@ def main_menu():
             show_history()
         elif choice == "4":
             run_tests()
+        elif choice == "5":
+            find_required_input()
+        elif choice == "6":
+            show_student_history()
+        elif choice == "7":
+            show_period_results()
         elif choice == "0":
             print("Программа завершена.")
             sys.exit(0)
@@ -0,0 +1,226 @@
+import csv
+import itertools
+
+import numpy as np
+
+from fuzzy_engine import CATEGORIES, ERROR_CODE
+
+# Файл результатов в формате utils.save_result_csv
+DEFAULT_CSV_PATH = 'results.csv'
+
+# Количество строк CSV, разбираемых за один раз
+CHUNK_ROWS = 65536
+
+# Столбцы utils.save_result_csv
+CSV_COLUMNS = 7
+
+# Коды текстовых оценок
+CATEGORY_CODES = {category: code for code, category in enumerate(CATEGORIES)}
+
+
+class ResultColumns:
+    """
+    Результаты оценки в виде столбцов NumPy
+
+    Имена студентов хранятся один раз в таблице names, в столбце students -
+    номера в ней. Категория - индекс в fuzzy_engine.CATEGORIES, ERROR_CODE -
+    ошибка вычисления (числовая оценка при этом NaN).
+    """
+
+    def __init__(self, dates, students, names, quality, accuracy, deadline, numeric, categories):
+        """
+        :param dates: даты, datetime64[s]
+        :param students: номера студентов в names, int32
+        :param names: список имен студентов
+        :param quality: качество выполнения работы, float32
+        :param accuracy: точность полученного результата, float32
+        :param deadline: соблюдение сроков, float32
+        :param numeric: числовые оценки, float64 (NaN - не определена)
+        :param categories: коды категорий, int8
+        """
+        self.dates = dates
+        self.students = students
+        self.names = names
+        self.quality = quality
+        self.accuracy = accuracy
+        self.deadline = deadline
+        self.numeric = numeric
+        self.categories = categories
+
+    def __len__(self):
+        return self.dates.size
+
+
+def _split_fields(lines):
+    """
+    Разбивает строки CSV на столбцы
+
+    Строки без кавычек (обычный случай) разбиваются одним вызовом split
+    по всему блоку, строки с кавычками - модулем csv.
+
+    :param lines: строки файла
+    :return: список из CSV_COLUMNS последовательностей строк
+    """
+    text = ''.join(lines)
+    if '"' not in text:
+        fields = text.replace('\r\n', '\n').rstrip('\n').replace('\n', ',').split(',')
+        if len(fields) == CSV_COLUMNS * len(lines):
+            return [fields[i::CSV_COLUMNS] for i in range(CSV_COLUMNS)]
+    rows = [row[:CSV_COLUMNS] for row in csv.reader(lines) if len(row) >= CSV_COLUMNS]
+    return list(zip(*rows)) if rows else [()] * CSV_COLUMNS
+
+
+def _parse_numeric(values):
+    """Переводит числовые оценки в float64, 'N/A' - в NaN"""
+    if 'N/A' not in values:
+        return np.asarray(values, dtype=np.float64)
+    return np.array([float(value) if value != 'N/A' else np.nan for value in values])
+
+
+def iter_result_chunks(filename=DEFAULT_CSV_PATH, chunk_rows=CHUNK_ROWS, names=None):
+    """
+    Читает results.csv блоками столбцов
+
+    Одновременно в памяти находятся строки только одного блока; имена
+    студентов накапливаются в общей таблице names.
+
+    :param filename: файл CSV
+    :param chunk_rows: количество строк в блоке
+    :param names: словарь {имя: номер}, дополняемый новыми студентами
+                  (None - новый словарь для этого чтения)
+    :return: генератор ResultColumns; в names каждого блока - общий список
+             имен на момент чтения блока
+    """
+    names = {} if names is None else names
+    try:
+        f = open(filename, 'r', newline='', encoding='utf-8')
+    except FileNotFoundError:
+        return
+
+    with f:
+        f.readline()  # Заголовки
+        while True:
+            lines = list(itertools.islice(f, chunk_rows))
+            if not lines:
+                break
+            dates, students, quality, accuracy, deadline, numeric, texts = _split_fields(lines)
+            if not dates:
+                continue
+
+            yield ResultColumns(
+                dates=np.asarray(dates, dtype='datetime64[s]'),
+                students=np.array([names.setdefault(name, len(names)) for name in students], dtype=np.int32),
+                names=list(names),
+                quality=np.asarray(quality, dtype=np.float32),
+                accuracy=np.asarray(accuracy, dtype=np.float32),
+                deadline=np.asarray(deadline, dtype=np.float32),
+                numeric=_parse_numeric(numeric),
+                categories=np.array([CATEGORY_CODES.get(text, ERROR_CODE) for text in texts], dtype=np.int8),
+            )
+
+
+def load_results_columns(filename=DEFAULT_CSV_PATH, chunk_rows=CHUNK_ROWS):
+    """
+    Загружает results.csv в столбцы NumPy
+
+    В отличие от utils.load_results_csv, не создает словарь на каждую
+    строку: на запись приходится около 30 байт.
+
+    :param filename: файл CSV
+    :param chunk_rows: количество строк, разбираемых за один раз
+    :return: ResultColumns (пустой, если файла нет)
+    """
+    names = {}
+    chunks = list(iter_result_chunks(filename, chunk_rows, names))
+
+    def column(name, dtype):
+        if not chunks:
+            return np.empty(0, dtype=dtype)
+        return np.concatenate([getattr(chunk, name) for chunk in chunks])
+
+    return ResultColumns(
+        dates=column('dates', 'datetime64[s]'),
+        students=column('students', np.int32),
+        names=list(names),
+        quality=column('quality', np.float32),
+        accuracy=column('accuracy', np.float32),
+        deadline=column('deadline', np.float32),
+        numeric=column('numeric', np.float64),
+        categories=column('categories', np.int8),
+    )
+
+
+def summarize(columns):
+    """
+    Сводка по всем результатам
+
+    :param columns: ResultColumns
+    :return: словарь: count - количество записей, means - средние входов
+             и числовой оценки (без неопределенных оценок), categories -
+             количество записей по категориям, errors - ошибок вычисления
+    """
+    counts = np.bincount(columns.categories.astype(np.int64) - ERROR_CODE, minlength=len(CATEGORIES) + 1)
+    defined = ~np.isnan(columns.numeric)
+    return {
+        'count': len(columns),
+        'means': {
+            'качество': float(columns.quality.mean()) if len(columns) else None,
+            'точность': float(columns.accuracy.mean()) if len(columns) else None,
+            'сроки': float(columns.deadline.mean()) if len(columns) else None,
+            'оценка': float(columns.numeric[defined].mean()) if defined.any() else None,
+        },
+        'categories': {category: int(count) for category, count in zip(CATEGORIES, counts[1:])},
+        'errors': int(counts[0]),
+    }
+
+
+def category_distribution(columns):
+    """
+    Доли категорий среди записей с определенной оценкой
+
+    :param columns: ResultColumns
+    :return: словарь {категория: доля}
+    """
+    counts = np.bincount(columns.categories[columns.categories != ERROR_CODE], minlength=len(CATEGORIES))
+    total = counts.sum()
+    return {category: float(count / total) if total else 0.0 for category, count in zip(CATEGORIES, counts)}
+
+
+def student_summary(columns):
+    """
+    Сводка по каждому студенту
+
+    :param columns: ResultColumns
+    :return: словарь массивов длиной len(columns.names): count - количество
+             оценок, mean - средняя числовая оценка (NaN, если определенных
+             нет), best - лучшая оценка, last - дата последней оценки,
+             categories - количество оценок по категориям, форма (студенты, 3)
+    """
+    size = len(columns.names)
+    defined = ~np.isnan(columns.numeric)
+    students = columns.students[defined]
+    numeric = columns.numeric[defined]
+
+    graded = np.bincount(students, minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(students, weights=numeric, minlength=size) / graded
+
+    best = np.full(size, np.nan)
+    np.fmax.at(best, students, numeric)
+    last = np.full(size, np.datetime64('NaT'), dtype='datetime64[s]')
+    if len(columns):
+        order = np.lexsort((columns.dates, columns.students))
+        ends = np.flatnonzero(np.diff(columns.students[order], append=-1))
+        last[columns.students[order][ends]] = columns.dates[order][ends]
+
+    categories = np.zeros((size, len(CATEGORIES)), dtype=np.int64)
+    known = columns.categories != ERROR_CODE
+    np.add.at(categories, (columns.students[known], columns.categories[known]), 1)
+
+    return {
+        'count': np.bincount(columns.students, minlength=size),
+        'mean': mean,
+        'best': best,
+        'last': last,
+        'categories': categories,
+    }
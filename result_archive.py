@@ -0,0 +1,359 @@
+import argparse
+import csv
+import os
+
+import numpy as np
+
+from fuzzy_engine import CATEGORIES, ERROR_CODE
+from result_analytics import DEFAULT_CSV_PATH, ResultColumns, iter_result_chunks
+from result_store import DEFAULT_STORE_PATH, NAMES_SUFFIX, NAT, NameTable, ResultStore, locked, parse_timestamp
+from utils import iter_results_json, journal_path
+
+# Файл архива результатов; таблица имен студентов - рядом, с суффиксом NAMES_SUFFIX
+DEFAULT_ARCHIVE_PATH = 'results.bin'
+
+# Заголовок файла: сигнатура и версия формата
+MAGIC = b'GRADEARC'
+FORMAT_VERSION = 1
+HEADER = np.dtype([('magic', 'S8'), ('version', '<u4'), ('record_size', '<u4')])
+
+# Запись архива фиксированной длины (29 байт, без выравнивания): время
+# в секундах от 1970-01-01, номер студента в таблице имен, входы, числовая
+# оценка (NaN - не определена) и код категории
+RECORD = np.dtype([
+    ('timestamp', '<i8'),
+    ('student', '<u4'),
+    ('quality', '<f4'),
+    ('accuracy', '<f4'),
+    ('deadline', '<f4'),
+    ('grade', '<f4'),
+    ('category', 'u1'),
+])
+
+# Код категории в архиве для ошибки вычисления (ERROR_CODE не помещается в uint8)
+ARCHIVE_ERROR_CATEGORY = 255
+
+# Текстовая оценка при ошибке вычисления
+ERROR_TEXT = 'ошибка вычисления'
+
+# Количество записей, обрабатываемых за один раз при импорте и экспорте
+BLOCK_RECORDS = 65536
+
+
+def _journal_row(record):
+    """
+    Извлекает поля записи в формате журнала JSON (utils.save_result_json)
+
+    :param record: словарь записи (None - поврежденная строка журнала)
+    :return: (дата, студент, качество, точность, сроки, числовая, текстовая)
+             или None, если запись повреждена или неполна
+    """
+    try:
+        parameters, grade = record['параметры'], record['оценка']
+        row = (record['дата'], record['студент'], parameters['качество'], parameters['точность'],
+               parameters['сроки'], grade['числовая'], grade['текстовая'])
+    except (TypeError, KeyError):
+        return None
+
+    date, student, quality, accuracy, deadline, numeric, text = row
+    numbers = (quality, accuracy, deadline) if numeric is None else (quality, accuracy, deadline, numeric)
+    if parse_timestamp(date) == NAT or not isinstance(student, str) or not isinstance(text, str) \
+            or not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in numbers):
+        return None
+    return row
+
+
+class ResultArchive:
+    """
+    Архив результатов оценки: массив записей фиксированной длины на диске
+
+    Записи читаются через np.memmap без копирования: срез архива - это
+    представление файла, и обращение к любой записи стоит одинаково
+    независимо от размера архива. Имена студентов хранятся один раз
+    в таблице рядом с архивом (по имени в формате JSON на строку), записи
+    ссылаются на них номерами. Новые записи только дописываются в конец
+    под блокировкой файла (см. result_store.locked).
+    """
+
+    def __init__(self, path=DEFAULT_ARCHIVE_PATH):
+        """
+        :param path: файл архива (создается, если его нет)
+        :raises ValueError: файл не является архивом результатов этой версии
+        """
+        self.path = path
+        self.names_path = path + NAMES_SUFFIX
+
+        if not os.path.exists(path):
+            header = np.array([(MAGIC, FORMAT_VERSION, RECORD.itemsize)], dtype=HEADER)
+            with open(path, 'wb') as f:
+                f.write(header.tobytes())
+        with open(path, 'rb') as f:
+            header = np.frombuffer(f.read(HEADER.itemsize), dtype=HEADER)
+        if header.size != 1 or header['magic'][0] != MAGIC or header['version'][0] != FORMAT_VERSION \
+                or header['record_size'][0] != RECORD.itemsize:
+            raise ValueError(f"{path} не является архивом результатов версии {FORMAT_VERSION}")
+
+        self._names = NameTable(self.names_path)
+        self.names = self._names.names
+        self._records = None
+
+        # Поврежденные и неполные записи, пропущенные последним
+        # import_json или export_csv
+        self.skipped = 0
+
+    def __len__(self):
+        # Неполная последняя запись (сбой во время дописывания) не учитывается
+        return (os.path.getsize(self.path) - HEADER.itemsize) // RECORD.itemsize
+
+    @property
+    def records(self):
+        """
+        Записи архива, отображенные в память только для чтения
+
+        :return: np.memmap формы (len(self),) с типом RECORD
+        """
+        size = len(self)
+        if self._records is None or self._records.shape[0] != size:
+            if size:
+                self._records = np.memmap(self.path, dtype=RECORD, mode='r', offset=HEADER.itemsize, shape=(size,))
+            else:
+                self._records = np.empty(0, dtype=RECORD)
+        return self._records
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def student_ids(self, names):
+        """
+        Возвращает номера студентов, добавляя новые имена в таблицу
+
+        :param names: последовательность имен
+        :return: массив uint32
+        """
+        return self._names.ids(names)
+
+    def append(self, records):
+        """
+        Дописывает записи в конец архива
+
+        Таблица имен должна уже содержать студентов записей (см. student_ids).
+
+        :param records: массив с типом RECORD
+        """
+        records = np.asarray(records, dtype=RECORD)
+        with open(self.path, 'r+b') as f, locked(f):
+            # Длина берется под блокировкой: архив могут дописывать другие
+            # экземпляры и процессы. Неполная запись после сбоя перезаписывается
+            count = (os.fstat(f.fileno()).st_size - HEADER.itemsize) // RECORD.itemsize
+            f.seek(HEADER.itemsize + count * RECORD.itemsize)
+            f.write(records.tobytes())
+            f.truncate()
+
+    def append_result(self, date, student_name, quality, accuracy, deadline, numeric_grade, text_grade):
+        """
+        Дописывает один результат оценки
+
+        :param date: дата в формате '%Y-%m-%d %H:%M:%S'
+        :param student_name: имя студента
+        :param quality: качество выполнения работы (0-10)
+        :param accuracy: точность полученного результата (0-10)
+        :param deadline: соблюдение сроков (0-10)
+        :param numeric_grade: числовая оценка (None - не определена)
+        :param text_grade: текстовая оценка
+        """
+        self.append(self.make_records(
+            [date], [student_name], [quality], [accuracy], [deadline],
+            [np.nan if numeric_grade is None else numeric_grade], [text_grade]
+        ))
+
+    def make_records(self, dates, students, quality, accuracy, deadline, numeric, texts):
+        """
+        Собирает массив записей из столбцов
+
+        :param dates: даты (строки или datetime64)
+        :param students: имена студентов
+        :param numeric: числовые оценки (NaN - не определена)
+        :param texts: текстовые оценки
+        :return: массив с типом RECORD
+        """
+        codes = np.array([CATEGORIES.index(text) if text in CATEGORIES else ARCHIVE_ERROR_CATEGORY
+                          for text in texts], dtype=np.uint8)
+        return self._records_from(dates, self.student_ids(students), quality, accuracy, deadline, numeric, codes)
+
+    @staticmethod
+    def _records_from(dates, student_ids, quality, accuracy, deadline, numeric, codes):
+        records = np.empty(len(student_ids), dtype=RECORD)
+        records['timestamp'] = np.asarray(dates, dtype='datetime64[s]').astype(np.int64)
+        records['student'] = student_ids
+        records['quality'] = quality
+        records['accuracy'] = accuracy
+        records['deadline'] = deadline
+        records['grade'] = numeric
+        records['category'] = codes
+        return records
+
+    def columns(self, start=0, stop=None):
+        """
+        Представляет диапазон записей в виде столбцов для result_analytics
+
+        Столбцы входов - представления архива без копирования.
+
+        :param start: номер первой записи
+        :param stop: номер записи после последней (None - до конца)
+        :return: ResultColumns
+        """
+        records = self.records[start:stop]
+        categories = records['category'].astype(np.int8)
+        categories[records['category'] == ARCHIVE_ERROR_CATEGORY] = ERROR_CODE
+        return ResultColumns(
+            dates=records['timestamp'].astype('datetime64[s]'),
+            students=records['student'].astype(np.int32),
+            names=self.names,
+            quality=records['quality'],
+            accuracy=records['accuracy'],
+            deadline=records['deadline'],
+            numeric=records['grade'].astype(np.float64),
+            categories=categories,
+        )
+
+    def iter_results(self, start=0, stop=None):
+        """
+        Перебирает записи в формате журнала JSON (utils.save_result_json)
+
+        :return: генератор словарей записей
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        for block in range(start, stop, BLOCK_RECORDS):
+            records = self.records[block:min(block + BLOCK_RECORDS, stop)]
+            dates = np.datetime_as_string(records['timestamp'].astype('datetime64[s]'), unit='s')
+            # float32 переводится в float через кратчайшую запись: 8.2, а не 8.199999809
+            values = [records[field].astype(str).astype(np.float64).tolist()
+                      for field in ('quality', 'accuracy', 'deadline', 'grade')]
+            for date, student, quality, accuracy, deadline, grade, category in zip(
+                    dates.tolist(), records['student'].tolist(), *values, records['category'].tolist()):
+                defined = category != ARCHIVE_ERROR_CATEGORY
+                yield {
+                    'дата': date.replace('T', ' '),
+                    'студент': self.names[student],
+                    'параметры': {'качество': quality, 'точность': accuracy, 'сроки': deadline},
+                    'оценка': {
+                        'числовая': grade if defined else None,
+                        'текстовая': CATEGORIES[category] if defined else ERROR_TEXT,
+                    },
+                }
+
+    def import_csv(self, filename=DEFAULT_CSV_PATH):
+        """
+        Дописывает в архив результаты из CSV в формате utils.save_result_csv
+
+        :param filename: файл CSV
+        :return: количество добавленных записей
+        """
+        names = {}
+        count = 0
+        for chunk in iter_result_chunks(filename, BLOCK_RECORDS, names):
+            ids = self.student_ids(chunk.names)
+            codes = chunk.categories.astype(np.uint8)
+            codes[chunk.categories == ERROR_CODE] = ARCHIVE_ERROR_CATEGORY
+            self.append(self._records_from(chunk.dates, ids[chunk.students], chunk.quality, chunk.accuracy,
+                                           chunk.deadline, chunk.numeric, codes))
+            count += len(chunk)
+        return count
+
+    def import_json(self, filename=DEFAULT_STORE_PATH):
+        """
+        Дописывает в архив результаты из журнала JSON Lines (result_store)
+
+        Поврежденные и неполные записи пропускаются, их количество
+        сохраняется в skipped.
+
+        :param filename: файл журнала (для .json - журнал рядом, см. utils.journal_path)
+        :return: количество добавленных записей
+        """
+        count = 0
+        self.skipped = 0
+        block = []
+        for record in iter_results_json(filename):
+            row = _journal_row(record)
+            if row is None:
+                self.skipped += 1
+                continue
+            block.append(row)
+            if len(block) == BLOCK_RECORDS:
+                count += self._append_json_block(block)
+                block = []
+        if block:
+            count += self._append_json_block(block)
+        return count
+
+    def _append_json_block(self, rows):
+        dates, students, quality, accuracy, deadline, numeric, texts = zip(*rows)
+        self.append(self.make_records(
+            dates, students, quality, accuracy, deadline,
+            [np.nan if grade is None else grade for grade in numeric], texts,
+        ))
+        return len(rows)
+
+    def export_csv(self, filename=DEFAULT_CSV_PATH):
+        """
+        Записывает архив в CSV в формате utils.save_result_csv
+
+        Неполные записи пропускаются, их количество сохраняется в skipped.
+
+        :param filename: файл CSV (перезаписывается)
+        :return: количество записей
+        """
+        count = 0
+        self.skipped = 0
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Дата', 'Студент', 'Качество', 'Точность', 'Сроки', 'Числовая оценка', 'Текстовая оценка'])
+            for record in self.iter_results():
+                row = _journal_row(record)
+                if row is None:
+                    self.skipped += 1
+                    continue
+                *fields, grade, text = row
+                writer.writerow([*fields, grade if grade is not None else 'N/A', text])
+                count += 1
+        return count
+
+    def export_json(self, filename=DEFAULT_STORE_PATH):
+        """
+        Дописывает архив в журнал JSON Lines (result_store)
+
+        :param filename: файл журнала (для .json - журнал рядом, см. utils.journal_path:
+                         дописывание строк в массив JSON испортило бы его)
+        :return: количество записей
+        """
+        count = 0
+        with ResultStore(journal_path(filename), fsync_every=0) as store:
+            for record in self.iter_results():
+                store.append(record)
+                count += 1
+        return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Архив результатов оценки")
+    parser.add_argument("command", choices=("import-csv", "import-json", "export-csv", "export-json", "info"))
+    parser.add_argument("source", nargs="?", help="файл CSV или журнал JSON Lines")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE_PATH, help="файл архива")
+    args = parser.parse_args()
+
+    archive = ResultArchive(args.archive)
+    if args.command == "import-csv":
+        print(f"Добавлено записей: {archive.import_csv(args.source or DEFAULT_CSV_PATH)}")
+    elif args.command == "import-json":
+        print(f"Добавлено записей: {archive.import_json(args.source or DEFAULT_STORE_PATH)}")
+    elif args.command == "export-csv":
+        print(f"Выгружено записей: {archive.export_csv(args.source or DEFAULT_CSV_PATH)}")
+    elif args.command == "export-json":
+        print(f"Выгружено записей: {archive.export_json(args.source or DEFAULT_STORE_PATH)}")
+    if archive.skipped:
+        print(f"Пропущено поврежденных записей: {archive.skipped}")
+    print(f"{args.archive}: {len(archive)} записей, {len(archive.names)} студентов")
+
+
+if __name__ == "__main__":
+    main()
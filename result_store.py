@@ -0,0 +1,762 @@
+import itertools
+import json
+import os
+import struct
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Файл истории оценок консольного приложения: одна запись JSON на строку
+DEFAULT_STORE_PATH = 'results.jsonl'
+
+# Прежний формат истории: весь файл - один массив JSON
+LEGACY_JSON_PATH = 'results.json'
+
+# Индекс журнала лежит рядом с ним: смещения начала записей в байтах,
+# по 8 байт (uint64, little-endian) на запись в порядке журнала
+INDEX_SUFFIX = '.idx'
+INDEX_ENTRY = struct.Struct('<Q')
+
+# Размер блока при чтении журнала для построения индекса
+SCAN_BLOCK = 1 << 20
+
+# Вторичный индекс журнала: ключи записей в порядке журнала - время в секундах
+# от 1970-01-01 и номер студента в таблице имен (12 байт на запись)
+KEYS_SUFFIX = '.keys'
+KEY = np.dtype([('timestamp', '<i8'), ('student', '<u4')])
+KEY_ENTRY = struct.Struct('<qI')
+
+# Начало отсчета времени ключей и значение для неразобранной даты (NaT)
+EPOCH = datetime(1970, 1, 1)
+NAT = np.iinfo(np.int64).min
+
+# Таблица имен студентов: имя в формате JSON на строку, номер - номер строки
+NAMES_SUFFIX = '.names'
+
+# Количество записей, разбираемых за один раз при построении ключей
+KEY_BLOCK = 65536
+
+
+@contextmanager
+def locked(f):
+    """
+    Блокирует файл для других процессов и других открытий того же файла
+
+    Блокировка рекомендательная: ее соблюдают только писатели журнала,
+    таблицы имен и построение индексов, читатели не ждут.
+
+    :param f: открытый файл
+    """
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        return
+
+    # msvcrt блокирует байты от текущей позиции: блокируем первый байт
+    position = f.tell()
+    f.seek(0)
+    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    f.seek(position)
+    try:
+        yield
+    finally:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        f.seek(position)
+
+
+def truncate_partial_line(path):
+    """
+    Отрезает неполную последнюю строку файла, оставшуюся после сбоя записи
+
+    :param path: файл (если его нет, ничего не делается)
+    """
+    try:
+        with open(path, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            if not size:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+
+            # Ищем последний перевод строки блоками с конца файла
+            end = size
+            while end > 0:
+                start = max(0, end - 65536)
+                f.seek(start)
+                position = f.read(end - start).rfind(b'\n')
+                if position >= 0:
+                    f.truncate(start + position + 1)
+                    return
+                end = start
+            f.truncate(0)
+    except FileNotFoundError:
+        pass
+
+
+class NameTable:
+    """
+    Таблица имен студентов, дописываемая в файл
+
+    Записи журнала и архива ссылаются на студентов номерами в таблице.
+    Имена, добавленные в файл другим экземпляром, подгружаются при поиске
+    неизвестного имени; новые номера выдаются под блокировкой файла
+    таблицы (см. locked).
+    """
+
+    def __init__(self, path):
+        """
+        :param path: файл таблицы (создается при добавлении первого имени)
+        """
+        self.path = path
+        self.names = []
+        self._ids = {}
+        self._loaded = 0
+        if os.path.exists(path):
+            with open(path, 'ab') as f, locked(f):
+                truncate_partial_line(path)
+        self.refresh()
+
+    def __len__(self):
+        return len(self.names)
+
+    def refresh(self):
+        """Читает имена, дописанные в файл после последнего чтения"""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(self._loaded)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                name = json.loads(line)
+                self._ids[name] = len(self.names)
+                self.names.append(name)
+                self._loaded += len(line)
+
+    def get(self, name):
+        """
+        Возвращает номер студента
+
+        :param name: имя студента
+        :return: номер или None, если имени нет в таблице
+        """
+        if name not in self._ids:
+            self.refresh()
+        return self._ids.get(name)
+
+    def id(self, name):
+        """
+        Возвращает номер студента, добавляя новое имя в таблицу
+
+        :param name: имя студента
+        :return: int
+        """
+        student = self._ids.get(name)
+        return int(self.ids([name])[0]) if student is None else student
+
+    def ids(self, names):
+        """
+        Возвращает номера студентов, добавляя новые имена в таблицу
+
+        :param names: последовательность имен
+        :return: массив uint32
+        """
+        ids = np.empty(len(names), dtype=np.uint32)
+        missing = []
+        for i, name in enumerate(names):
+            student = self._ids.get(name)
+            if student is None:
+                missing.append(i)
+            else:
+                ids[i] = student
+        if not missing:
+            return ids
+
+        with open(self.path, 'ab') as f, locked(f):
+            # Имена могли добавить другие экземпляры: новые номера
+            # выдаются после них, иначе номера совпадут
+            self.refresh()
+            new = []
+            for i in missing:
+                student = self._ids.get(names[i])
+                if student is None:
+                    student = self._ids[names[i]] = len(self.names)
+                    self.names.append(names[i])
+                    new.append(names[i])
+                ids[i] = student
+            if new:
+                data = b''.join(json.dumps(name, ensure_ascii=False).encode('utf-8') + b'\n' for name in new)
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+                self._loaded += len(data)
+        return ids
+
+
+def parse_timestamp(date):
+    """
+    Переводит дату записи в секунды от 1970-01-01
+
+    :param date: строка даты ('%Y-%m-%d %H:%M:%S')
+    :return: int; NAT, если дату не удалось разобрать
+    """
+    try:
+        return (datetime.fromisoformat(date) - EPOCH) // timedelta(seconds=1)
+    except (TypeError, ValueError):
+        return NAT
+
+
+def parse_timestamps(dates):
+    """
+    Переводит даты записей в секунды от 1970-01-01
+
+    :param dates: строки дат ('%Y-%m-%d %H:%M:%S')
+    :return: массив int64; неразобранные даты - значение NaT
+    """
+    try:
+        return np.array(dates, dtype='datetime64[s]').astype(np.int64)
+    except ValueError:
+        values = []
+        for date in dates:
+            try:
+                values.append(np.datetime64(date, 's'))
+            except ValueError:
+                values.append(np.datetime64('NaT', 's'))
+        return np.array(values, dtype='datetime64[s]').astype(np.int64)
+
+
+class ResultStore:
+    """
+    Журнал результатов оценки в формате JSON Lines, открытый только на дописывание
+
+    Запись добавляется одной строкой в конец файла, поэтому стоит O(1) и не
+    переписывает историю. Строка и записи индексов дописываются под
+    блокировкой файла журнала (см. locked), поэтому один журнал могут
+    дописывать несколько экземпляров и процессов. Сбой во время записи может оставить только неполную
+    последнюю строку: читатель ее пропускает, а при следующем открытии она
+    отрезается. Смещение каждой записи дописывается в индекс (см. update_index),
+    дата и студент - во вторичный индекс ключей (см. update_keys).
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH, fsync_every=1):
+        """
+        :param path: путь к файлу журнала
+        :param fsync_every: сбрасывать данные на диск (fsync) после каждых
+                            fsync_every записей; 0 - только в close, до этого
+                            записи попадают в кэш операционной системы
+        """
+        self.path = path
+        self.fsync_every = fsync_every
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'ab')
+        # Журнал могут дописывать другие процессы: неполная строка и
+        # недостающие записи индексов проверяются под блокировкой
+        with locked(self._file):
+            truncate_partial_line(path)
+            update_keys(path)
+        self._names = NameTable(path + NAMES_SUFFIX)
+        self._index = open(path + INDEX_SUFFIX, 'ab')
+        self._keys = open(path + KEYS_SUFFIX, 'ab')
+
+    def append(self, record):
+        """
+        Дописывает запись в конец журнала
+
+        :param record: словарь, сериализуемый в JSON
+        """
+        line = json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+        with self._lock, locked(self._file):
+            # Журнал могли дописать другие экземпляры и процессы: позиция
+            # в режиме дописывания устаревает, размер файла - нет
+            offset = os.fstat(self._file.fileno()).st_size
+            self._file.write(line)
+            self._file.flush()
+            # Индекс пишется после записи: при сбое между ними недостающее
+            # смещение добавит update_index при следующем открытии
+            self._index.write(INDEX_ENTRY.pack(offset))
+            self._index.flush()
+            self._keys.write(KEY_ENTRY.pack(parse_timestamp(record.get('дата')), self._names.id(record.get('студент'))))
+            self._keys.flush()
+            self._pending += 1
+            if self.fsync_every and self._pending >= self.fsync_every:
+                os.fsync(self._file.fileno())
+                self._pending = 0
+
+    def sync(self):
+        """Сбрасывает на диск записи, еще не прошедшие fsync"""
+        with self._lock:
+            if self._pending:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._pending = 0
+
+    def close(self):
+        """Сбрасывает записи на диск и закрывает файл"""
+        if self._file.closed:
+            return
+        self.sync()
+        self._file.close()
+        self._index.close()
+        self._keys.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __iter__(self):
+        return iter_records(self.path)
+
+
+def iter_records(path=DEFAULT_STORE_PATH):
+    """
+    Читает записи журнала по одной, не загружая файл целиком
+
+    Неполная последняя строка (запись, прерванная сбоем) и строки, которые
+    не удалось разобрать, пропускаются.
+
+    :param path: путь к файлу журнала
+    :return: генератор словарей записей
+    """
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def _parse_record(line):
+    """
+    Разбирает строку журнала
+
+    :param line: строка журнала (bytes)
+    :return: словарь записи или None, если строку не удалось разобрать
+    """
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def _line_end(f, offset):
+    """
+    Возвращает смещение конца строки, начинающейся с offset
+
+    :return: смещение после перевода строки или None, если строка неполная
+    """
+    f.seek(offset)
+    line = f.readline()
+    return offset + len(line) if line.endswith(b'\n') else None
+
+
+def update_index(path=DEFAULT_STORE_PATH):
+    """
+    Дополняет индекс журнала записями, которых в нем нет
+
+    Обычно индекс ведет ResultStore.append, и функция только проверяет его
+    последнюю запись. Если индекса нет или он не соответствует журналу
+    (например, журнал заменен convert_legacy), индекс строится заново
+    одним проходом по журналу.
+
+    :param path: файл журнала
+    :return: количество записей в индексе
+    """
+    index_path = path + INDEX_SUFFIX
+    try:
+        journal = open(path, 'rb')
+    except FileNotFoundError:
+        open(index_path, 'wb').close()
+        return 0
+
+    with journal, open(index_path, 'ab+') as index:
+        journal_size = journal.seek(0, os.SEEK_END)
+
+        # Неполная запись индекса после сбоя отбрасывается
+        size = index.seek(0, os.SEEK_END)
+        count = size // INDEX_ENTRY.size
+        if size % INDEX_ENTRY.size:
+            index.truncate(count * INDEX_ENTRY.size)
+
+        # Проверяем, что последняя запись индекса - начало полной строки журнала
+        start = 0
+        if count:
+            index.seek((count - 1) * INDEX_ENTRY.size)
+            last, = INDEX_ENTRY.unpack(index.read(INDEX_ENTRY.size))
+            valid = last < journal_size
+            if valid and last:
+                journal.seek(last - 1)
+                valid = journal.read(1) == b'\n'
+            start = _line_end(journal, last) if valid else None
+            if start is None:
+                index.truncate(0)
+                count, start = 0, 0
+
+        # Начала строк - позиции после переводов строки; неполная
+        # последняя строка в индекс не попадает
+        journal.seek(start)
+        offsets = [np.array([start], dtype='<u8')] if start < journal_size else []
+        position = start
+        while True:
+            block = journal.read(SCAN_BLOCK)
+            if not block:
+                break
+            newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 0x0A)
+            offsets.append((newlines + position + 1).astype('<u8'))
+            position += len(block)
+        if offsets:
+            # Последнее начало строки указывает либо на конец файла,
+            # либо на неполную строку - ни то, ни другое не запись
+            new = np.concatenate(offsets)[:-1]
+            index.seek(0, os.SEEK_END)
+            index.write(new.tobytes())
+            count += new.size
+        return count
+
+
+def _make_keys(dates, students, names):
+    """
+    Строит ключи вторичного индекса для записей
+
+    :param dates: даты записей
+    :param students: имена студентов
+    :param names: NameTable, дополняемая новыми студентами
+    :return: массив с типом KEY
+    """
+    keys = np.empty(len(dates), dtype=KEY)
+    keys['timestamp'] = parse_timestamps(dates)
+    keys['student'] = names.ids(students)
+    return keys
+
+
+def update_keys(path=DEFAULT_STORE_PATH):
+    """
+    Дополняет вторичный индекс ключей записями журнала, которых в нем нет
+
+    Сначала обновляется индекс смещений (update_index). Ключи обычно ведет
+    ResultStore.append; после сбоя недостающие ключи дописываются по записям
+    журнала начиная с первой непроиндексированной. Если ключей больше, чем
+    записей, или они ссылаются на отсутствующих в таблице студентов, индекс
+    строится заново.
+
+    :param path: файл журнала
+    :return: количество записей в индексе
+    """
+    count = update_index(path)
+    names = NameTable(path + NAMES_SUFFIX)
+    with open(path + KEYS_SUFFIX, 'ab+') as keys:
+        done = keys.seek(0, os.SEEK_END) // KEY.itemsize
+        if done:
+            keys.seek((done - 1) * KEY.itemsize)
+            last = np.frombuffer(keys.read(KEY.itemsize), dtype=KEY)[0]
+            if done > count or last['student'] >= len(names):
+                done = 0
+        keys.truncate(done * KEY.itemsize)
+        if done == count:
+            return count
+
+        with open(path, 'rb') as journal, open(path + INDEX_SUFFIX, 'rb') as index:
+            index.seek(done * INDEX_ENTRY.size)
+            offset, = INDEX_ENTRY.unpack(index.read(INDEX_ENTRY.size))
+            journal.seek(offset)
+            while done < count:
+                block = []
+                for line in itertools.islice(journal, min(KEY_BLOCK, count - done)):
+                    block.append(_parse_record(line) or {})
+                keys.write(_make_keys([record.get('дата') for record in block],
+                                      [record.get('студент') for record in block], names).tobytes())
+                done += len(block)
+    return count
+
+
+def _date_bound(date, after=False):
+    """
+    Переводит дату запроса в секунды от 1970-01-01
+
+    :param date: дата с точностью до года, месяца, дня или секунды
+                 ('2024', '2024-05', '2024-05-01', '2024-05-01 12:00:00')
+    :param after: вернуть начало следующего периода той же точности, чтобы
+                  граница включала дату целиком
+    :return: int
+    :raises ValueError: дату не удалось разобрать
+    """
+    value = np.datetime64(date.strip())
+    if np.isnat(value):
+        raise ValueError(f"Некорректная дата: {date}")
+    if after:
+        value = value + 1
+    return int(value.astype('datetime64[s]').astype(np.int64))
+
+
+class HistoryReader:
+    """
+    Постраничное чтение журнала по индексу смещений
+
+    Чтение страницы стоит одного чтения из индекса и одного позиционирования
+    в журнале независимо от размера истории. Записи, добавленные в журнал
+    после открытия, становятся видны сразу: количество записей берется
+    из размера индекса при каждом обращении.
+
+    Поиск по студенту и по датам идет по вторичному индексу ключей,
+    отображенному в память: журнал читается только для найденных записей.
+
+    Индекс содержит все полные строки журнала, в том числе поврежденные:
+    вместо них возвращается None, чтобы номера записей не сдвигались.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        """
+        :param path: файл журнала
+        """
+        self.path = path
+        if not os.path.exists(path):
+            open(path, 'ab').close()
+        self._journal = open(path, 'rb')
+        with locked(self._journal):
+            update_keys(path)
+        self._names = NameTable(path + NAMES_SUFFIX)
+        self._index = open(path + INDEX_SUFFIX, 'rb')
+        self._keys = None
+        self._checked = 0
+        self._monotone = True
+
+    def __len__(self):
+        return os.fstat(self._index.fileno()).st_size // INDEX_ENTRY.size
+
+    def _offsets(self, start, count):
+        self._index.seek(start * INDEX_ENTRY.size)
+        return np.frombuffer(self._index.read(count * INDEX_ENTRY.size), dtype='<u8')
+
+    def read(self, start, count):
+        """
+        Читает записи подряд, начиная с номера start
+
+        :param start: номер первой записи (с 0)
+        :param count: максимальное количество записей
+        :return: список словарей записей (None - поврежденная запись)
+        """
+        start = max(0, start)
+        count = min(count, len(self) - start)
+        if count <= 0:
+            return []
+        return list(self.iter_from(start, count))
+
+    def iter_from(self, start=0, count=None):
+        """
+        Читает записи по одной, начиная с номера start
+
+        :param start: номер первой записи (с 0)
+        :param count: максимальное количество записей (None - до конца журнала)
+        :return: генератор словарей записей (None - поврежденная запись)
+        """
+        total = len(self)
+        if start >= total:
+            return
+        end = total if count is None else min(total, start + count)
+        offset, = self._offsets(start, 1)
+        self._journal.seek(int(offset))
+        for _ in range(end - start):
+            yield _parse_record(self._journal.readline())
+
+    def record(self, number):
+        """
+        Читает одну запись по номеру
+
+        :param number: номер записи (с 0)
+        :return: словарь записи или None, если запись повреждена
+        """
+        offset, = self._offsets(number, 1)
+        self._journal.seek(int(offset))
+        return _parse_record(self._journal.readline())
+
+    @property
+    def keys(self):
+        """
+        Ключи записей, отображенные в память только для чтения
+
+        :return: np.memmap с типом KEY в порядке журнала
+        """
+        size = min(len(self), os.path.getsize(self.path + KEYS_SUFFIX) // KEY.itemsize)
+        if self._keys is None or self._keys.shape[0] != size:
+            if size:
+                self._keys = np.memmap(self.path + KEYS_SUFFIX, dtype=KEY, mode='r', shape=(size,))
+            else:
+                self._keys = np.empty(0, dtype=KEY)
+        return self._keys
+
+    def records(self, numbers):
+        """
+        Читает записи по номерам
+
+        :param numbers: номера записей (с 0)
+        :return: список словарей записей (None - поврежденная запись)
+        """
+        return [self.record(int(number)) for number in numbers]
+
+    def _timestamps(self):
+        """
+        Возвращает время записей и признак того, что оно не убывает
+
+        Обычно записи дописываются по мере оценки и упорядочены по времени,
+        но это не гарантировано: перенос из архива (ResultArchive.export_json)
+        или перевод часов добавляют в конец более ранние даты. Порядок
+        проверяется только для записей, добавленных с прошлой проверки.
+
+        :return: (массив int64, True - время не убывает)
+        """
+        timestamps = self.keys['timestamp']
+        if self._monotone and self._checked < timestamps.size:
+            tail = np.asarray(timestamps[max(self._checked - 1, 0):])
+            self._monotone = bool(np.all(tail[1:] >= tail[:-1]))
+            self._checked = timestamps.size
+        return timestamps, self._monotone
+
+    def find_date(self, date):
+        """
+        Находит самую раннюю запись не раньше даты
+
+        Пока время записей не убывает, поиск двоичный; иначе - проход по ключам.
+
+        :param date: дата или ее начало ('2024-05-01' или '2024-05-01 12:00:00')
+        :return: номер записи; len(self), если все записи раньше даты
+        :raises ValueError: дату не удалось разобрать
+        """
+        timestamps, monotone = self._timestamps()
+        bound = _date_bound(date)
+        if monotone:
+            return int(np.searchsorted(timestamps, bound))
+        numbers = np.flatnonzero(timestamps >= bound)
+        if not numbers.size:
+            return len(self)
+        return int(numbers[np.argmin(timestamps[numbers])])
+
+    def find_period(self, start, end):
+        """
+        Находит записи за период
+
+        Пока время записей не убывает, границы находятся двоичным поиском;
+        иначе записи отбираются проходом по ключам.
+
+        :param start: первая дата периода
+        :param end: последняя дата периода (включительно: '2024-05-31' -
+                    весь день, '2024-05' - весь месяц)
+        :return: массив номеров записей в порядке журнала
+        :raises ValueError: дату не удалось разобрать
+        """
+        timestamps, monotone = self._timestamps()
+        low, high = _date_bound(start), _date_bound(end, after=True)
+        if monotone:
+            first = int(np.searchsorted(timestamps, low))
+            stop = int(np.searchsorted(timestamps, high))
+            return np.arange(first, max(first, stop))
+        return np.flatnonzero((timestamps >= low) & (timestamps < high))
+
+    def find_student(self, name):
+        """
+        Находит записи студента
+
+        :param name: имя студента
+        :return: массив номеров записей в порядке журнала
+        """
+        student = self._names.get(name)
+        if student is None:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.keys['student'] == student)
+
+    def close(self):
+        """Закрывает файлы журнала и индекса"""
+        self._journal.close()
+        self._index.close()
+        self._keys = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def convert_legacy(legacy_path=LEGACY_JSON_PATH, path=DEFAULT_STORE_PATH):
+    """
+    Переносит историю из массива JSON в журнал JSON Lines
+
+    Журнал записывается во временный файл и заменяет существующий только
+    после полной записи; исходный файл не изменяется.
+
+    :param legacy_path: файл в прежнем формате
+    :param path: файл журнала
+    :return: количество перенесенных записей
+    :raises ValueError: исходный файл не является массивом JSON
+    """
+    with open(legacy_path, 'r', encoding='utf-8') as f:
+        try:
+            records = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Ошибка разбора {legacy_path}: {e}") from e
+    if not isinstance(records, list):
+        raise ValueError(f"{legacy_path}: ожидается массив записей")
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+    # Индексы прежнего журнала к новому не подходят; таблица имен
+    # только дополняется, поэтому сохраняется
+    for suffix in (INDEX_SUFFIX, KEYS_SUFFIX):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    os.replace(tmp_path, path)
+    update_keys(path)
+    return len(records)
+
+
+def migrate_legacy(path=DEFAULT_STORE_PATH, legacy_path=LEGACY_JSON_PATH):
+    """
+    Однократно переносит прежнюю историю, если журнала еще нет
+
+    :param path: файл журнала
+    :param legacy_path: файл в прежнем формате
+    :return: количество перенесенных записей (0, если переносить нечего)
+    """
+    if os.path.exists(path) or not os.path.exists(legacy_path):
+        return 0
+    try:
+        return convert_legacy(legacy_path, path)
+    except ValueError as e:
+        print(f"Не удалось перенести историю из {legacy_path}: {e}")
+        return 0
+
+
+if __name__ == '__main__':
+    # python result_store.py [results.json] [results.jsonl]
+    source = sys.argv[1] if len(sys.argv) > 1 else LEGACY_JSON_PATH
+    target = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_STORE_PATH
+    print(f"Перенесено записей: {convert_legacy(source, target)} ({source} -> {target})")
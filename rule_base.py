@@ -0,0 +1,194 @@
+import json
+import os
+from functools import reduce
+
+import skfuzzy as fuzz
+from skfuzzy import control as ctrl
+
+# Файл базы правил по умолчанию
+DEFAULT_RULE_BASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rule_base.json')
+
+# Операции, объединяющие условия правила
+RULE_OPS = ('and', 'or')
+
+
+def _is_number(value):
+    """Число JSON (bool в Python - подкласс int, но числом не считается)"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_terms(label, terms):
+    """
+    Проверяет термы переменной: {терм: [a, b, c]} с a <= b <= c
+
+    :param label: имя переменной
+    :param terms: словарь термов из файла
+    :raises ValueError: описание ошибки
+    """
+    if not isinstance(terms, dict) or not terms:
+        raise ValueError(f"Переменная '{label}': нужен непустой словарь термов")
+    for term, params in terms.items():
+        if not isinstance(params, list) or len(params) != 3 or not all(_is_number(x) for x in params):
+            raise ValueError(f"Терм '{label}.{term}': нужны три числа [a, b, c]")
+        if not params[0] <= params[1] <= params[2]:
+            raise ValueError(f"Терм '{label}.{term}': должно быть a <= b <= c")
+
+
+def _check_sugeno(sugeno, inputs, output_terms):
+    """
+    Проверяет раздел sugeno: {выходной терм: число или {"const": c0, переменная: коэффициент}}
+
+    :param sugeno: раздел sugeno из файла
+    :param inputs: раздел inputs
+    :param output_terms: термы выходной переменной
+    :raises ValueError: описание ошибки
+    """
+    if not isinstance(sugeno, dict):
+        raise ValueError("Раздел sugeno должен быть объектом")
+    for term, consequent in sugeno.items():
+        if term not in output_terms:
+            raise ValueError(f"Заключение Сугено для неизвестного терма '{term}'")
+        if _is_number(consequent):
+            continue
+        if not isinstance(consequent, dict) or \
+                not all((key == 'const' or key in inputs) and _is_number(coef) for key, coef in consequent.items()):
+            raise ValueError(f"Заключение Сугено '{term}': нужно число или "
+                             f"{{\"const\": c0, переменная: коэффициент, ...}}")
+
+
+def validate_rule_base(definition):
+    """
+    Проверяет описание базы правил
+
+    :param definition: словарь с ключами inputs, output, rules
+                       и необязательным sugeno
+    :raises ValueError: описание ошибки
+    """
+    if not isinstance(definition, dict):
+        raise ValueError("База правил должна быть объектом JSON")
+    inputs = definition.get('inputs')
+    output = definition.get('output')
+    rules = definition.get('rules')
+    if not isinstance(inputs, dict) or not inputs:
+        raise ValueError("Нужен непустой раздел inputs")
+    if not isinstance(output, dict) or len(output) != 1:
+        raise ValueError("Раздел output должен содержать ровно одну переменную")
+    if not isinstance(rules, list) or not rules:
+        raise ValueError("Нужен непустой список rules")
+
+    for label, terms in {**inputs, **output}.items():
+        _check_terms(label, terms)
+    output_terms = next(iter(output.values()))
+
+    for index, rule in enumerate(rules, 1):
+        if not isinstance(rule, dict):
+            raise ValueError(f"Правило {index}: должно быть объектом")
+        condition = rule.get('if')
+        if not isinstance(condition, dict) or not condition:
+            raise ValueError(f"Правило {index}: нужно непустое условие if")
+        for label, term in condition.items():
+            if term not in inputs.get(label, {}):
+                raise ValueError(f"Правило {index}: неизвестный терм '{label}.{term}'")
+        if rule.get('op', 'and') not in RULE_OPS:
+            raise ValueError(f"Правило {index}: операция должна быть одной из {', '.join(RULE_OPS)}")
+        if rule.get('then') not in output_terms:
+            raise ValueError(f"Правило {index}: неизвестный выходной терм '{rule.get('then')}'")
+        weight = rule.get('weight', 1.0)
+        if not _is_number(weight) or not 0 < weight <= 1:
+            raise ValueError(f"Правило {index}: вес должен быть в диапазоне (0, 1]")
+
+    _check_sugeno(definition.get('sugeno', {}), inputs, output_terms)
+
+
+def load_rule_base(path=DEFAULT_RULE_BASE_PATH):
+    """
+    Загружает и проверяет базу правил из файла JSON
+
+    :param path: путь к файлу
+    :return: словарь с ключами inputs, output и rules
+    :raises OSError: файл недоступен
+    :raises ValueError: файл не является корректной базой правил
+    """
+    with open(path, encoding='utf-8') as f:
+        try:
+            definition = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Ошибка разбора {path}: {e}") from e
+    validate_rule_base(definition)
+    return definition
+
+
+def file_signature(path):
+    """
+    Возвращает признак версии файла для обнаружения изменений
+
+    :param path: путь к файлу
+    :return: кортеж (время изменения в нс, размер) или None, если файла нет
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def sugeno_consequents(definition):
+    """
+    Возвращает заключения выходных термов для вывода Сугено
+
+    Заключение терма - константа или линейная функция входов из раздела
+    sugeno; для термов без заключения берется центр тяжести треугольника
+    (a + b + c) / 3, при котором вывод Сугено близок к выводу Мамдани.
+
+    :param definition: проверенное описание (см. load_rule_base); раздел
+                       sugeno проверяется еще раз, так как описание может
+                       быть собрано в коде, а не загружено из файла
+    :return: словарь {выходной терм: [c0, c1, ..., cn]} с коэффициентами
+             входов в порядке раздела inputs
+    :raises ValueError: раздел sugeno некорректен
+    """
+    inputs = list(definition['inputs'])
+    (_, output_terms), = definition['output'].items()
+    sugeno = definition.get('sugeno', {})
+    _check_sugeno(sugeno, definition['inputs'], output_terms)
+    consequents = {}
+    for term, params in output_terms.items():
+        consequent = sugeno.get(term, sum(params) / 3)
+        if _is_number(consequent):
+            consequent = {'const': consequent}
+        consequents[term] = [float(consequent.get('const', 0.0))] + \
+                            [float(consequent.get(label, 0.0)) for label in inputs]
+    return consequents
+
+
+def build_rule_base(definition, universe):
+    """
+    Создает переменные и правила skfuzzy по описанию базы правил
+
+    :param definition: проверенное описание (см. load_rule_base)
+    :param universe: универсум всех переменных
+    :return: кортеж (список ctrl.Antecedent, ctrl.Consequent, список ctrl.Rule)
+    """
+    def make_variable(cls, label, terms):
+        variable = cls(universe, label)
+        for term, params in terms.items():
+            variable[term] = fuzz.trimf(variable.universe, params)
+        return variable
+
+    antecedents = {label: make_variable(ctrl.Antecedent, label, terms)
+                   for label, terms in definition['inputs'].items()}
+    (output_label, output_terms), = definition['output'].items()
+    consequent = make_variable(ctrl.Consequent, output_label, output_terms)
+
+    rules = []
+    for rule in definition['rules']:
+        terms = [antecedents[label][term] for label, term in rule['if'].items()]
+        if rule.get('op', 'and') == 'and':
+            antecedent = reduce(lambda left, right: left & right, terms)
+        else:
+            antecedent = reduce(lambda left, right: left | right, terms)
+        result = consequent[rule['then']]
+        if 'weight' in rule:
+            result = result % float(rule['weight'])
+        rules.append(ctrl.Rule(antecedent, result))
+    return list(antecedents.values()), consequent, rules
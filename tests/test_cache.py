@@ -0,0 +1,61 @@
+import json
+import shutil
+
+import pytest
+
+from cache import LRUCache
+from fuzzy_logic import FuzzyGradeSystem
+from rule_base import DEFAULT_RULE_BASE_PATH
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.get('b', 'нет') == 'нет'
+    assert cache.stats() == {'size': 2, 'maxsize': 2, 'hits': 3, 'misses': 1, 'evictions': 1, 'hit_rate': 0.75}
+
+
+def test_purge_and_clear_keep_counters():
+    cache = LRUCache(8)
+    for key in range(6):
+        cache.put(key, str(key))
+    cache.get(0)
+
+    assert sorted(cache.purge(lambda key: key % 2)) == [1, 3, 5]
+    assert len(cache) == 3 and 2 in cache
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats()['hits'] == 1
+
+
+def test_rejects_non_positive_size():
+    with pytest.raises(ValueError):
+        LRUCache(0)
+
+
+def test_results_are_keyed_by_model_fingerprint(tmp_path):
+    rules_path = tmp_path / 'rule_base.json'
+    shutil.copy(DEFAULT_RULE_BASE_PATH, rules_path)
+    fuzzy_system = FuzzyGradeSystem(cache_size=16, rules_path=str(rules_path))
+    before = fuzzy_system.evaluate(8, 8, 6)
+    fingerprint = fuzzy_system.model.fingerprint
+    assert (fingerprint, 8, 8, 6) in fuzzy_system.cache
+
+    # Другая база правил: результаты прежней модели удаляются и не возвращаются
+    definition = json.loads(rules_path.read_text(encoding='utf-8'))
+    for rule in definition['rules']:
+        rule['then'] = 'троечник'
+    rules_path.write_text(json.dumps(definition, ensure_ascii=False), encoding='utf-8')
+    assert fuzzy_system.reload_rules()
+    assert len(fuzzy_system.cache) == 0
+
+    after = fuzzy_system.evaluate(8, 8, 6)
+    assert fuzzy_system.model.fingerprint != fingerprint
+    assert after[1] == 'троечник' != before[1]
+    assert fuzzy_system.cache.stats()['misses'] == 2
@@ -0,0 +1,27 @@
+import matplotlib.pyplot as plt
+
+from charts import RESULT_FIGSIZE, figure_pool
+from fuzzy_logic import FuzzyGradeSystem
+
+
+def test_rendering_keeps_figures_bounded():
+    fuzzy_system = FuzzyGradeSystem()
+    inputs = [(q, a, d) for q, a, d in ((8, 9, 7), (5, 5, 5), (3, 6, 8), (9, 4, 6))
+              if fuzzy_system.evaluate(q, a, d)[0] is not None]
+    created = figure_pool.stats()['created']
+
+    for i in range(20):
+        row = inputs[i % len(inputs)]
+        if i % 10 == 0:
+            png = fuzzy_system.render_membership()
+        elif i % 2:
+            png = fuzzy_system.render_result(*row)
+        else:
+            png = figure_pool.render_png(lambda fig: fuzzy_system.visualize_result(*row, fig=fig), RESULT_FIGSIZE)
+        assert png.startswith(b'\x89PNG')
+
+    # Фигуры не регистрируются в pyplot, пул переиспользует свои
+    assert len(plt.get_fignums()) == 0
+    stats = figure_pool.stats()
+    assert stats['free'] <= figure_pool.size
+    assert stats['created'] - created <= figure_pool.max_live
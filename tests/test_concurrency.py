@@ -0,0 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from fuzzy_engine import CompiledFuzzyModel
+from fuzzy_logic import FuzzyGradeSystem
+
+THREADS = 8
+
+
+def make_inputs(size):
+    # Целые входы вперемешку с дробными: и попадания в кэш, и полный вывод
+    inputs = np.random.default_rng(0).integers(0, 11, (THREADS, size, 3)).astype(np.float64)
+    inputs[:, ::2] += np.random.default_rng(1).uniform(0, 1, (THREADS, (size + 1) // 2, 3)).round(2)
+    return np.clip(inputs, 0, 10)
+
+
+@pytest.mark.parametrize('engine, cache_size, size', [
+    ('compiled', 64, 200),
+    ('compiled', None, 200),
+    ('skfuzzy', None, 10),
+])
+def test_threaded_results_match_sequential(engine, cache_size, size):
+    inputs = make_inputs(size)
+    reference = FuzzyGradeSystem(engine=engine)
+    expected = [[reference.evaluate(*row) for row in chunk] for chunk in inputs]
+
+    # Таблица оценок не используется: каждый вызов доходит до движка вывода
+    fuzzy_system = FuzzyGradeSystem(engine=engine, cache_size=cache_size)
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        results = list(executor.map(lambda chunk: [fuzzy_system.evaluate(*row) for row in chunk], inputs))
+
+    for chunk, expected_chunk in zip(results, expected):
+        for (numeric, text), (expected_numeric, expected_text) in zip(chunk, expected_chunk):
+            assert text == expected_text
+            if expected_numeric is None:
+                assert numeric is None
+            else:
+                assert numeric == pytest.approx(expected_numeric, abs=CompiledFuzzyModel.TOLERANCE)
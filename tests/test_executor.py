@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+import pytest
+
+from bot.utils.executor import WorkerBusyError, WorkerPool
+
+KINDS = ['thread', 'process']
+
+
+@pytest.mark.parametrize('kind', KINDS)
+def test_rejects_tasks_past_max_pending(kind):
+    async def scenario(pool):
+        tasks = [asyncio.ensure_future(pool.run(time.sleep, 0.3)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert pool.pending == 2
+        with pytest.raises(WorkerBusyError):
+            await pool.run(time.sleep, 0)
+        await asyncio.gather(*tasks)
+
+        # Места в очереди освобождаются после завершения задач
+        assert pool.pending == 0
+        assert await pool.run(abs, -3) == 3
+
+    pool = WorkerPool(kind=kind, max_workers=1, max_pending=2, timeout=30)
+    try:
+        asyncio.run(scenario(pool))
+        assert pool.stats()['rejected'] == 1
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.parametrize('kind', KINDS)
+def test_times_out_slow_task(kind):
+    async def scenario(pool):
+        # Пул процессов запускается при первой задаче: запуск не должен
+        # попасть под короткий таймаут
+        await pool.run(abs, -1)
+        pool.timeout = 0.2
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(time.sleep, 1)
+
+        # Задача, прерванная по таймауту, занимает место до своего завершения
+        assert pool.pending == 1
+        await asyncio.sleep(1.5)
+        assert pool.pending == 0
+
+    pool = WorkerPool(kind=kind, max_workers=1, max_pending=4, timeout=30)
+    try:
+        asyncio.run(scenario(pool))
+        assert pool.stats()['timed_out'] == 1
+    finally:
+        pool.shutdown()
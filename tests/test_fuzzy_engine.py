@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from fuzzy_engine import CATEGORIES, ERROR_CODE, CompiledFuzzyModel, GradeLookupTable
+from fuzzy_logic import FuzzyGradeSystem
+
+
+@pytest.fixture(scope='module')
+def fuzzy_system():
+    return FuzzyGradeSystem()
+
+
+def parity_inputs():
+    values = np.arange(0, 11, 2.5)
+    grid = np.stack(np.meshgrid(values, values, values, indexing='ij'), axis=-1).reshape(-1, 3)
+    return np.vstack([grid, np.random.default_rng(0).uniform(0, 10, (50, 3))])
+
+
+def test_compiled_model_matches_skfuzzy(fuzzy_system):
+    reference = FuzzyGradeSystem(engine='skfuzzy')
+    inputs = parity_inputs()
+    numeric, codes = fuzzy_system.evaluate_batch(inputs)
+
+    for row, value, code in zip(inputs, numeric, codes):
+        expected_numeric, expected_text = reference.evaluate(*row)
+        assert fuzzy_system.evaluate(*row)[1] == expected_text
+        if expected_numeric is None:
+            assert code == ERROR_CODE
+        else:
+            assert value == pytest.approx(expected_numeric, abs=CompiledFuzzyModel.TOLERANCE)
+            assert CATEGORIES[code] == expected_text
+
+
+def test_lookup_table_build_save_load(fuzzy_system, tmp_path):
+    model = fuzzy_system.model
+    table = GradeLookupTable.build(model)
+    assert table.numeric.shape == (11, 11, 11)
+    assert table.fingerprint == model.fingerprint
+    assert table.lookup((5, 6, 7)) == pytest.approx(model.evaluate((5, 6, 7)), abs=CompiledFuzzyModel.TOLERANCE)
+    assert table.lookup((5, 6, 7.5)) is None
+
+    path = str(tmp_path / 'grade_table.npz')
+    table.save(path)
+    loaded = GradeLookupTable.load(path)
+    assert loaded.fingerprint == table.fingerprint
+    np.testing.assert_array_equal(loaded.numeric, table.numeric)
+
+    assert GradeLookupTable.load(str(tmp_path / 'missing.npz')) is None
+    (tmp_path / 'broken.npz').write_bytes(b'not a table')
+    assert GradeLookupTable.load(str(tmp_path / 'broken.npz')) is None
+
+
+def test_lookup_table_rebuilt_for_other_model(tmp_path):
+    path = str(tmp_path / 'grade_table.npz')
+    GradeLookupTable(np.zeros((11, 11, 11)), 'другая модель').save(path)
+
+    fuzzy_system = FuzzyGradeSystem(use_lookup_table=True, lookup_table_path=path)
+    table = fuzzy_system.get_lookup_table()
+    assert table.fingerprint == fuzzy_system.model.fingerprint
+    assert GradeLookupTable.load(path).fingerprint == fuzzy_system.model.fingerprint
+    assert fuzzy_system.evaluate(10, 10, 10) == FuzzyGradeSystem().evaluate(10, 10, 10)
+
+
+def test_exact_centroid_matches_fine_sampled_centroid():
+    values = np.arange(0, 11, dtype=np.float64)
+    grid = np.stack(np.meshgrid(values, values, values, indexing='ij'), axis=-1).reshape(-1, 3)
+    inputs = np.vstack([grid, np.random.default_rng(0).uniform(0, 10, (300, 3))])
+
+    # Точный центр тяжести не зависит от шага универсума, дискретный сходится к нему
+    exact = FuzzyGradeSystem(defuzzification='exact').model
+    sampled = FuzzyGradeSystem(resolution=0.001).model
+    exact_numeric, exact_codes = exact.evaluate_batch(inputs)
+    sampled_numeric, _ = sampled.evaluate_batch(inputs)
+    scalar_numeric = np.array([exact.evaluate(row) for row in inputs])
+
+    undefined = np.isnan(sampled_numeric)
+    assert undefined.any()
+    np.testing.assert_array_equal(np.isnan(exact_numeric), undefined)
+    np.testing.assert_array_equal(exact_codes[undefined], ERROR_CODE)
+    np.testing.assert_allclose(exact_numeric[~undefined], sampled_numeric[~undefined], atol=1e-5)
+    np.testing.assert_allclose(scalar_numeric, exact_numeric, atol=CompiledFuzzyModel.TOLERANCE, equal_nan=True)
+
+
+def test_sugeno_scalar_matches_batch():
+    fuzzy_system = FuzzyGradeSystem(inference='sugeno')
+    inputs = np.vstack([parity_inputs(), np.random.default_rng(1).uniform(0, 10, (300, 3))])
+    numeric, codes = fuzzy_system.evaluate_batch(inputs)
+    scalar = np.array([fuzzy_system.model.evaluate(row) for row in inputs])
+
+    assert not np.isnan(numeric).all()
+    np.testing.assert_allclose(scalar, numeric, atol=CompiledFuzzyModel.TOLERANCE, equal_nan=True)
+    for row, value, code in zip(inputs, numeric, codes):
+        numeric_grade, text_grade = fuzzy_system.evaluate(*row)
+        if np.isnan(value):
+            assert numeric_grade is None and code == ERROR_CODE
+        else:
+            assert text_grade == CATEGORIES[code]
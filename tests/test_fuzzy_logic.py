@@ -0,0 +1,85 @@
+import math
+
+import numpy as np
+import pytest
+
+from fuzzy_engine import CompiledFuzzyModel
+from fuzzy_logic import FuzzyGradeSystem
+
+
+def test_traced_grade_matches_trace_for_fractional_input():
+    # Интерполяция по таблице дает здесь 3.67 (троечник), точный вывод - 4.78 (хорошист)
+    fuzzy_system = FuzzyGradeSystem(use_lookup_table=True, cache_size=16)
+    numeric_grade, text_grade, trace = fuzzy_system.evaluate(7.2, 7.2, 3.5, with_trace=True)
+
+    assert numeric_grade == trace.numeric
+    assert (numeric_grade, text_grade) == FuzzyGradeSystem._grade_result(trace.numeric)
+
+
+def test_traced_grade_uses_table_for_integer_input():
+    fuzzy_system = FuzzyGradeSystem(use_lookup_table=True, cache_size=16)
+    for _ in range(2):
+        numeric_grade, text_grade, trace = fuzzy_system.evaluate(5, 6, 7, with_trace=True)
+
+    assert math.isclose(numeric_grade, trace.numeric)
+    assert fuzzy_system.cache.stats()['hits'] == 1
+
+
+def test_table_answers_fractional_input_with_exact_inference():
+    exact_system = FuzzyGradeSystem()
+    table_system = FuzzyGradeSystem(use_lookup_table=True)
+    inputs = np.random.default_rng(0).uniform(0, 10, (200, 3))
+
+    assert [table_system.evaluate(*row) for row in inputs] == [exact_system.evaluate(*row) for row in inputs]
+
+
+@pytest.mark.parametrize('use_lookup_table', [False, True])
+def test_required_input_is_minimal(use_lookup_table):
+    fuzzy_system = FuzzyGradeSystem(use_lookup_table=use_lookup_table)
+    required = fuzzy_system.required_input('хорошист', {'качество': 6, 'точность': 6}, 'сроки')
+
+    assert required is not None
+    assert fuzzy_system.evaluate(6, 6, required)[1] in ('хорошист', 'отличник')
+    if required > 0:
+        assert fuzzy_system.evaluate(6, 6, max(required - 0.01, 0))[1] == 'троечник'
+
+
+def test_required_input_unreachable_and_invalid():
+    fuzzy_system = FuzzyGradeSystem()
+
+    assert fuzzy_system.required_input('отличник', {'качество': 0, 'точность': 0}, 'сроки') is None
+    assert fuzzy_system.required_input('троечник', {'качество': 0, 'точность': 0}, 'сроки') == 0
+    with pytest.raises(ValueError):
+        fuzzy_system.required_input('медалист', {'качество': 5, 'точность': 5}, 'сроки')
+    with pytest.raises(ValueError):
+        fuzzy_system.required_input('хорошист', {'качество': 5}, 'сроки')
+
+
+@pytest.mark.parametrize('use_lookup_table', [False, True])
+@pytest.mark.parametrize('fixed', [{'качество': -1, 'точность': 5}, {'качество': 12, 'точность': 5},
+                                   {'качество': 5, 'точность': float('nan')}])
+def test_required_input_rejects_out_of_range_fixed(use_lookup_table, fixed):
+    fuzzy_system = FuzzyGradeSystem(use_lookup_table=use_lookup_table)
+
+    with pytest.raises(ValueError):
+        fuzzy_system.required_input('хорошист', fixed, 'сроки')
+
+
+@pytest.mark.parametrize('tolerance', [0, -0.5])
+def test_required_input_rejects_non_positive_tolerance(tolerance):
+    with pytest.raises(ValueError):
+        FuzzyGradeSystem().required_input('хорошист', {'качество': 6, 'точность': 6}, 'сроки', tolerance)
+
+
+@pytest.mark.parametrize('use_lookup_table', [False, True])
+def test_traced_grade_uses_selected_engine(use_lookup_table, monkeypatch):
+    fuzzy_system = FuzzyGradeSystem(engine='skfuzzy', use_lookup_table=use_lookup_table, interpolate=True)
+    calls = []
+    simulate = fuzzy_system._simulate
+    monkeypatch.setattr(fuzzy_system, '_simulate', lambda *values: calls.append(values) or simulate(*values))
+
+    numeric_grade, text_grade, trace = fuzzy_system.evaluate(7.2, 7.2, 3.5, with_trace=True)
+
+    assert calls == [(7.2, 7.2, 3.5)]
+    assert (numeric_grade, text_grade) == FuzzyGradeSystem(engine='skfuzzy').evaluate(7.2, 7.2, 3.5)
+    assert numeric_grade == pytest.approx(trace.numeric, abs=CompiledFuzzyModel.TOLERANCE)
@@ -0,0 +1,10 @@
+from bot import grading_worker
+
+
+def test_prerender_evaluates_in_worker():
+    grading_worker.init_worker({'use_lookup_table': True})
+
+    assert grading_worker.prerender_result_visualization(8, 9, 7).startswith(b'\x89PNG')
+    # Для (5, 8, 9) оценка не определена: график не строится
+    assert grading_worker.evaluate(5, 8, 9)[0] is None
+    assert grading_worker.prerender_result_visualization(5, 8, 9) is None
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from result_analytics import load_results_columns, student_summary, summarize
+
+ROWS = [
+    '2024-05-01 10:00:00,Алиса,8,9,7,7.6,отличник',
+    '2024-05-02 10:00:00,Боб,3,2,1,2.0,троечник',
+    '2024-05-03 10:00:00,Алиса,5,6,5,5.0,хорошист',
+    '2024-05-04 10:00:00,Боб,0,0,0,N/A,ошибка вычисления',
+]
+
+
+@pytest.fixture
+def columns(tmp_path):
+    path = tmp_path / 'results.csv'
+    path.write_text('Дата,Студент,Качество,Точность,Сроки,Числовая оценка,Текстовая оценка\n'
+                    + '\n'.join(ROWS) + '\n', encoding='utf-8')
+    return load_results_columns(str(path), chunk_rows=3)
+
+
+def test_summarize(columns):
+    summary = summarize(columns)
+
+    assert summary['count'] == 4
+    assert summary['errors'] == 1
+    assert summary['categories'] == {'троечник': 1, 'хорошист': 1, 'отличник': 1}
+    assert summary['means']['качество'] == pytest.approx(4)
+    assert summary['means']['оценка'] == pytest.approx((7.6 + 2.0 + 5.0) / 3)
+
+
+def test_summarize_empty(tmp_path):
+    summary = summarize(load_results_columns(str(tmp_path / 'missing.csv')))
+
+    assert summary['count'] == 0
+    assert summary['means']['оценка'] is None
+    assert summary['categories'] == {'троечник': 0, 'хорошист': 0, 'отличник': 0}
+
+
+def test_student_summary(columns):
+    assert columns.names == ['Алиса', 'Боб']
+    summary = student_summary(columns)
+
+    np.testing.assert_array_equal(summary['count'], [2, 2])
+    np.testing.assert_allclose(summary['mean'], [6.3, 2.0])
+    np.testing.assert_allclose(summary['best'], [7.6, 2.0])
+    np.testing.assert_array_equal(summary['last'], np.array(['2024-05-03T10:00:00', '2024-05-04T10:00:00'],
+                                                            dtype='datetime64[s]'))
+    np.testing.assert_array_equal(summary['categories'], [[0, 1, 1], [1, 0, 0]])
@@ -0,0 +1,82 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from result_archive import ResultArchive
+from result_store import iter_records
+
+
+def make_record(student, numeric=4.5, text='хорошист'):
+    return {
+        'дата': '2024-05-01 12:00:00',
+        'студент': student,
+        'параметры': {'качество': 5, 'точность': 6, 'сроки': 7},
+        'оценка': {'числовая': numeric, 'текстовая': text},
+    }
+
+
+def test_import_json_skips_damaged_records(tmp_path):
+    journal = tmp_path / 'results.jsonl'
+    incomplete = make_record('Боб')
+    del incomplete['оценка']['текстовая']
+    lines = [json.dumps(make_record('Алиса'), ensure_ascii=False), 'null', '[1, 2]',
+             json.dumps(incomplete, ensure_ascii=False), '{"дата": "не дата"}',
+             json.dumps(make_record('Ева', None, 'ошибка вычисления'), ensure_ascii=False)]
+    journal.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    archive = ResultArchive(str(tmp_path / 'results.bin'))
+    assert archive.import_json(str(journal)) == 2
+    assert archive.skipped == 4
+    assert [record['студент'] for record in archive.iter_results()] == ['Алиса', 'Ева']
+
+
+def test_export_json_keeps_legacy_array_intact(tmp_path):
+    legacy = tmp_path / 'results.json'
+    legacy.write_text(json.dumps([make_record('Алиса')], ensure_ascii=False), encoding='utf-8')
+    archive = ResultArchive(str(tmp_path / 'results.bin'))
+    archive.append_result('2024-05-02 12:00:00', 'Боб', 5, 6, 7, 4.5, 'хорошист')
+
+    assert archive.export_json(str(legacy)) == 1
+    assert len(json.loads(legacy.read_text(encoding='utf-8'))) == 1
+    assert [record['студент'] for record in iter_records(str(tmp_path / 'results.jsonl'))] == ['Алиса', 'Боб']
+
+
+def test_round_trip_through_csv_and_journal(tmp_path):
+    archive = ResultArchive(str(tmp_path / 'results.bin'))
+    archive.append_result('2024-05-01 12:00:00', 'Алиса', 8.2, 9, 7.5, 7.61, 'отличник')
+    archive.append_result('2024-05-02 09:30:00', 'Боб', 3, 2.5, 1, 2.09, 'троечник')
+    archive.append_result('2024-05-03 18:45:10', 'Алиса', 0, 0, 0, None, 'ошибка вычисления')
+    expected = list(archive.iter_results())
+    assert [record['оценка']['числовая'] for record in expected] == [7.61, 2.09, None]
+    assert expected[0]['параметры'] == {'качество': 8.2, 'точность': 9.0, 'сроки': 7.5}
+
+    assert archive.export_csv(str(tmp_path / 'results.csv')) == 3
+    from_csv = ResultArchive(str(tmp_path / 'from_csv.bin'))
+    assert from_csv.import_csv(str(tmp_path / 'results.csv')) == 3
+    assert list(from_csv.iter_results()) == expected
+
+    assert archive.export_json(str(tmp_path / 'results.jsonl')) == 3
+    assert list(iter_records(str(tmp_path / 'results.jsonl'))) == expected
+    from_json = ResultArchive(str(tmp_path / 'from_json.bin'))
+    assert from_json.import_json(str(tmp_path / 'results.jsonl')) == 3
+    assert from_json.skipped == 0
+    assert list(from_json.iter_results()) == expected
+    assert from_json.names == ['Алиса', 'Боб']
+
+
+def test_concurrent_appends_keep_every_record(tmp_path):
+    path = str(tmp_path / 'results.bin')
+    archives = [ResultArchive(path), ResultArchive(path)]
+
+    def append(index):
+        for i in range(200):
+            archives[index].append_result('2024-05-01 12:00:00', f'Студент {index}', i % 11, 5, 5, 4.5, 'хорошист')
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(append, range(2)))
+
+    archive = ResultArchive(path)
+    assert len(archive) == 400
+    for index in range(2):
+        student = archive.names.index(f'Студент {index}')
+        quality = archive.records['quality'][archive.records['student'] == student]
+        assert sorted(quality.tolist()) == sorted(i % 11 for i in range(200))
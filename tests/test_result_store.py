@@ -0,0 +1,100 @@
+import numpy as np
+
+from result_store import INDEX_SUFFIX, KEY, KEYS_SUFFIX, HistoryReader, ResultStore
+
+
+def make_record(student, date='2024-05-01 12:00:00'):
+    return {
+        'дата': date,
+        'студент': student,
+        'параметры': {'качество': 5, 'точность': 6, 'сроки': 7},
+        'оценка': {'числовая': 4.5, 'текстовая': 'хорошист'},
+    }
+
+
+def test_two_writers_keep_index_consistent(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    first = ResultStore(path, fsync_every=0)
+    second = ResultStore(path, fsync_every=0)
+    for i in range(9):
+        (first if i % 3 else second).append(make_record(f'Студент {i}'))
+    first.close()
+    second.close()
+
+    # Повторное открытие не должно дописывать в индекс уже учтенные записи
+    ResultStore(path).close()
+
+    with open(path, 'rb') as f:
+        journal = f.read()
+    lines = journal.count(b'\n')
+    offsets = np.fromfile(path + INDEX_SUFFIX, dtype='<u8')
+    keys = np.fromfile(path + KEYS_SUFFIX, dtype=KEY)
+
+    assert lines == 9
+    assert len(offsets) == lines
+    assert len(keys) == lines
+    assert offsets[0] == 0
+    assert all(journal[offset - 1:offset] == b'\n' for offset in offsets[1:])
+
+
+def write_history(path, records):
+    with ResultStore(path, fsync_every=0) as store:
+        for record in records:
+            store.append(record)
+
+
+def test_two_writers_assign_distinct_student_ids(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    first = ResultStore(path, fsync_every=0)
+    second = ResultStore(path, fsync_every=0)
+    first.append(make_record('Алиса'))
+    first.append(make_record('Карл'))
+    second.append(make_record('Дейв'))
+    first.append(make_record('Карл'))
+    first.close()
+    second.close()
+
+    with HistoryReader(path) as history:
+        assert history.find_student('Карл').tolist() == [1, 3]
+        assert history.find_student('Дейв').tolist() == [2]
+
+
+def test_find_on_empty_journal(tmp_path):
+    with HistoryReader(str(tmp_path / 'results.jsonl')) as history:
+        assert len(history) == 0
+        assert history.find_student('Алиса').size == 0
+        assert history.find_period('2024-05-01', '2024-05-31').size == 0
+        assert history.find_date('2024-05-01') == 0
+
+
+def test_find_student_unknown_name(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    write_history(path, [make_record('Алиса'), make_record('Боб')])
+
+    with HistoryReader(path) as history:
+        assert history.find_student('Ева').size == 0
+        assert history.find_student('Боб').tolist() == [1]
+
+
+def test_find_period_without_records(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    write_history(path, [make_record('Алиса', '2024-05-01 10:00:00'),
+                         make_record('Боб', '2024-07-01 10:00:00')])
+
+    with HistoryReader(path) as history:
+        assert history.find_period('2024-06-01', '2024-06-30').size == 0
+        assert history.find_period('2024-05', '2024-05').tolist() == [0]
+        assert history.find_date('2024-08-01') == len(history)
+
+
+def test_find_with_out_of_order_dates(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    write_history(path, [make_record('Алиса', '2024-05-03 10:00:00'),
+                         make_record('Боб', '2024-05-01 10:00:00'),
+                         make_record('Алиса', '2024-05-02 10:00:00')])
+
+    with HistoryReader(path) as history:
+        assert history.find_date('2024-05-02') == 2
+        assert history.find_date('2024-05-04') == len(history)
+        assert history.find_period('2024-05-01', '2024-05-02').tolist() == [1, 2]
+        assert history.find_student('Алиса').tolist() == [0, 2]
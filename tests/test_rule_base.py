@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from rule_base import load_rule_base, sugeno_consequents
+
+
+@pytest.fixture
+def definition():
+    return load_rule_base()
+
+
+def test_sugeno_consequents(definition):
+    definition['sugeno'] = {'отличник': 9.5, 'хорошист': {'const': 1, 'качество': 0.5, 'сроки': 0.25}}
+    consequents = sugeno_consequents(definition)
+
+    assert consequents['отличник'] == [9.5, 0.0, 0.0, 0.0]
+    assert consequents['хорошист'] == [1.0, 0.5, 0.0, 0.25]
+    # Без заключения - центр тяжести треугольника терма
+    assert consequents['троечник'] == pytest.approx([5 / 3, 0.0, 0.0, 0.0])
+
+
+@pytest.mark.parametrize('sugeno', [
+    [1, 2, 3],
+    {'медалист': 10},
+    {'отличник': '9'},
+    {'отличник': {'const': 1, 'посещаемость': 0.5}},
+    {'отличник': {'const': True}},
+])
+def test_sugeno_consequents_rejects_malformed_section(definition, sugeno, tmp_path):
+    definition['sugeno'] = sugeno
+    with pytest.raises(ValueError):
+        sugeno_consequents(definition)
+
+    path = tmp_path / 'rule_base.json'
+    path.write_text(json.dumps(definition, ensure_ascii=False), encoding='utf-8')
+    with pytest.raises(ValueError):
+        load_rule_base(str(path))
+
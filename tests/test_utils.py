@@ -0,0 +1,30 @@
+import json
+
+import utils
+
+
+def test_get_store_shares_journal_for_legacy_name(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    try:
+        store = utils.get_store('results.jsonl')
+        assert utils.get_store('results.json') is store
+        assert utils.get_store(str(tmp_path / 'results.jsonl')) is store
+    finally:
+        utils.close_stores()
+
+
+def test_custom_journal_ignores_default_legacy_history(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'results.json').write_text(json.dumps([{'студент': 'Legacy'}]), encoding='utf-8')
+    try:
+        utils.save_result_json('New', 5, 6, 7, 4.5, 'хорошист', filename='group_b.jsonl')
+        utils.close_stores()
+
+        assert [record['студент'] for record in utils.load_results_json('group_b.jsonl')] == ['New']
+        assert not (tmp_path / 'results.jsonl').exists()
+
+        # Одноименная прежняя история переносится в свой журнал
+        (tmp_path / 'group_c.json').write_text(json.dumps([{'студент': 'Old C'}]), encoding='utf-8')
+        assert [record['студент'] for record in utils.load_results_json('group_c.jsonl')] == ['Old C']
+    finally:
+        utils.close_stores()
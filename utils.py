@@ -1,11 +1,63 @@
-import json
+import atexit
 import csv
 import os
 from datetime import datetime
 
-def save_result_json(student_name, quality, accuracy, deadline, numeric_grade, text_grade, filename='results.json'):
+from result_store import DEFAULT_STORE_PATH, HistoryReader, ResultStore, iter_records, migrate_legacy
+
+# Открытые журналы результатов по абсолютному пути к журналу: файл
+# остается открытым между записями
+_stores = {}
+
+def journal_path(filename=DEFAULT_STORE_PATH):
+    """
+    Возвращает файл журнала для имени файла истории, перенося в журнал
+    историю в прежнем формате
+    
+    Файл .json - массив JSON: дописывание в него строк журнала испортило бы
+    его, поэтому вместо него используется журнал рядом (results.json ->
+    results.jsonl), в который переносится история из массива. Для журнала
+    .jsonl прежним форматом считается только одноименный файл .json
+    (group_b.jsonl <- group_b.json), а не results.json из рабочего каталога.
+    
+    :param filename: файл журнала или файл истории в прежнем формате (.json)
+    :return: путь к файлу журнала
+    """
+    if filename.endswith('.json'):
+        path = filename + 'l'
+        migrate_legacy(path, filename)
+        return path
+    if filename.endswith('.jsonl'):
+        migrate_legacy(filename, filename[:-1])
+    return filename
+
+def get_store(filename=DEFAULT_STORE_PATH):
+    """
+    Возвращает журнал результатов, при первом обращении перенося
+    в него историю из прежнего results.json
+    
+    :param filename: файл журнала (для .json - журнал рядом, см. journal_path)
+    :return: ResultStore
+    """
+    # results.json и results.jsonl - один журнал: кэш по пути к журналу,
+    # чтобы в процессе был один ResultStore на файл
+    path = os.path.abspath(journal_path(filename))
+    store = _stores.get(path)
+    if store is None:
+        store = _stores[path] = ResultStore(path)
+    return store
+
+@atexit.register
+def close_stores():
+    """Сбрасывает на диск и закрывает открытые журналы результатов"""
+    for store in _stores.values():
+        store.close()
+    _stores.clear()
+
+def save_result_json(student_name, quality, accuracy, deadline, numeric_grade, text_grade,
+                     filename=DEFAULT_STORE_PATH):
     """
-    Сохраняет результат оценки в JSON файл
+    Дописывает результат оценки в журнал JSON Lines
     
     :param student_name: имя студента
     :param quality: качество выполнения работы (0-10)
@@ -13,7 +65,7 @@ def save_result_json(student_name, quality, accuracy, deadline, numeric_grade, t
     :param deadline: соблюдение сроков (0-10)
     :param numeric_grade: числовая оценка
     :param text_grade: текстовая оценка (троечник/хорошист/отличник)
-    :param filename: имя файла для сохранения
+    :param filename: имя файла журнала (для .json - журнал рядом, см. journal_path)
     """
     # Создаем запись с результатом
     result = {
@@ -30,24 +82,8 @@ def save_result_json(student_name, quality, accuracy, deadline, numeric_grade, t
         }
     }
     
-    # Проверяем, существует ли файл
-    if os.path.exists(filename):
-        # Если файл существует, загружаем данные
-        with open(filename, 'r', encoding='utf-8') as f:
-            try:
-                data = json.load(f)
-            except json.JSONDecodeError:
-                data = []
-    else:
-        # Если файл не существует, создаем новый список
-        data = []
-    
-    # Добавляем новый результат
-    data.append(result)
-    
-    # Сохраняем данные в файл
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    # Запись добавляется в конец файла без чтения истории
+    get_store(filename).append(result)
     
     return True
 
@@ -90,22 +126,32 @@ def save_result_csv(student_name, quality, accuracy, deadline, numeric_grade, te
     
     return True
 
-def load_results_json(filename='results.json'):
+def load_results_json(filename=DEFAULT_STORE_PATH):
     """
-    Загружает все результаты из JSON файла
+    Загружает все результаты из журнала JSON Lines
     
-    :param filename: имя файла для загрузки
+    :param filename: имя файла журнала
     :return: список результатов
     """
-    if not os.path.exists(filename):
-        return []
+    return list(iter_results_json(filename))
+
+def iter_results_json(filename=DEFAULT_STORE_PATH):
+    """
+    Читает результаты из журнала JSON Lines по одному
+    
+    :param filename: имя файла журнала
+    :return: генератор результатов
+    """
+    return iter_records(journal_path(filename))
+
+def open_history(filename=DEFAULT_STORE_PATH):
+    """
+    Открывает журнал результатов для постраничного чтения
     
-    with open(filename, 'r', encoding='utf-8') as f:
-        try:
-            data = json.load(f)
-            return data
-        except json.JSONDecodeError:
-            return []
+    :param filename: имя файла журнала
+    :return: HistoryReader (закрывается вызывающим кодом)
+    """
+    return HistoryReader(journal_path(filename))
 
 def load_results_csv(filename='results.csv'):
     """